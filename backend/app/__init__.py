@@ -39,6 +39,9 @@ def create_app():
     socketio = init_socketio(app)
     app.config['JWT_SECRET_KEY'] = Config.JWT_SECRET_KEY
     app.config['JWT_ACCESS_TOKEN_EXPIRES'] = timedelta(hours=1)
+    # Identities are {'id', 'email', 'role'} dicts; Flask-JWT-Extended 4.7+
+    # rejects non-string subjects unless told not to
+    app.config['JWT_VERIFY_SUB'] = False
 
     # Create default admin user if it doesn't exist
     with app.app_context():
@@ -91,6 +94,24 @@ def create_app():
     app.register_blueprint(menu_bp, url_prefix="/api/menu")
     app.register_blueprint(reviews_bp, url_prefix="/api/reviews")
 
+    from app.commands import register_commands
+    register_commands(app)
+
+    # The kitchen ticket board and prep-time statistics are built from the
+    # database on first use, not here: app startup has to work before
+    # `flask db upgrade` has created their tables
+    from app.services.prep_time import prep_time_stats
+    prep_time_stats.window_days = app.config.get('PREP_TIME_WINDOW_DAYS', 28)
+
+    # Compaction runs in the background once sales have been committed
+    if app.config.get('INVENTORY_COMPACT_INTERVAL_SECONDS', 30):
+        from app.services.inventory_compactor import init_inventory_compactor
+        init_inventory_compactor(app)
+
+    if app.config.get('ORDER_GROUP_COMMIT'):
+        from app.services.order_ingest import init_order_ingestor
+        init_order_ingestor(app)
+
     return app
 
 
@@ -0,0 +1,137 @@
+# backend/app/commands.py
+import click
+from flask import current_app
+
+
+@click.command('archive-orders')
+@click.option('--days', type=int, default=None,
+              help='Archive finished orders untouched for this many days (default: ORDER_ARCHIVE_AFTER_DAYS).')
+@click.option('--chunk-size', type=int, default=500, help='Orders moved per transaction.')
+@click.option('--pause', type=float, default=0.1, help='Seconds to sleep between chunks.')
+def archive_orders_command(days, chunk_size, pause):
+    """Move completed and cancelled orders into the history tables and prune the change log."""
+    from datetime import datetime, timedelta
+    from app.extensions import db
+    from app.services.archive_service import archive_finished_orders, archive_horizon
+    from app.services.order_changes import prune_order_changes
+
+    config = dict(current_app.config)
+    if days is not None:
+        config['ORDER_ARCHIVE_AFTER_DAYS'] = days
+    archived = archive_finished_orders(archive_horizon(config), chunk_size=chunk_size, pause=pause)
+    click.echo(f'Archived {archived} orders')
+
+    hours = current_app.config.get('ORDER_CHANGE_RETENTION_HOURS', 24)
+    pruned = prune_order_changes(datetime.utcnow() - timedelta(hours=hours))
+    db.session.commit()
+    click.echo(f'Pruned {pruned} order change entries')
+
+
+@click.command('purge-menu-items')
+@click.option('--days', type=int, default=30, help='Purge items retired at least this many days ago.')
+@click.option('--chunk-size', type=int, default=1000, help='Order lines deleted per transaction.')
+@click.option('--pause', type=float, default=0.1, help='Seconds to sleep between chunks.')
+def purge_menu_items_command(days, chunk_size, pause):
+    """Delete retired menu items, and the order lines that reference them, for good."""
+    from datetime import datetime, timedelta
+    from app.services.menu_retirement import purge_menu_items, retired_menu_item_ids
+
+    item_ids = retired_menu_item_ids(datetime.utcnow() - timedelta(days=days))
+    order_items, menu_items = purge_menu_items(item_ids, chunk_size=chunk_size, pause=pause)
+    click.echo(f'Purged {menu_items} menu items and {order_items} order items')
+
+
+@click.command('compact-inventory')
+@click.option('--lag', type=int, default=None,
+              help='Only fold movements older than this many seconds (default: INVENTORY_COMPACT_LAG_SECONDS).')
+def compact_inventory_command(lag):
+    """Fold the inventory ledger into snapshots, refresh servings and prune old movements."""
+    from datetime import datetime, timedelta
+    from app.extensions import db
+    from app.services.inventory_ledger import compact_inventory, prune_inventory_movements
+    from app.services.inventory_service import refresh_servings
+
+    if lag is None:
+        lag = current_app.config.get('INVENTORY_COMPACT_LAG_SECONDS', 60)
+    compacted = compact_inventory(lag)
+    # Sales only write servings for dishes that ran out; bring the rest up to date
+    refreshed = refresh_servings()
+    db.session.commit()
+    click.echo(f'Compacted {compacted} inventory items, updated servings for {refreshed} menu items')
+
+    days = current_app.config.get('INVENTORY_MOVEMENT_RETENTION_DAYS', 90)
+    pruned = prune_inventory_movements(datetime.utcnow() - timedelta(days=days))
+    db.session.commit()
+    click.echo(f'Pruned {pruned} inventory movements')
+
+
+@click.command('refresh-menu-servings')
+def refresh_menu_servings_command():
+    """Recompute servings_possible for the whole menu from current stock."""
+    from app.extensions import db
+    from app.services.inventory_service import refresh_servings
+
+    changed = refresh_servings()
+    db.session.commit()
+    click.echo(f'Updated servings for {changed} menu items')
+
+
+@click.command('rebuild-sales-rollups')
+@click.option('--days', type=int, default=None,
+              help='Only rebuild orders placed in the last N days (default: everything).')
+def rebuild_sales_rollups_command(days):
+    """Recompute the hourly and daily sales rollups from the orders."""
+    from datetime import datetime, timedelta
+    from app.extensions import db
+    from app.services.sales_rollup import rebuild_sales_rollups
+
+    since = datetime.utcnow() - timedelta(days=days) if days is not None else None
+    written = rebuild_sales_rollups(since)
+    db.session.commit()
+    click.echo(f'Wrote {written} sales rollup rows')
+
+
+@click.command('check-query-plans')
+@click.option('--create-schema', is_flag=True,
+              help='Create missing tables first (for a scratch SQLite database).')
+def check_query_plans_command(create_schema):
+    """EXPLAIN the hot-path queries and fail if any falls back to a full scan."""
+    from app.extensions import db
+    from app.utils.query_plans import check_plans
+
+    if create_schema:
+        db.create_all()
+
+    failed = False
+    for name, (lines, scans) in check_plans().items():
+        click.echo(f'{"FULL SCAN" if scans else "ok":>9}  {name}')
+        for line in lines:
+            click.echo(f'           {line}')
+        failed = failed or bool(scans)
+    if failed:
+        raise click.ClickException('Some hot queries fall back to full table scans')
+
+
+@click.command('socketio-relay')
+@click.option('--url', default=None,
+              help='local://host:port to listen on (default: SOCKETIO_MESSAGE_QUEUE).')
+def socketio_relay_command(url):
+    """Run the local Socket.IO relay that lets several workers share events."""
+    from app.services.socket_relay import SocketRelay, parse_relay_url
+
+    url = url or current_app.config.get('SOCKETIO_MESSAGE_QUEUE') or 'local://127.0.0.1'
+    if not url.startswith('local://'):
+        raise click.ClickException(f'{url} is not a local:// relay URL')
+    relay = SocketRelay(parse_relay_url(url))
+    click.echo(f'Socket relay listening on {url}')
+    relay.serve_forever()
+
+
+def register_commands(app):
+    app.cli.add_command(archive_orders_command)
+    app.cli.add_command(purge_menu_items_command)
+    app.cli.add_command(refresh_menu_servings_command)
+    app.cli.add_command(compact_inventory_command)
+    app.cli.add_command(rebuild_sales_rollups_command)
+    app.cli.add_command(check_query_plans_command)
+    app.cli.add_command(socketio_relay_command)
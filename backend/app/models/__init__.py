@@ -1,8 +1,15 @@
 from app.extensions import db
 from .reservation import Reservation
 from .menu_item import MenuItem
+from .inventory_movement import InventoryMovement
 from .inventory_item import InventoryItem
+from .recipe_ingredient import RecipeIngredient
 from .order import Order, OrderItem
+from .order_history import OrderHistory, OrderItemHistory
+from .order_status_history import OrderStatusHistory
+from .order_change import OrderChange
+from .cache_version import CacheVersion
+from .sales_rollup import SalesRollup, SalesItemRollup
 from .user import User
 from .review import Review
 
@@ -11,8 +18,17 @@ __all__ = [
     'Reservation', 
     'MenuItem', 
     'InventoryItem', 
+    'InventoryMovement',
+    'RecipeIngredient',
     'Order', 
     'OrderItem', 
+    'OrderHistory',
+    'OrderItemHistory',
+    'OrderStatusHistory',
+    'OrderChange',
+    'CacheVersion',
+    'SalesRollup',
+    'SalesItemRollup',
     'User',
     'Review'
 ]
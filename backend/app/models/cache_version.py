@@ -0,0 +1,13 @@
+# backend/app/models/cache_version.py
+from app.extensions import db
+
+
+class CacheVersion(db.Model):
+    """
+    Version counters for cached data, bumped in the same transaction as the
+    write so every worker process sees the change on its next check.
+    """
+    __tablename__ = 'cache_versions'
+
+    name = db.Column(db.String(50), primary_key=True)
+    version = db.Column(db.BigInteger, nullable=False, default=0)
@@ -1,31 +1,55 @@
 # backend/app/models/inventory_item.py
 from datetime import datetime
+from sqlalchemy import func, select
+from sqlalchemy.orm import column_property
 from app.extensions import db
+from .inventory_movement import InventoryMovement
 
 class InventoryItem(db.Model):
     __tablename__ = 'inventory_items'
+    __table_args__ = (
+        db.Index('ix_inventory_items_menu_item_id', 'menu_item_id'),
+        db.Index('ix_inventory_items_is_low', 'is_low', 'id'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(100), nullable=False)
     description = db.Column(db.Text)
+    # Stock as of the snapshot: every inventory_movements row up to
+    # snapshot_movement_id is folded in. Only compaction writes these two.
     quantity = db.Column(db.Float, nullable=False)
+    snapshot_movement_id = db.Column(db.BigInteger, nullable=False, default=0, server_default='0')
+    snapshot_at = db.Column(db.DateTime)
     unit = db.Column(db.String(20), nullable=False)  # kg, g, l, ml, pcs, etc.
     min_quantity = db.Column(db.Float, nullable=False)
+    # stock <= min_quantity, kept up to date by every stock or threshold
+    # change (inventory_service.update_low_stock) rather than worked out on read
+    is_low = db.Column(db.Boolean, nullable=False, default=False, server_default='0')
     menu_item_id = db.Column(db.Integer, db.ForeignKey('menu_items.id'), nullable=True)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    # Current stock: the snapshot plus the ledger tail after it, loaded in the
+    # same query as the row
+    stock = column_property(
+        quantity + select(func.coalesce(func.sum(InventoryMovement.delta), 0)).where(
+            InventoryMovement.inventory_item_id == id,
+            InventoryMovement.id > snapshot_movement_id
+        ).correlate_except(InventoryMovement).scalar_subquery()
+    )
     
     # Relationships
     menu_item = db.relationship('MenuItem', back_populates='inventory_items')
+    recipe_uses = db.relationship('RecipeIngredient', back_populates='inventory_item', lazy=True)
     
     def to_dict(self):
         return {
             'id': self.id,
             'name': self.name,
             'description': self.description,
-            'quantity': self.quantity,
+            'quantity': round(self.stock, 6) or 0.0,
             'unit': self.unit,
             'min_quantity': self.min_quantity,
             'menu_item_id': self.menu_item_id,
-            'is_low': self.quantity <= self.min_quantity
-        }
\ No newline at end of file
+            'is_low': self.is_low
+        }
@@ -0,0 +1,37 @@
+# backend/app/models/inventory_movement.py
+from datetime import datetime
+from app.extensions import db
+
+
+class InventoryMovement(db.Model):
+    """
+    Append-only stock ledger. Sales, deliveries, waste and manual
+    adjustments are inserted here and never update inventory_items;
+    `flask compact-inventory` folds them into each item's snapshot.
+    """
+    __tablename__ = 'inventory_movements'
+    __table_args__ = (
+        # The tail past an item's snapshot is a range scan on this index
+        db.Index('ix_inventory_movements_item_id', 'inventory_item_id', 'id'),
+        db.Index('ix_inventory_movements_created_at', 'created_at'),
+        {'sqlite_autoincrement': True},
+    )
+
+    id = db.Column(db.BigInteger().with_variant(db.Integer, 'sqlite'), primary_key=True)
+    inventory_item_id = db.Column(db.Integer, db.ForeignKey('inventory_items.id'), nullable=False)
+    delta = db.Column(db.Float, nullable=False)  # Positive in, negative out
+    kind = db.Column(db.String(20), nullable=False)  # sale, delivery, waste, adjustment
+    order_id = db.Column(db.Integer)  # For sales; no FK so orders can be archived
+    note = db.Column(db.String(255))
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'inventory_item_id': self.inventory_item_id,
+            'delta': self.delta,
+            'kind': self.kind,
+            'order_id': self.order_id,
+            'note': self.note,
+            'created_at': self.created_at.isoformat() if self.created_at else None
+        }
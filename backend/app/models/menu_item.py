@@ -1,9 +1,17 @@
 # backend/app/models/menu_item.py
 from datetime import datetime
+from sqlalchemy import DDL, event, or_
+from sqlalchemy.ext.hybrid import hybrid_property
 from app.extensions import db
 
 class MenuItem(db.Model):
     __tablename__ = "menu_items"
+    __table_args__ = (
+        # Full-text search on MySQL; SQLite uses the FTS5 table below instead
+        db.Index('ix_menu_items_name_description_ft', 'name', 'description',
+                 mysql_prefix='FULLTEXT').ddl_if(dialect='mysql'),
+        db.Index('ix_menu_items_category_is_available', 'category', 'is_available'),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(100), nullable=False)
@@ -12,12 +20,26 @@ class MenuItem(db.Model):
     category = db.Column(db.String(50), nullable=False)  # e.g., "appetizer", "main", "dessert"
     is_available = db.Column(db.Boolean, default=True)
     image_url = db.Column(db.String(255))
+    retired_at = db.Column(db.DateTime)  # Off the menu for good; kept for order history
+    # Portions the current stock can make, from the recipe; NULL when the item
+    # has no recipe and so isn't stock-tracked. Kept up to date by
+    # app.services.inventory_service.refresh_servings()
+    servings_possible = db.Column(db.Integer)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
     # Relationships
     order_items = db.relationship('OrderItem', back_populates='menu_item', lazy=True)
     inventory_items = db.relationship('InventoryItem', back_populates='menu_item', lazy=True)
+    recipe = db.relationship('RecipeIngredient', back_populates='menu_item', lazy=True)
+
+    @hybrid_property
+    def in_stock(self):
+        return self.servings_possible is None or self.servings_possible > 0
+
+    @in_stock.expression
+    def in_stock(cls):
+        return or_(cls.servings_possible.is_(None), cls.servings_possible > 0)
     
     def to_dict(self):
         return {
@@ -27,5 +49,29 @@ class MenuItem(db.Model):
             'price': float(self.price) if self.price else 0.0,
             'category': self.category,
             'is_available': self.is_available,
-            'image_url': self.image_url
-        }
\ No newline at end of file
+            'image_url': self.image_url,
+            'servings_possible': self.servings_possible,
+            'retired_at': self.retired_at.isoformat() if self.retired_at else None
+        }
+
+# SQLite full-text search: an external-content FTS5 table over menu_items,
+# kept in sync by triggers (the migration creates the same objects)
+MENU_ITEMS_FTS_DDL = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS menu_items_fts USING fts5("
+    "name, description, content='menu_items', content_rowid='id', "
+    "tokenize='unicode61 remove_diacritics 2')",
+    "CREATE TRIGGER IF NOT EXISTS menu_items_fts_ai AFTER INSERT ON menu_items BEGIN "
+    "INSERT INTO menu_items_fts(rowid, name, description) VALUES (new.id, new.name, new.description); END",
+    "CREATE TRIGGER IF NOT EXISTS menu_items_fts_ad AFTER DELETE ON menu_items BEGIN "
+    "INSERT INTO menu_items_fts(menu_items_fts, rowid, name, description) "
+    "VALUES ('delete', old.id, old.name, old.description); END",
+    "CREATE TRIGGER IF NOT EXISTS menu_items_fts_au AFTER UPDATE OF name, description ON menu_items BEGIN "
+    "INSERT INTO menu_items_fts(menu_items_fts, rowid, name, description) "
+    "VALUES ('delete', old.id, old.name, old.description); "
+    "INSERT INTO menu_items_fts(rowid, name, description) VALUES (new.id, new.name, new.description); END",
+]
+
+for _statement in MENU_ITEMS_FTS_DDL:
+    event.listen(MenuItem.__table__, 'after_create', DDL(_statement).execute_if(dialect='sqlite'))
+event.listen(MenuItem.__table__, 'after_drop',
+             DDL('DROP TABLE IF EXISTS menu_items_fts').execute_if(dialect='sqlite'))
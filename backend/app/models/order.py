@@ -6,6 +6,14 @@ from app.extensions import db
 
 class Order(db.Model):
     __tablename__ = 'orders'
+    __table_args__ = (
+        db.Index('ix_orders_status_created_at', 'status', 'created_at'),
+        db.Index('ix_orders_created_at_id', 'created_at', 'id'),
+        db.Index('ix_orders_customer_id_created_at', 'customer_id', 'created_at'),
+        db.Index('uq_orders_idempotency_key', 'idempotency_key', unique=True),
+        # Never reuse ids on SQLite: archived orders keep theirs in orders_history
+        {'sqlite_autoincrement': True}
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     customer_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=True)  # Nullable for guest orders
@@ -19,6 +27,8 @@ class Order(db.Model):
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     notes = db.Column(db.Text, nullable=True)
+    # Idempotency-Key of the request that created the order (generated in group-commit mode)
+    idempotency_key = db.Column(db.String(64), nullable=True)
     
     # Relationships
     customer = db.relationship('User', back_populates='orders')
@@ -43,6 +53,10 @@ class Order(db.Model):
 
 class OrderItem(db.Model):
     __tablename__ = 'order_items'
+    __table_args__ = (
+        db.Index('ix_order_items_order_id', 'order_id'),
+        db.Index('ix_order_items_menu_item_id', 'menu_item_id'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     order_id = db.Column(db.Integer, db.ForeignKey('orders.id'), nullable=False)
@@ -0,0 +1,20 @@
+# backend/app/models/order_change.py
+from datetime import datetime
+from app.extensions import db
+
+
+class OrderChange(db.Model):
+    """
+    Change log for orders. The autoincrement id is the change cursor handed
+    to polling clients: everything with a larger id happened after it.
+    """
+    __tablename__ = 'order_changes'
+    __table_args__ = (
+        db.Index('ix_order_changes_changed_at', 'changed_at'),
+        {'sqlite_autoincrement': True},
+    )
+
+    id = db.Column(db.BigInteger().with_variant(db.Integer, 'sqlite'), primary_key=True)
+    order_id = db.Column(db.Integer, nullable=False)
+    change = db.Column(db.String(20), nullable=False)  # created, updated, removed
+    changed_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
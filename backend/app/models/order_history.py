@@ -0,0 +1,45 @@
+# backend/app/models/order_history.py
+from datetime import datetime
+from app.extensions import db
+
+
+class OrderHistory(db.Model):
+    """Completed and cancelled orders moved out of the hot orders table"""
+    __tablename__ = 'orders_history'
+    __table_args__ = (
+        db.Index('ix_orders_history_created_at_id', 'created_at', 'id'),
+        db.Index('ix_orders_history_customer_id_created_at', 'customer_id', 'created_at'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True, autoincrement=False)  # Same id as in orders
+    customer_id = db.Column(db.Integer, nullable=True)
+    customer_name = db.Column(db.String(100), nullable=False)
+    customer_phone = db.Column(db.String(20), nullable=False)
+    customer_email = db.Column(db.String(120), nullable=True)
+    customer_address = db.Column(db.Text, nullable=True)
+    status = db.Column(db.String(20), nullable=False)
+    table_number = db.Column(db.Integer, nullable=True)
+    is_guest_order = db.Column(db.Boolean, default=False, nullable=False)
+    created_at = db.Column(db.DateTime)
+    updated_at = db.Column(db.DateTime)
+    notes = db.Column(db.Text, nullable=True)
+    archived_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+
+    # Relationships
+    order_items = db.relationship(
+        'OrderItemHistory',
+        primaryjoin='OrderHistory.id == foreign(OrderItemHistory.order_id)',
+        viewonly=True
+    )
+
+
+class OrderItemHistory(db.Model):
+    __tablename__ = 'order_items_history'
+
+    id = db.Column(db.Integer, primary_key=True, autoincrement=False)  # Same id as in order_items
+    order_id = db.Column(db.Integer, nullable=False, index=True)
+    menu_item_id = db.Column(db.Integer, nullable=False)
+    quantity = db.Column(db.Integer, nullable=False)
+    price = db.Column(db.Numeric(10, 2), nullable=False)
+    special_requests = db.Column(db.Text, nullable=True)
+    created_at = db.Column(db.DateTime)
@@ -0,0 +1,18 @@
+# backend/app/models/order_status_history.py
+from datetime import datetime
+from app.extensions import db
+
+
+class OrderStatusHistory(db.Model):
+    """One row per order status transition, written with the status change"""
+    __tablename__ = 'order_status_history'
+    __table_args__ = (
+        db.Index('ix_order_status_history_order_id_to_status', 'order_id', 'to_status'),
+        db.Index('ix_order_status_history_to_status_changed_at', 'to_status', 'changed_at'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    order_id = db.Column(db.Integer, nullable=False)  # Outlives the order when it is archived
+    from_status = db.Column(db.String(20), nullable=True)
+    to_status = db.Column(db.String(20), nullable=False)
+    changed_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
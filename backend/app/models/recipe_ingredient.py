@@ -0,0 +1,27 @@
+# backend/app/models/recipe_ingredient.py
+from app.extensions import db
+
+
+class RecipeIngredient(db.Model):
+    """How much of an inventory item one portion of a menu item uses"""
+    __tablename__ = 'recipe_ingredients'
+    __table_args__ = (
+        db.UniqueConstraint('menu_item_id', 'inventory_item_id', name='uq_recipe_ingredients_item_ingredient'),
+        db.Index('ix_recipe_ingredients_inventory_item_id', 'inventory_item_id'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    menu_item_id = db.Column(db.Integer, db.ForeignKey('menu_items.id'), nullable=False)
+    inventory_item_id = db.Column(db.Integer, db.ForeignKey('inventory_items.id'), nullable=False)
+    quantity = db.Column(db.Float, nullable=False)  # Per portion, in the inventory item's unit
+
+    menu_item = db.relationship('MenuItem', back_populates='recipe')
+    inventory_item = db.relationship('InventoryItem', back_populates='recipe_uses')
+
+    def to_dict(self):
+        return {
+            'inventory_item_id': self.inventory_item_id,
+            'name': self.inventory_item.name if self.inventory_item else None,
+            'unit': self.inventory_item.unit if self.inventory_item else None,
+            'quantity': self.quantity
+        }
@@ -4,6 +4,9 @@ from sqlalchemy import ForeignKey
 
 class Reservation(db.Model):
     __tablename__ = "reservations"
+    __table_args__ = (
+        db.Index('ix_reservations_date_time', 'date', 'time'),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=True)  # Made nullable
@@ -3,10 +3,14 @@ from app.extensions import db
 
 class Review(db.Model):
     __tablename__ = 'reviews'
+    __table_args__ = (
+        db.Index('ix_reviews_status_rating', 'status', 'rating'),
+        db.Index('ix_reviews_order_id', 'order_id'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=True)  # Nullable for guest reviews
-    order_id = db.Column(db.Integer, db.ForeignKey('orders.id'), nullable=True)
+    order_id = db.Column(db.Integer, nullable=True)  # orders.id or, once archived, orders_history.id
     guest_name = db.Column(db.String(100), nullable=True)  # For guest reviews
     guest_email = db.Column(db.String(120), nullable=True)  # For guest reviews
     rating = db.Column(db.Integer, nullable=False)  # 1-5
@@ -18,9 +22,15 @@ class Review(db.Model):
     
     # Relationships
     user = db.relationship('User', backref='reviews')
-    order = db.relationship('Order', backref='reviews')
+    order = db.relationship(
+        'Order', primaryjoin='foreign(Review.order_id) == Order.id', viewonly=True
+    )
+    archived_order = db.relationship(
+        'OrderHistory', primaryjoin='foreign(Review.order_id) == OrderHistory.id', viewonly=True
+    )
     
     def to_dict(self, include_admin_fields=False):
+        order = self.order or self.archived_order
         result = {
             'is_guest': self.user_id is None,
             'id': self.id,
@@ -37,9 +47,9 @@ class Review(db.Model):
                 'email': self.user.email if self.user else self.guest_email
             },
             'order': {
-                'id': self.order.id,
-                'order_number': getattr(self.order, 'order_number', None)
-            } if self.order else None
+                'id': order.id,
+                'order_number': getattr(order, 'order_number', None)
+            } if order else None
         }
         
         if include_admin_fields:
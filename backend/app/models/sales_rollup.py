@@ -0,0 +1,47 @@
+# backend/app/models/sales_rollup.py
+from datetime import datetime
+from app.extensions import db
+
+
+class SalesRollup(db.Model):
+    """
+    Completed-order totals per hour and per day, by the hour or day the
+    order was placed (UTC). Incremented when an order reaches 'completed'
+    and decremented if it leaves it; `flask rebuild-sales-rollups`
+    recomputes them from the orders.
+    """
+    __tablename__ = 'sales_rollups'
+    __table_args__ = (
+        db.UniqueConstraint('period', 'bucket_start', name='uq_sales_rollups_period_bucket'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    period = db.Column(db.String(10), nullable=False)  # hour or day
+    bucket_start = db.Column(db.DateTime, nullable=False)
+    revenue = db.Column(db.Numeric(12, 2), nullable=False, default=0)
+    orders = db.Column(db.Integer, nullable=False, default=0)
+    items = db.Column(db.Integer, nullable=False, default=0)  # Portions sold
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+
+    def to_dict(self):
+        return {
+            'bucket_start': self.bucket_start.isoformat(),
+            'revenue': float(self.revenue),
+            'orders': self.orders,
+            'items': self.items
+        }
+
+
+class SalesItemRollup(db.Model):
+    """Portions and revenue per menu item per hour and per day, kept alongside SalesRollup"""
+    __tablename__ = 'sales_item_rollups'
+    __table_args__ = (
+        db.UniqueConstraint('period', 'bucket_start', 'menu_item_id', name='uq_sales_item_rollups_period_bucket_item'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    period = db.Column(db.String(10), nullable=False)
+    bucket_start = db.Column(db.DateTime, nullable=False)
+    menu_item_id = db.Column(db.Integer, nullable=False)  # No FK so menu items can be purged
+    quantity = db.Column(db.Integer, nullable=False, default=0)
+    revenue = db.Column(db.Numeric(12, 2), nullable=False, default=0)
@@ -1,10 +1,19 @@
 # backend/app/routes/admin.py
-from flask import Blueprint, request, jsonify
+from datetime import datetime, timedelta
+from flask import Blueprint, request, jsonify, current_app
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from app.extensions import db
 from app.models.menu_item import MenuItem
 from app.models.user import User
 from app.models.inventory_item import InventoryItem
+from app.services.menu_cache import bump_menu_version
+from app.services.menu_import import import_menu_items, read_csv_rows, MenuImportError
+from app.services.menu_retirement import purge_menu_items
+from app.services.inventory_service import adjust_stock, set_recipe, update_low_stock
+from app.utils.pagination import parse_limit, encode_cursor, decode_cursor, parse_datetime
+from app.services.inventory_ledger import MOVEMENT_KINDS
+from app.services.demand_forecast import forecast_ingredients
+from app.services.sales_rollup import PERIODS, bucket_start, sales_totals, top_menu_items
 
 admin_bp = Blueprint('admin', __name__)
 # Menu Management
@@ -24,9 +33,69 @@ def create_menu_item():
         image_url=data.get('image_url')
     )
     db.session.add(menu_item)
+    bump_menu_version()
     db.session.commit()
     return jsonify(menu_item.to_dict()), 201
 
+@admin_bp.route('/menu/import', methods=['POST'])
+@jwt_required()
+def import_menu():
+    """
+    Create and update menu items in bulk.
+
+    Takes a JSON array of items (or {"items": [...]}), a text/csv body, or a
+    multipart CSV upload in "file". The whole batch is applied in one
+    transaction, or not at all if any row is invalid; the response reports
+    every row either way.
+    """
+    if get_jwt_identity()['role'] != 'admin':
+        return jsonify({'error': 'Unauthorized'}), 403
+
+    max_rows = current_app.config['MENU_IMPORT_MAX_ROWS']
+    try:
+        if 'file' in request.files:
+            rows = read_csv_rows(request.files['file'].stream, max_rows)
+        elif request.mimetype == 'text/csv':
+            rows = read_csv_rows(request.stream, max_rows)
+        else:
+            data = request.get_json(silent=True)
+            rows = data.get('items') if isinstance(data, dict) else data
+            if not isinstance(rows, list):
+                raise MenuImportError('Expected a JSON array of menu items or a CSV upload')
+            if len(rows) > max_rows:
+                raise MenuImportError(f'Too many rows (maximum {max_rows})')
+    except (MenuImportError, UnicodeDecodeError) as e:
+        return jsonify({'error': str(e)}), 400
+
+    try:
+        ok, report = import_menu_items(rows)
+        if not ok:
+            db.session.rollback()
+            return jsonify(report), 400
+        db.session.commit()
+        return jsonify(report), 200
+    except Exception as e:
+        db.session.rollback()
+        current_app.logger.error(f'Error importing menu: {str(e)}')
+        return jsonify({'error': 'Failed to import menu'}), 500
+
+@admin_bp.route('/menu/<int:item_id>', methods=['DELETE'])
+@jwt_required()
+def purge_menu_item(item_id):
+    """Delete a retired menu item for good, with the order lines that reference it"""
+    if get_jwt_identity()['role'] != 'admin':
+        return jsonify({'error': 'Unauthorized'}), 403
+
+    item = MenuItem.query.get_or_404(item_id)
+    if item.retired_at is None:
+        return jsonify({'error': 'Retire the menu item before purging it'}), 400
+    try:
+        order_items, _ = purge_menu_items([item_id])
+        return jsonify({'purged': item_id, 'order_items_deleted': order_items}), 200
+    except Exception as e:
+        current_app.logger.error(f'Error purging menu item {item_id}: {str(e)}')
+        return jsonify({'error': 'Failed to purge menu item'}), 500
+
 # Staff Management
 @admin_bp.route('/staff', methods=['POST'])
 @jwt_required()
@@ -53,26 +122,232 @@ def create_staff():
 @admin_bp.route('/inventory', methods=['GET'])
 @jwt_required()
 def get_inventory():
+    """
+    Inventory items. ?low=true keeps only items at or below min_quantity
+    (an indexed flag, not a scan). Passing ?limit= or ?cursor= switches to
+    paginated mode, which returns {'items': [...], 'next_cursor': ...} in id
+    order.
+    """
     if get_jwt_identity()['role'] not in ['admin', 'staff']:
         return jsonify({'error': 'Unauthorized'}), 403
-    
-    items = InventoryItem.query.all()
-    return jsonify([item.to_dict() for item in items])
+
+    paginated = 'limit' in request.args or 'cursor' in request.args
+    try:
+        limit = parse_limit(request.args.get('limit'))
+        cursor = request.args.get('cursor')
+        after_id = decode_cursor(cursor, int)[0] if cursor else None
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    query = InventoryItem.query
+    if request.args.get('low') == 'true':
+        query = query.filter(InventoryItem.is_low == True)
+    if not paginated:
+        return jsonify([item.to_dict() for item in query.all()])
+
+    if after_id is not None:
+        query = query.filter(InventoryItem.id > after_id)
+    items = query.order_by(InventoryItem.id).limit(limit + 1).all()
+    next_cursor = encode_cursor(items[limit - 1].id) if len(items) > limit else None
+    return jsonify({'items': [item.to_dict() for item in items[:limit]], 'next_cursor': next_cursor})
+
+@admin_bp.route('/inventory/<int:inventory_id>', methods=['PATCH', 'PUT'])
+@jwt_required()
+def update_inventory_item(inventory_id):
+    """
+    Edit an inventory item. A new quantity is a stock count: the difference
+    from current stock goes into the ledger as an adjustment.
+    """
+    if get_jwt_identity()['role'] not in ['admin', 'staff']:
+        return jsonify({'error': 'Unauthorized'}), 403
+
+    item = InventoryItem.query.get_or_404(inventory_id)
+    data = request.get_json() or {}
+    try:
+        quantity = float(data['quantity']) if 'quantity' in data else None
+        if 'min_quantity' in data:
+            item.min_quantity = float(data['min_quantity'])
+    except (TypeError, ValueError):
+        return jsonify({'error': 'quantity and min_quantity must be numbers'}), 400
+    for field in ('name', 'description', 'unit'):
+        if field in data:
+            setattr(item, field, data[field])
+
+    try:
+        if quantity is not None and round(quantity - item.stock, 6):
+            adjust_stock(item.id, round(quantity - item.stock, 6), 'adjustment', note='Stock count')
+        elif 'min_quantity' in data:
+            db.session.flush()
+            update_low_stock([item.id])
+        db.session.commit()
+        db.session.refresh(item)
+        return jsonify(item.to_dict()), 200
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 500
+
+@admin_bp.route('/inventory/<int:inventory_id>/movements', methods=['POST'])
+@jwt_required()
+def record_inventory_movement(inventory_id):
+    """
+    Record a delivery, waste or adjustment. "quantity" is the amount moved:
+    positive for deliveries, taken out for waste, signed for adjustments.
+    """
+    if get_jwt_identity()['role'] not in ['admin', 'staff']:
+        return jsonify({'error': 'Unauthorized'}), 403
+
+    item = InventoryItem.query.get_or_404(inventory_id)
+    data = request.get_json() or {}
+    kind = data.get('kind')
+    if kind not in MOVEMENT_KINDS or kind == 'sale':
+        return jsonify({'error': 'kind must be delivery, waste or adjustment'}), 400
+    try:
+        quantity = float(data['quantity'])
+    except (KeyError, TypeError, ValueError):
+        return jsonify({'error': 'quantity must be a number'}), 400
+    if kind != 'adjustment' and quantity <= 0:
+        return jsonify({'error': 'quantity must be positive'}), 400
+
+    try:
+        adjust_stock(item.id, -quantity if kind == 'waste' else quantity, kind, note=data.get('note'))
+        db.session.commit()
+        db.session.refresh(item)
+        return jsonify(item.to_dict()), 201
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 500
+
+@admin_bp.route('/menu/<int:item_id>/recipe', methods=['GET', 'PUT'])
+@jwt_required()
+def menu_item_recipe(item_id):
+    """
+    A menu item's ingredients and per-portion quantities. PUT replaces the
+    whole recipe with a list of {"inventory_item_id", "quantity"}.
+    """
+    if get_jwt_identity()['role'] not in ['admin', 'staff']:
+        return jsonify({'error': 'Unauthorized'}), 403
+
+    menu_item = MenuItem.query.get_or_404(item_id)
+    if request.method == 'GET':
+        return jsonify({
+            'menu_item_id': menu_item.id,
+            'servings_possible': menu_item.servings_possible,
+            'ingredients': [ingredient.to_dict() for ingredient in menu_item.recipe]
+        })
+
+    if get_jwt_identity()['role'] != 'admin':
+        return jsonify({'error': 'Unauthorized'}), 403
+    ingredients = request.get_json()
+    if not isinstance(ingredients, list):
+        return jsonify({'error': 'Expected a list of ingredients'}), 400
+    try:
+        ingredients = [{
+            'inventory_item_id': int(ingredient['inventory_item_id']),
+            'quantity': float(ingredient['quantity'])
+        } for ingredient in ingredients]
+    except (KeyError, TypeError, ValueError):
+        return jsonify({'error': 'Each ingredient needs an inventory_item_id and a quantity'}), 400
+    ids = [ingredient['inventory_item_id'] for ingredient in ingredients]
+    if len(set(ids)) != len(ids):
+        return jsonify({'error': 'An inventory item appears more than once'}), 400
+    if any(ingredient['quantity'] <= 0 for ingredient in ingredients):
+        return jsonify({'error': 'Quantities must be positive'}), 400
+    if ids and db.session.query(InventoryItem.id).filter(InventoryItem.id.in_(ids)).count() != len(ids):
+        return jsonify({'error': 'Unknown inventory item'}), 400
+
+    try:
+        set_recipe(menu_item.id, ingredients)
+        db.session.commit()
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 500
+    db.session.refresh(menu_item)
+    return jsonify({
+        'menu_item_id': menu_item.id,
+        'servings_possible': menu_item.servings_possible,
+        'ingredients': [ingredient.to_dict() for ingredient in menu_item.recipe]
+    }), 200
 
 # Reports
 @admin_bp.route('/reports/sales', methods=['GET'])
 @jwt_required()
 def get_sales_report():
+    """
+    Sales from the rollup tables, so the cost follows the number of buckets
+    rather than the number of orders.
+
+    ?period=day|hour, ?from= (inclusive) and ?to= (exclusive) as ISO dates
+    or datetimes, in UTC, or ?start_date=/?end_date= as whole days; the
+    last 30 days by default, at most 31 days for hourly buckets.
+    """
     if get_jwt_identity()['role'] != 'admin':
         return jsonify({'error': 'Unauthorized'}), 403
-    
-    # Implement sales report logic
+
+    period = request.args.get('period', 'day')
+    if period not in PERIODS:
+        return jsonify({'error': 'period must be day or hour'}), 400
+    try:
+        end = parse_datetime(request.args.get('to'))
+        if end is None and request.args.get('end_date'):
+            # The admin client's start_date/end_date are whole days, end included
+            end = parse_datetime(request.args['end_date']) + timedelta(days=1)
+        end = end or bucket_start(datetime.utcnow(), period) + PERIODS[period]
+        start = parse_datetime(request.args.get('from') or request.args.get('start_date'))
+        start = bucket_start(start or end - timedelta(days=30), period)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    if period == 'hour' and end - start > timedelta(days=31):
+        return jsonify({'error': 'Hourly reports cover at most 31 days'}), 400
+
+    series = sales_totals(period, start, end)
+    top_items = top_menu_items(period, start, end)
+    names = dict(db.session.query(MenuItem.id, MenuItem.name).filter(
+        MenuItem.id.in_([row.menu_item_id for row in top_items])
+    ).all())
     return jsonify({
-        'total_sales': 0,
-        'total_orders': 0,
-        'active_menu_items': 0
+        'period': period,
+        'from': start.isoformat(),
+        'to': end.isoformat(),
+        'total_sales': float(sum(row.revenue for row in series)),
+        'total_orders': sum(row.orders for row in series),
+        'total_items': sum(row.items for row in series),
+        'active_menu_items': MenuItem.query.filter(MenuItem.retired_at.is_(None)).count(),
+        'series': [row.to_dict() for row in series],
+        'top_items': [{
+            'menu_item_id': row.menu_item_id,
+            'name': names.get(row.menu_item_id),
+            'quantity': int(row.quantity),
+            'revenue': float(row.revenue)
+        } for row in top_items]
     })
 
+@admin_bp.route('/reports/ingredient-forecast', methods=['GET'])
+@jwt_required()
+def get_ingredient_forecast():
+    """
+    Forecast ingredient usage from order history and suggest what to reorder.
+
+    ?bucket=day|hour, ?history= buckets to learn from (365 days or 672
+    hours by default), ?horizon= buckets to plan for, starting with the
+    current one (7 days or 24 hours).
+    """
+    if get_jwt_identity()['role'] not in ['admin', 'staff']:
+        return jsonify({'error': 'Unauthorized'}), 403
+    try:
+        history = request.args.get('history')
+        horizon = request.args.get('horizon')
+        forecast = forecast_ingredients(
+            bucket=request.args.get('bucket', 'day'),
+            history=int(history) if history else None,
+            horizon=int(horizon) if horizon else None
+        )
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        current_app.logger.error(f'Error forecasting ingredient demand: {str(e)}')
+        return jsonify({'error': 'Failed to forecast ingredient demand'}), 500
+    return jsonify(forecast), 200
+
 @admin_bp.route('/api/admin/stats')
 def get_stats():
     # Get total reservations
@@ -1,21 +1,59 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, jsonify, current_app
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from app import db
 from app.models import MenuItem, Order, OrderItem, Reservation
+from app.services.menu_cache import menu_cache
+from app.services.inventory_service import deduct_stock, InsufficientStock
+from app.routes.menu import parse_search_args, run_search
+from app.utils.http import not_modified
 
 customer_bp = Blueprint('customer', __name__)
 
-@customer_bp.route('/menu', methods=['GET'])
-def get_menu():
-    menu_items = MenuItem.query.filter_by(is_available=True).all()
-    return jsonify([{
+
+def _customer_menu_item(item):
+    return {
         'id': item.id,
         'name': item.name,
         'description': item.description,
         'price': float(item.price),
         'category': item.category,
         'image_url': item.image_url
-    } for item in menu_items])
+    }
+
+
+def _customer_search_item(item):
+    # Search isn't cached, so it can show the live count
+    return dict(_customer_menu_item(item), servings_possible=item.servings_possible)
+
+
+def _customer_menu():
+    return [_customer_menu_item(item) for item in MenuItem.query.filter_by(is_available=True, retired_at=None).filter(MenuItem.in_stock).all()]
+
+
+@customer_bp.route('/menu', methods=['GET'])
+def get_menu():
+    body, etag = menu_cache.get('customer', _customer_menu)
+    cached = not_modified(etag)
+    if cached is not None:
+        return cached
+    response = current_app.response_class(body, mimetype='application/json')
+    response.set_etag(etag)
+    return response
+
+
+@customer_bp.route('/menu/search', methods=['GET'])
+def search_menu():
+    """Same parameters as /api/menu/search, restricted to available items"""
+    try:
+        search_args = parse_search_args(request.args)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    search_args['available'] = True
+    try:
+        return jsonify(run_search(search_args, _customer_search_item)), 200
+    except Exception as e:
+        current_app.logger.error(f'Error searching menu: {str(e)}')
+        return jsonify({'error': 'Failed to search menu'}), 500
 
 @customer_bp.route('/orders', methods=['POST'])
 @jwt_required()
@@ -37,7 +75,7 @@ def create_order():
     total = 0
     for item in data.get('items', []):
         menu_item = MenuItem.query.get(item['menu_item_id'])
-        if not menu_item or not menu_item.is_available:
+        if not menu_item or not menu_item.is_available or menu_item.retired_at or not menu_item.in_stock:
             db.session.rollback()
             return jsonify({'error': f'Menu item {item["menu_item_id"]} not available'}), 400
             
@@ -52,6 +90,11 @@ def create_order():
     
     # Update order total
     order.total_amount = total
+    try:
+        deduct_stock(data.get('items', []), order.id)
+    except InsufficientStock as e:
+        db.session.rollback()
+        return jsonify({'error': str(e), 'shortages': e.shortages}), 400
     db.session.commit()
     
     return jsonify({'message': 'Order created successfully', 'order_id': order.id}), 201
@@ -1,8 +1,8 @@
 # backend/app/routes/dashboard.py
 from flask import Blueprint, jsonify
 from app.extensions import db
-from app.models import Order, MenuItem, Reservation, OrderItem
-from datetime import datetime, timedelta
+from app.models import Order, MenuItem, Reservation, OrderItem, SalesRollup
+from datetime import datetime
 from sqlalchemy import func
 
 
@@ -11,21 +11,14 @@ dashboard_bp = Blueprint('dashboard', __name__)
 @dashboard_bp.route('/stats')
 def get_dashboard_stats():
     try:
-        # Get today's date range
-        today = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
-        tomorrow = today + timedelta(days=1)
-        
+        # Today's revenue is one row of the daily sales rollup (UTC, like created_at)
+        today = datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
+
         print("Fetching today's revenue...")  # Debug log
-        # Calculate today's revenue by joining with order_items and summing (price * quantity)
-        today_revenue = db.session.query(
-            func.coalesce(func.sum(OrderItem.quantity * OrderItem.price), 0)
-        ).join(
-            Order, Order.id == OrderItem.order_id
-        ).filter(
-            Order.status == 'completed',
-            Order.created_at >= today,
-            Order.created_at < tomorrow
-        ).scalar()
+        today_revenue = db.session.query(SalesRollup.revenue).filter(
+            SalesRollup.period == 'day',
+            SalesRollup.bucket_start == today
+        ).scalar() or 0
 
         print("Counting active orders...")  # Debug log
         # Count active orders
@@ -35,18 +28,24 @@ def get_dashboard_stats():
 
         print("Counting menu items...")  # Debug log
         # Count menu items
-        menu_items = MenuItem.query.count()
+        menu_items = MenuItem.query.filter(MenuItem.retired_at.is_(None)).count()
 
         print("Fetching recent orders...")  # Debug log
-        # Get recent orders with their total calculated from order_items
+        # The five newest orders off the created_at index, then totals for just those
+        newest = db.session.query(func.max(Order.created_at)).scalar_subquery()
+        latest_ids = [order_id for order_id, in db.session.query(Order.id).filter(
+            Order.created_at <= newest
+        ).order_by(Order.created_at.desc(), Order.id.desc()).limit(5)]
         recent_orders = db.session.query(
             Order,
             func.coalesce(func.sum(OrderItem.quantity * OrderItem.price), 0).label('order_total')
         ).outerjoin(
             OrderItem, Order.id == OrderItem.order_id
+        ).filter(
+            Order.id.in_(latest_ids)
         ).group_by(Order.id).order_by(
-            Order.created_at.desc()
-        ).limit(5).all()
+            Order.created_at.desc(), Order.id.desc()
+        ).all()
 
         # Format recent orders
         formatted_orders = [{
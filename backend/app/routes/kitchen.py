@@ -1,39 +1,63 @@
 from flask import Blueprint, jsonify, request
 from app.extensions import db
-from app.models import Order, OrderItem, MenuItem
-from datetime import datetime
-from flask_jwt_extended import jwt_required
-from sqlalchemy import func
+from app.services.order_service import bulk_update_status, OrderStatusConflict
+from app.services.order_serializer import serialize_status_updates
+from app.services.kitchen_board import kitchen_board
+from app.services.prep_time import prep_time_stats
+from app.services.order_changes import current_change_cursor, settled_change_cursor, changed_order_ids, parse_since
+from app.utils.http import not_modified, with_change_cursor
+from app.socketio import emit_order_updated, emit_orders_updated, order_events, event_dispatcher
+from flask_jwt_extended import jwt_required, get_jwt_identity
 
 kitchen_bp = Blueprint('kitchen', __name__)
 
 @kitchen_bp.route('/orders', methods=['GET'])
 def get_kitchen_orders():
+    """Active tickets from the in-memory board.
+
+    Every response carries an ETag and an X-Change-Cursor header. Polling
+    with If-None-Match gets a bodiless 304 while nothing has changed, and
+    ?since=<cursor> returns only {'cursor', 'changed', 'removed'} for orders
+    touched after that cursor ('reset': true with the full list when the
+    cursor is older than the retained change log, a 400 with 'resync': true
+    when it isn't an integer or is ahead of the newest change). The cursor
+    handed back is the settled one (see order_changes), so orders changed
+    in the last few seconds can come back again on the next poll.
+    """
     try:
-        # Get all orders that are not completed or cancelled
-        orders = Order.query.filter(
-            Order.status.in_(['pending', 'preparing', 'ready'])
-        ).order_by(Order.created_at.asc()).all()
-
-        return jsonify([
-            {
-                'id': order.id,
-                'tableNumber': order.table_number,
-                'status': order.status,
-                'createdAt': order.created_at.isoformat() if order.created_at else None,
-                'items': [
-                    {
-                        'id': item.id,
-                        'name': item.menu_item.name if item.menu_item else 'Unknown Item',
-                        'quantity': item.quantity,
-                        'specialRequests': item.special_requests,
-                        'estimatedTime': 15  # Default preparation time in minutes
-                    }
-                    for item in order.order_items
-                ]
-            }
-            for order in orders
-        ]), 200
+        settled = settled_change_cursor()
+        head = current_change_cursor()
+        settled = min(settled, head)
+        try:
+            since = parse_since(request.args.get('since'), head)
+        except ValueError as e:
+            return jsonify({'error': f'{e}; refetch without since', 'resync': True}), 400
+        cursor = max(settled, since or 0)
+        etag = f'kitchen-{settled}-{head}' if since is None else f'kitchen-{since}-{settled}-{head}'
+        cached = not_modified(etag)
+        if cached is not None:
+            return cached
+
+        # Pick up orders changed by other worker processes
+        kitchen_board.sync(head, settled)
+        prep_time_stats.sync(head, settled)
+        if since is None:
+            response = jsonify(kitchen_board.tickets())
+        else:
+            order_ids = changed_order_ids(since, head)
+            if order_ids is None:
+                cursor = settled
+                response = jsonify({'cursor': cursor, 'reset': True,
+                                    'changed': kitchen_board.tickets(), 'removed': []})
+            else:
+                changed = kitchen_board.tickets(order_ids)
+                response = jsonify({
+                    'cursor': cursor,
+                    'changed': changed,
+                    # Finished, cancelled or archived orders drop off the board
+                    'removed': sorted(order_ids - {ticket['id'] for ticket in changed})
+                })
+        return with_change_cursor(response, etag, cursor), 200
 
     except Exception as e:
         return jsonify({'error': str(e)}), 500
@@ -48,19 +72,52 @@ def update_order_status(order_id):
         if new_status not in ['preparing', 'ready']:
             return jsonify({'error': 'Invalid status'}), 400
 
-        order = Order.query.get_or_404(order_id)
-        order.status = new_status
-        order.updated_at = datetime.utcnow()
+        updated, errors = bulk_update_status([{'order_id': order_id, 'status': new_status}])
+        if errors:
+            return jsonify({'error': 'Order not found'}), 404
         db.session.commit()
 
+        emit_order_updated(serialize_status_updates(updated)[0])
+
         return jsonify({
             'message': 'Order status updated',
             'order': {
-                'id': order.id,
-                'status': order.status
+                'id': order_id,
+                'status': new_status
             }
         }), 200
 
+    except OrderStatusConflict as e:
+        db.session.rollback()
+        return jsonify({'error': str(e), 'conflicts': e.order_ids}), 409
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 500
+
+
+@kitchen_bp.route('/orders/status', methods=['PUT'])
+def bulk_update_order_status():
+    try:
+        data = request.get_json()
+        updates = data.get('updates') if data else None
+        if not isinstance(updates, list) or not updates:
+            return jsonify({'error': 'updates must be a non-empty list'}), 400
+
+        updated, errors = bulk_update_status(updates, allowed_statuses=['preparing', 'ready'])
+        db.session.commit()
+
+        if updated:
+            emit_orders_updated(serialize_status_updates(updated))
+
+        return jsonify({
+            'message': 'Order statuses updated',
+            'updated': updated,
+            'errors': errors
+        }), 200
+
+    except OrderStatusConflict as e:
+        db.session.rollback()
+        return jsonify({'error': str(e), 'conflicts': e.order_ids}), 409
     except Exception as e:
         db.session.rollback()
         return jsonify({'error': str(e)}), 500
@@ -69,23 +126,56 @@ def update_order_status(order_id):
 @kitchen_bp.route('/stats', methods=['GET'])
 def get_kitchen_stats():
     try:
+        settled = settled_change_cursor()
+        head = current_change_cursor()
         # Count orders by status
-        status_counts = db.session.query(
-            Order.status,
-            func.count(Order.id)
-        ).filter(
-            Order.status.in_(['pending', 'preparing', 'ready'])
-        ).group_by(Order.status).all()
+        kitchen_board.sync(head, settled)
+        status_counts_dict = kitchen_board.status_counts()
 
-        # Convert safely to a dict
-        status_counts_dict = {status: count for status, count in status_counts}
-
-        # Placeholder average time
-        avg_prep_time = 15
+        # Streaming prep-time statistics, maintained as orders reach 'ready'
+        prep_time_stats.sync(head, settled)
+        prep_time = prep_time_stats.summary()
 
         return jsonify({
             'statusCounts': status_counts_dict,
-            'avgPrepTime': avg_prep_time
+            'avgPrepTime': prep_time['avg'],
+            'prepTime': prep_time,
+            'realtime': dict(order_events.stats(), dispatch=event_dispatcher.stats())
+        }), 200
+
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
+@kitchen_bp.route('/board/verify', methods=['GET'])
+@jwt_required()
+def verify_kitchen_board():
+    """Compare the in-memory board with the database without changing it"""
+    if get_jwt_identity()['role'] not in ['admin', 'kitchen']:
+        return jsonify({'error': 'Unauthorized'}), 403
+    try:
+        drift = kitchen_board.verify()
+        return jsonify({
+            'consistent': not any(drift.values()),
+            **drift
+        }), 200
+
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
+@kitchen_bp.route('/board/repair', methods=['POST'])
+@jwt_required()
+def repair_kitchen_board():
+    """Replace the in-memory board with a fresh load; reports the drift it fixed"""
+    if get_jwt_identity()['role'] not in ['admin', 'kitchen']:
+        return jsonify({'error': 'Unauthorized'}), 403
+    try:
+        drift = kitchen_board.verify(repair=True)
+        return jsonify({
+            'consistent': not any(drift.values()),
+            'repaired': True,
+            **drift
         }), 200
 
     except Exception as e:
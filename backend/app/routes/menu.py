@@ -1,25 +1,132 @@
 # backend/app/routes/menu.py
-from flask import Blueprint, request, jsonify
-from app.models import MenuItem, db, OrderItem
+from flask import Blueprint, request, jsonify, current_app
+from app.models import MenuItem, db
+from app.services.menu_cache import menu_cache, bump_menu_version
+from app.services.menu_retirement import retire_menu_items, restore_menu_items
+from app.services.menu_search import search_menu
+from app.utils.http import not_modified
+from app.utils.pagination import parse_limit, encode_cursor, decode_cursor
 from datetime import datetime
+import hashlib
 
 menu_bp = Blueprint("menu", __name__)
 
+
+def _menu_item_payload(item):
+    return {
+        "id": item.id,
+        "name": item.name,
+        "description": item.description,
+        "price": float(item.price),
+        "category": item.category,
+        "is_available": item.is_available,
+        "image_url": item.image_url,
+        # Only whether it can be ordered: the count moves with every sale
+        # and would keep invalidating the cached menu (see /servings)
+        "in_stock": item.in_stock,
+        "created_at": item.created_at.isoformat() if item.created_at else None,
+        "updated_at": item.updated_at.isoformat() if item.updated_at else None,
+        "retired_at": item.retired_at.isoformat() if item.retired_at else None
+    }
+
+
+def _menu_item_search_payload(item):
+    return dict(_menu_item_payload(item), servings_possible=item.servings_possible)
+
+
+def _full_menu():
+    return [_menu_item_payload(item) for item in MenuItem.query.filter(MenuItem.retired_at.is_(None))]
+
+
+def _full_menu_with_retired():
+    return [_menu_item_payload(item) for item in MenuItem.query.all()]
+
+
+def parse_search_args(args):
+    """Search filters from query parameters; raises ValueError on bad input"""
+    available = args.get('available')
+    if available not in (None, '', 'true', 'false'):
+        raise ValueError('available must be true or false')
+    q = (args.get('q') or '').strip() or None
+    cursor = args.get('cursor')
+    if cursor:
+        # Ranked pages resume from (rank, id), plain ones from (id,)
+        cursor = decode_cursor(cursor, (int, float), int) if q else decode_cursor(cursor, int)
+    return {
+        'q': q,
+        'categories': [c for c in (args.get('category') or '').split(',') if c],
+        'available': None if available in (None, '') else available == 'true',
+        'min_price': float(args['min_price']) if args.get('min_price') else None,
+        'max_price': float(args['max_price']) if args.get('max_price') else None,
+        'limit': parse_limit(args.get('limit'), default=20, maximum=100),
+        'cursor': cursor or None,
+    }
+
+
+def run_search(search_args, payload):
+    """One page of search results as {'items', 'next_cursor'}"""
+    items, ranks, next_cursor = search_menu(**search_args)
+    return {
+        'items': [dict(payload(item), rank=rank) if rank is not None else payload(item)
+                  for item, rank in zip(items, ranks)],
+        'next_cursor': encode_cursor(*next_cursor) if next_cursor else None
+    }
+
+
+@menu_bp.route("/search", methods=["GET"])
+def search_menu_items():
+    """Full-text search over name and description.
+
+    ?q= (prefix match on every word, ranked by the full-text index),
+    ?category=a,b, ?available=true|false, ?min_price= / ?max_price=,
+    ?limit= and ?cursor= for keyset pagination.
+    """
+    try:
+        search_args = parse_search_args(request.args)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    try:
+        return jsonify(run_search(search_args, _menu_item_search_payload)), 200
+    except Exception as e:
+        current_app.logger.error(f'Error searching menu: {str(e)}')
+        return jsonify({"error": "Failed to search menu"}), 500
+
+
+@menu_bp.route("/servings", methods=["GET"])
+def get_menu_servings():
+    """
+    {menu item id: servings possible} for stock-tracked items on the menu.
+    Kept out of the cached menu bodies and read fresh on every request;
+    304 for a matching If-None-Match.
+    """
+    servings = {str(item_id): count for item_id, count in db.session.query(
+        MenuItem.id, MenuItem.servings_possible
+    ).filter(MenuItem.retired_at.is_(None), MenuItem.servings_possible.isnot(None)).order_by(MenuItem.id)}
+    body = current_app.json.dumps(servings).encode('utf-8')
+    etag = hashlib.sha256(body).hexdigest()[:32]
+    cached = not_modified(etag)
+    if cached is not None:
+        return cached
+    response = current_app.response_class(body, mimetype='application/json')
+    response.set_etag(etag)
+    return response
+
+
 @menu_bp.route("/", methods=["GET", "POST"])
 def handle_menu():
     if request.method == "GET":
-        menu_items = MenuItem.query.all()
-        return jsonify([{
-            "id": item.id,
-            "name": item.name,
-            "description": item.description,
-            "price": float(item.price),
-            "category": item.category,
-            "is_available": item.is_available,
-            "image_url": item.image_url,
-            "created_at": item.created_at.isoformat() if item.created_at else None,
-            "updated_at": item.updated_at.isoformat() if item.updated_at else None
-        } for item in menu_items])
+        # Pre-serialized until the menu version moves; 304 for a matching If-None-Match.
+        # Retired items are left out unless ?include_retired=true
+        if request.args.get('include_retired') == 'true':
+            body, etag = menu_cache.get('full_with_retired', _full_menu_with_retired)
+        else:
+            body, etag = menu_cache.get('full', _full_menu)
+        cached = not_modified(etag)
+        if cached is not None:
+            return cached
+        response = current_app.response_class(body, mimetype='application/json')
+        response.set_etag(etag)
+        return response
     
     elif request.method == "POST":
         data = request.get_json()
@@ -41,6 +148,7 @@ def handle_menu():
             )
             
             db.session.add(new_item)
+            bump_menu_version()
             db.session.commit()
             
             return jsonify({
@@ -63,11 +171,12 @@ def handle_menu():
 def get_menu_item_inventory(item_id):
     menu_item = MenuItem.query.get_or_404(item_id)
     inventory = [{
-        "id": inv.id,
-        "name": inv.name,
-        "quantity": float(inv.quantity),
-        "unit": inv.unit
-    } for inv in menu_item.inventory_items]
+        "id": ingredient.inventory_item.id,
+        "name": ingredient.inventory_item.name,
+        "quantity": round(ingredient.inventory_item.stock, 6) or 0.0,
+        "unit": ingredient.inventory_item.unit,
+        "per_portion": ingredient.quantity
+    } for ingredient in menu_item.recipe]
     
     return jsonify(inventory)
 
@@ -101,6 +210,14 @@ def update_menu_item(item_id):
     item.updated_at = datetime.utcnow()
     
     try:
+        if 'retired' in data:
+            db.session.flush()
+            if data['retired']:
+                retire_menu_items([item.id])
+            else:
+                restore_menu_items([item.id])
+            db.session.refresh(item)
+        bump_menu_version()
         db.session.commit()
         return jsonify({
             'id': item.id,
@@ -110,24 +227,22 @@ def update_menu_item(item_id):
             'category': item.category,
             'image_url': item.image_url,
             'is_available': item.is_available,
+            'servings_possible': item.servings_possible,
             'created_at': item.created_at.isoformat() if item.created_at else None,
-            'updated_at': item.updated_at.isoformat() if item.updated_at else None
+            'updated_at': item.updated_at.isoformat() if item.updated_at else None,
+            'retired_at': item.retired_at.isoformat() if item.retired_at else None
         }), 200
     except Exception as e:
         db.session.rollback()
         return jsonify({'error': str(e)}), 500
 
 def delete_menu_item(item_id):
+    # Retire rather than delete, so orders keep their line items; purging is
+    # DELETE /api/admin/menu/<id> or `flask purge-menu-items`
+    if not db.session.query(MenuItem.id).filter(MenuItem.id == item_id).scalar():
+        return jsonify({'error': 'Menu item not found'}), 404
     try:
-        # First, find and delete related order items
-        related_order_items = OrderItem.query.filter_by(menu_item_id=item_id).all()
-        
-        for order_item in related_order_items:
-            db.session.delete(order_item)
-        
-        # Then delete the menu item
-        item = MenuItem.query.get_or_404(item_id)
-        db.session.delete(item)
+        retire_menu_items([item_id])
         db.session.commit()
         
         return '', 204
@@ -147,8 +262,10 @@ def get_menu_item(item_id):
             'category': item.category,
             'image_url': item.image_url,
             'is_available': item.is_available,
+            'servings_possible': item.servings_possible,
             'created_at': item.created_at.isoformat() if item.created_at else None,
-            'updated_at': item.updated_at.isoformat() if item.updated_at else None
+            'updated_at': item.updated_at.isoformat() if item.updated_at else None,
+            'retired_at': item.retired_at.isoformat() if item.retired_at else None
         }), 200
     except Exception as e:
         return jsonify({'error': str(e)}), 500
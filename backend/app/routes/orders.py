@@ -1,18 +1,83 @@
 # app/routes/orders.py
+import hashlib
+import json
+import uuid
+from datetime import datetime
 from flask import Blueprint, request, jsonify, current_app
 from app.extensions import db
-from app.models import Order, OrderItem, MenuItem, User
-from app.socketio import emit_order_created, emit_order_updated
-from datetime import datetime
+from app.models import Order, OrderHistory, User
+from app.socketio import emit_order_created, emit_order_updated, emit_orders_updated
+from app.services.order_service import (
+    fetch_menu_items, prepare_order_lines, insert_order_lines, bulk_update_status,
+    MenuItemsUnavailable, OrderStatusConflict, ORDER_STATUSES
+)
+from app.services.order_serializer import (
+    order_rows, history_order_rows, serialize_orders, serialize_status_updates,
+    serialize_new_order
+)
+from app.services.order_ingest import IngestQueueFull, IngestTimeout, IngestFailed
+from app.services.order_changes import (
+    record_order_changes, current_change_cursor, settled_change_cursor, changed_order_ids, parse_since
+)
+from app.services.archive_service import archived_through
+from app.services.inventory_service import deduct_stock, InsufficientStock
+from app.utils.pagination import parse_limit, parse_datetime, encode_cursor, decode_cursor
+from app.utils.http import not_modified, with_change_cursor
+from app.utils.order_tokens import make_order_token
 from flask_jwt_extended import jwt_required, get_jwt_identity
+from sqlalchemy import and_, func, or_
+from sqlalchemy.exc import IntegrityError
 
 orders_bp = Blueprint('orders', __name__)
 
+IDEMPOTENCY_KEY_MAX_LENGTH = 64
+
+
+def _existing_order(idempotency_key):
+    """Payload of the order an earlier request with this Idempotency-Key created, or None"""
+    row = order_rows().filter(Order.idempotency_key == idempotency_key).first()
+    return serialize_orders([row])[0] if row else None
+
+
+def _created_response(order_data, status=201):
+    # Create a review link with the order ID
+    review_link = f"{request.host_url.rstrip('/')}/reviews?orderId={order_data['id']}"
+
+    response = {
+        'message': 'Order created successfully',
+        'order_id': order_data['id'],
+        'order': order_data,
+        'review_link': review_link
+    }
+    if order_data.get('customer_id') is None:
+        # Guests follow their order's updates over Socket.IO with this token
+        response['tracking_token'] = make_order_token(order_data['id'])
+    return jsonify(response), status
+
 @orders_bp.route('/', methods=['GET'])
 def get_orders():
+    """List orders, newest first.
+
+    Optional filters: ?status=pending,preparing, ?from=/?to= (ISO dates on
+    created_at). Passing ?limit= or ?cursor= switches to paginated mode, which
+    returns {'orders': [...], 'next_cursor': ...} using a keyset cursor on
+    (created_at, id) so deep pages cost the same as the first one.
+
+    Archived orders live in orders_history; it is only unioned in when
+    ?from= reaches back to the newest archived order.
+
+    Responses carry an ETag and an X-Change-Cursor header; If-None-Match
+    polls get a 304 while no order has changed. ?since=<cursor> returns
+    {'cursor', 'changed', 'removed'} with only the orders touched after that
+    cursor, where 'removed' lists ids that left the filtered view. A since
+    that isn't an integer, or is ahead of the newest change, gets a 400
+    with 'resync': true. The cursor lags the newest change by a few
+    seconds (see order_changes), so recently changed orders may be sent
+    again on the next poll.
+    """
     try:
         # Default to showing all orders
-        orders_query = Order.query
+        customer_filter = None
         
         # If there's a valid JWT token, filter orders based on user role
         try:
@@ -25,29 +90,119 @@ def get_orders():
                     pass
                 else:
                     # Regular users only see their own orders
-                    orders_query = orders_query.filter(Order.customer_id == current_user_id)
+                    customer_filter = current_user_id
         except:
             # No valid token, continue with showing all orders
             pass
-            
-        orders = orders_query.order_by(Order.created_at.desc()).all()
-            
-        return jsonify([{
-            'id': order.id,
-            'customer_id': order.customer_id,
-            'customer_name': order.customer_name,
-            'status': order.status,
-            'table_number': order.table_number,
-            'created_at': order.created_at.isoformat(),
-            'items': [{
-                'id': item.id,
-                'menu_item_id': item.menu_item_id,
-                'name': item.menu_item.name if item.menu_item else 'Unknown',
-                'quantity': item.quantity,
-                'price': float(item.price) if item.price else 0.0,
-                'special_requests': item.special_requests
-            } for item in order.order_items]
-        } for order in orders]), 200
+
+        paginated = 'limit' in request.args or 'cursor' in request.args
+        try:
+            statuses = [s for s in request.args.get('status', '').split(',') if s]
+            date_from = parse_datetime(request.args.get('from'))
+            date_to = parse_datetime(request.args.get('to'))
+            limit = parse_limit(request.args.get('limit'))
+            cursor = request.args.get('cursor')
+            if cursor:
+                cursor_created_at, cursor_id = decode_cursor(cursor, datetime, int)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+
+        # Hand out the settled cursor but send everything up to the head
+        settled = settled_change_cursor()
+        head = current_change_cursor()
+        settled = min(settled, head)
+        try:
+            since = parse_since(request.args.get('since'), head)
+        except ValueError as e:
+            return jsonify({'error': f'{e}; refetch without since', 'resync': True}), 400
+        change_cursor = max(settled, since or 0)
+        view = json.dumps([
+            customer_filter, sorted(set(statuses)),
+            date_from.isoformat() if date_from else None, date_to.isoformat() if date_to else None,
+            limit if paginated else None, cursor or None
+        ])
+        etag = f'orders-{hashlib.sha1(view.encode()).hexdigest()[:16]}-{since}-{settled}-{head}'
+        cached = not_modified(etag)
+        if cached is not None:
+            return cached
+
+        def apply_filters(query, model):
+            if customer_filter is not None:
+                query = query.filter(model.customer_id == customer_filter)
+            if statuses:
+                query = query.filter(model.status.in_(statuses))
+            if date_from:
+                query = query.filter(model.created_at >= date_from)
+            if date_to:
+                query = query.filter(model.created_at < date_to)
+            if cursor:
+                query = query.filter(or_(
+                    model.created_at < cursor_created_at,
+                    and_(model.created_at == cursor_created_at, model.id < cursor_id)
+                ))
+            else:
+                # Start the first page at the newest row so it is an index
+                # range read, like the pages after it, not an ordered scan
+                query = query.filter(model.created_at <= db.session.query(
+                    func.max(model.created_at)
+                ).scalar_subquery())
+            return query
+
+        if since is not None:
+            order_ids = changed_order_ids(since, head)
+            if order_ids is not None:
+                rows = apply_filters(order_rows(), Order).filter(
+                    Order.id.in_(order_ids)
+                ).order_by(Order.created_at.desc(), Order.id.desc()).all()
+                removed = order_ids - {row.id for row in rows}
+                if customer_filter is not None and removed:
+                    # Only report removals of the customer's own orders
+                    removed = {row.id for row in order_rows(Order.id).filter(
+                        Order.id.in_(removed), Order.customer_id == customer_filter
+                    ).union_all(history_order_rows(Order.id).filter(
+                        OrderHistory.id.in_(removed), OrderHistory.customer_id == customer_filter
+                    ))}
+                response = jsonify({
+                    'cursor': change_cursor,
+                    'changed': serialize_orders(rows),
+                    'removed': sorted(removed)
+                })
+                response.vary.add('Authorization')
+                return with_change_cursor(response, etag, change_cursor), 200
+
+        orders_query = apply_filters(order_rows(), Order)
+        include_history = False
+        if date_from:
+            newest_archived = archived_through()
+            include_history = newest_archived is not None and date_from <= newest_archived
+        if include_history:
+            orders_query = orders_query.union_all(apply_filters(history_order_rows(), OrderHistory))
+
+        orders_query = orders_query.order_by(Order.created_at.desc(), Order.id.desc())
+
+        if paginated:
+            orders = orders_query.limit(limit + 1).all()
+            has_more = len(orders) > limit
+            orders = orders[:limit]
+        else:
+            orders = orders_query.all()
+
+        # One query for the orders, one for all of their items
+        payload = serialize_orders(orders, include_history=include_history)
+
+        if since is not None:
+            # The cursor is older than the retained change log: resend everything
+            change_cursor = settled
+            response = jsonify({'cursor': change_cursor, 'reset': True, 'changed': payload, 'removed': []})
+        elif not paginated:
+            response = jsonify(payload)
+        else:
+            next_cursor = None
+            if has_more and orders:
+                next_cursor = encode_cursor(orders[-1].created_at, orders[-1].id)
+            response = jsonify({'orders': payload, 'next_cursor': next_cursor})
+        response.vary.add('Authorization')
+        return with_change_cursor(response, etag, change_cursor), 200
     except Exception as e:
         current_app.logger.error(f'Error fetching orders: {str(e)}')
         return jsonify({'error': 'Failed to fetch orders'}), 500
@@ -57,31 +212,20 @@ def get_orders():
 @jwt_required()
 def get_order(order_id):
     try:
-        current_user_id = get_jwt_identity()
-        user = User.query.get(current_user_id)
+        identity = get_jwt_identity()
         
-        order = Order.query.get_or_404(order_id)
+        order = order_rows().filter(Order.id == order_id).first()
+        archived = order is None
+        if archived:
+            order = history_order_rows().filter(OrderHistory.id == order_id).first()
+        if not order:
+            return jsonify({'error': 'Order not found'}), 404
         
         # Check if user has permission to view this order
-        if user.role not in ['admin', 'kitchen'] and order.customer_id != current_user_id:
+        if identity['role'] not in ['admin', 'kitchen'] and order.customer_id != identity['id']:
             return jsonify({'error': 'Unauthorized'}), 403
             
-        return jsonify({
-            'id': order.id,
-            'customer_id': order.customer_id,
-            'customer_name': order.customer_name,
-            'status': order.status,
-            'table_number': order.table_number,
-            'created_at': order.created_at.isoformat(),
-            'items': [{
-                'id': item.id,
-                'menu_item_id': item.menu_item_id,
-                'name': item.menu_item.name if item.menu_item else 'Unknown',
-                'quantity': item.quantity,
-                'price': float(item.price) if item.price else 0.0,
-                'special_requests': item.special_requests
-            } for item in order.order_items]
-        }), 200
+        return jsonify(serialize_orders([order], include_history=archived)[0]), 200
     except Exception as e:
         current_app.logger.error(f'Error fetching order {order_id}: {str(e)}')
         return jsonify({'error': 'Failed to fetch order'}), 500
@@ -91,45 +235,24 @@ def get_order(order_id):
 @jwt_required()
 def update_order_status(order_id):
     try:
-        current_user_id = get_jwt_identity()
-        user = User.query.get(current_user_id)
-        
         # Only admin and kitchen staff can update order status
-        if user.role not in ['admin', 'kitchen']:
+        if get_jwt_identity()['role'] not in ['admin', 'kitchen']:
             return jsonify({'error': 'Unauthorized'}), 403
             
         data = request.get_json()
         new_status = data.get('status')
         
-        if not new_status or new_status not in ['pending', 'preparing', 'ready', 'served', 'completed', 'cancelled']:
+        if not new_status or new_status not in ORDER_STATUSES:
             return jsonify({'error': 'Invalid status'}), 400
             
-        order = Order.query.get_or_404(order_id)
-        old_status = order.status
-        order.status = new_status
-        
-        # Update updated_at timestamp
-        order.updated_at = datetime.utcnow()
+        updated, errors = bulk_update_status([{'order_id': order_id, 'status': new_status}])
+        if errors:
+            return jsonify({'error': 'Order not found'}), 404
         
         db.session.commit()
         
         # Prepare order data for WebSocket
-        order_data = {
-            'id': order.id,
-            'customer_id': order.customer_id,
-            'customer_name': order.customer_name,
-            'status': order.status,
-            'table_number': order.table_number,
-            'previous_status': old_status,
-            'updated_at': order.updated_at.isoformat(),
-            'items': [{
-                'id': item.id,
-                'menu_item_id': item.menu_item_id,
-                'name': item.menu_item.name if item.menu_item else 'Unknown',
-                'quantity': item.quantity,
-                'price': float(item.price) if item.price else 0.0
-            } for item in order.order_items]
-        }
+        order_data = serialize_status_updates(updated)[0]
         
         # Emit WebSocket event
         emit_order_updated(order_data)
@@ -138,16 +261,66 @@ def update_order_status(order_id):
             'message': 'Order status updated successfully',
             'order': order_data
         }), 200
-        
+
+    except OrderStatusConflict as e:
+        db.session.rollback()
+        return jsonify({'error': str(e), 'conflicts': e.order_ids}), 409
     except Exception as e:
         db.session.rollback()
         current_app.logger.error(f'Error updating order status: {str(e)}')
         return jsonify({'error': 'Failed to update order status'}), 500
 
+@orders_bp.route('/status', methods=['PATCH'])
+@jwt_required()
+def bulk_update_order_status():
+    """Apply many status changes at once: {'updates': [{'order_id', 'status'}, ...]}"""
+    try:
+        # Only admin and kitchen staff can update order status
+        if get_jwt_identity()['role'] not in ['admin', 'kitchen']:
+            return jsonify({'error': 'Unauthorized'}), 403
+
+        data = request.get_json()
+        updates = data.get('updates') if data else None
+        if not isinstance(updates, list) or not updates:
+            return jsonify({'error': 'updates must be a non-empty list'}), 400
+
+        updated, errors = bulk_update_status(updates)
+        db.session.commit()
+
+        if updated:
+            emit_orders_updated(serialize_status_updates(updated))
+
+        return jsonify({'updated': updated, 'errors': errors}), 200
+
+    except OrderStatusConflict as e:
+        db.session.rollback()
+        return jsonify({'error': str(e), 'conflicts': e.order_ids}), 409
+    except Exception as e:
+        db.session.rollback()
+        current_app.logger.error(f'Error bulk updating order status: {str(e)}')
+        return jsonify({'error': 'Failed to update order status'}), 500
+
 @orders_bp.route('/create', methods=['POST'])
 def create_order():
+    """
+    Place an order. An Idempotency-Key header makes retries safe: a repeat
+    of a request whose order exists gets that order back with a 200.
+
+    In group-commit mode every order gets a key (the client's or a new one)
+    and a request that outlasts the writer's timeout gets a 202 with it, as
+    the order may still commit; when intake is busy or the batch failed it
+    is a 503. Either way, retry with the same key.
+    """
     try:
         data = request.get_json()
+
+        idempotency_key = request.headers.get('Idempotency-Key') or None
+        if idempotency_key and len(idempotency_key) > IDEMPOTENCY_KEY_MAX_LENGTH:
+            return jsonify({'error': f'Idempotency-Key must be at most {IDEMPOTENCY_KEY_MAX_LENGTH} characters'}), 400
+        if idempotency_key:
+            order_data = _existing_order(idempotency_key)
+            if order_data:
+                return _created_response(order_data, 200)
         
         # Check if this is a guest order or authenticated user
         is_guest = data.get('is_guest_order', True)
@@ -182,59 +355,70 @@ def create_order():
                 table_number=data.get('table_number', 1),
                 is_guest_order=False
             )
-        db.session.add(order)
-        db.session.flush()  # Get the order ID
-        
-        order_items = []
-        for item in data['items']:
-            menu_item = MenuItem.query.get(item['menu_item_id'])
-            if not menu_item:
-                continue
-                
-            # Use provided price if available, otherwise use menu item price
-            item_price = item.get('price', menu_item.price)
-            
-            order_item = OrderItem(
-                order_id=order.id,
-                menu_item_id=item['menu_item_id'],
-                quantity=item['quantity'],
-                price=item_price,
-                special_requests=item.get('special_requests', '')
-            )
-            db.session.add(order_item)
-            order_items.append({
-                'id': order_item.id,
-                'name': menu_item.name,
-                'quantity': order_item.quantity,
-                'price': float(order_item.price),
-                'special_requests': order_item.special_requests
-            })
-        
-        db.session.commit()
-        
-        # Prepare order data for WebSocket
-        order_data = {
-            'id': order.id,
-            'customer_id': order.customer_id,
-            'customer_name': order.customer_name,
-            'status': order.status,
-            'table_number': order.table_number,
-            'created_at': order.created_at.isoformat(),
-            'items': order_items
-        }
-        
-        # Emit WebSocket event
-        emit_order_created(order_data)
-        
-        # Create a review link with the order ID
-        review_link = f"{request.host_url.rstrip('/')}/reviews?orderId={order.id}"
-        
-        return jsonify({
-            'message': 'Order created successfully', 
-            'order_id': order.id,
-            'order': order_data,
-            'review_link': review_link
-        }), 201
+        # Resolve every referenced menu item in one query before touching the order
+        menu_items = fetch_menu_items(item['menu_item_id'] for item in data['items'])
+        try:
+            lines = prepare_order_lines(data['items'], menu_items)
+        except MenuItemsUnavailable as e:
+            return jsonify({'error': str(e), 'unavailable': e.menu_item_ids}), 400
+
+        ingestor = current_app.extensions.get('order_ingestor')
+        if ingestor:
+            # Group-commit mode: the ingestion writer persists the order with
+            # others from the same batch and broadcasts the batch itself.
+            # Hand this request's connection back first; otherwise a burst of
+            # waiting requests can hold the whole pool and starve the writer
+            order.idempotency_key = idempotency_key = idempotency_key or uuid.uuid4().hex
+            db.session.close()
+            try:
+                order_data, created = ingestor.submit(order, lines)
+            except IngestTimeout:
+                response = jsonify({
+                    'message': 'Order received and still being saved; retry with the same Idempotency-Key to get it',
+                    'idempotency_key': idempotency_key
+                })
+                response.headers['Retry-After'] = '1'
+                return response, 202
+            except (IngestQueueFull, IngestFailed):
+                response = jsonify({
+                    'error': 'Order intake is busy, please retry with the same Idempotency-Key',
+                    'idempotency_key': idempotency_key
+                })
+                response.headers['Retry-After'] = '1'
+                return response, 503
+            except InsufficientStock as e:
+                return jsonify({'error': str(e), 'shortages': e.shortages}), 400
+            if not created:
+                return _created_response(order_data, 200)
+        else:
+            order.idempotency_key = idempotency_key
+            db.session.add(order)
+            try:
+                db.session.flush()  # Get the order ID
+            except IntegrityError:
+                # A concurrent request with the same key got there first
+                db.session.rollback()
+                order_data = _existing_order(idempotency_key) if idempotency_key else None
+                if order_data is None:
+                    raise
+                return _created_response(order_data, 200)
+            try:
+                deduct_stock(lines, order.id)
+            except InsufficientStock as e:
+                db.session.rollback()
+                return jsonify({'error': str(e), 'shortages': e.shortages}), 400
+            insert_order_lines(order.id, lines)
+            record_order_changes([order.id], 'created')
+
+            # Prepare order data for WebSocket
+            order_data = serialize_new_order(order, lines)
+
+            db.session.commit()
+
+            # Emit WebSocket event
+            emit_order_created(order_data)
+
+        return _created_response(order_data)
     except Exception as e:
         db.session.rollback()
         current_app.logger.error(f'Error creating order: {str(e)}')
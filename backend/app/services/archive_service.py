@@ -0,0 +1,81 @@
+import time
+from datetime import datetime, timedelta
+from sqlalchemy import delete, func, insert, literal, select
+from app.models import Order, OrderItem, OrderHistory, OrderItemHistory
+from app.services.order_changes import record_order_changes
+from app.extensions import db
+
+FINISHED_STATUSES = ['completed', 'cancelled']
+
+_ORDER_COLUMNS = [
+    'id', 'customer_id', 'customer_name', 'customer_phone', 'customer_email',
+    'customer_address', 'status', 'table_number', 'is_guest_order',
+    'created_at', 'updated_at', 'notes'
+]
+_ORDER_ITEM_COLUMNS = [
+    'id', 'order_id', 'menu_item_id', 'quantity', 'price', 'special_requests', 'created_at'
+]
+
+
+def archive_horizon(app_config, now=None):
+    """Orders created before this moment may live in orders_history"""
+    days = app_config.get('ORDER_ARCHIVE_AFTER_DAYS', 7)
+    return (now or datetime.utcnow()) - timedelta(days=days)
+
+
+def archived_through():
+    """
+    created_at of the newest archived order, or None while orders_history is
+    empty. Read from the table rather than the config, since an archive run
+    may have used a different cutoff.
+    """
+    return db.session.query(func.max(OrderHistory.created_at)).scalar()
+
+
+def archive_finished_orders(cutoff, chunk_size=500, pause=0.1, max_chunks=None):
+    """
+    Moves completed/cancelled orders last touched before `cutoff`, with their
+    order_items, into the history tables.
+
+    Each chunk is copied with INSERT ... SELECT and removed with set-based
+    DELETEs in its own transaction, with `pause` seconds between chunks so
+    a large backlog does not hold locks against live traffic. Reviews keep
+    pointing at the same order id. Returns the number of orders archived.
+    """
+    archived = 0
+    chunks = 0
+    while max_chunks is None or chunks < max_chunks:
+        order_ids = [row.id for row in db.session.query(Order.id).filter(
+            Order.status.in_(FINISHED_STATUSES),
+            Order.updated_at < cutoff
+        ).order_by(Order.id).limit(chunk_size)]
+        if not order_ids:
+            break
+
+        now = datetime.utcnow()
+        try:
+            db.session.execute(insert(OrderHistory).from_select(
+                _ORDER_COLUMNS + ['archived_at'],
+                select(*[getattr(Order, c) for c in _ORDER_COLUMNS], literal(now))
+                .where(Order.id.in_(order_ids))
+            ))
+            db.session.execute(insert(OrderItemHistory).from_select(
+                _ORDER_ITEM_COLUMNS,
+                select(*[getattr(OrderItem, c) for c in _ORDER_ITEM_COLUMNS])
+                .where(OrderItem.order_id.in_(order_ids))
+            ))
+            db.session.execute(delete(OrderItem).where(OrderItem.order_id.in_(order_ids)))
+            db.session.execute(delete(Order).where(Order.id.in_(order_ids)))
+            record_order_changes(order_ids, 'removed')
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+
+        archived += len(order_ids)
+        chunks += 1
+        if len(order_ids) < chunk_size:
+            break
+        if pause:
+            time.sleep(pause)
+    return archived
@@ -0,0 +1,304 @@
+"""
+Ingredient demand forecasting from order history.
+
+Portions sold per menu item per day (or hour) come back from one grouped
+query over orders and orders_history as columnar arrays and are laid out as
+an items x buckets matrix. Every order placed and not cancelled counts,
+whatever its status, since stock is taken out when an order is placed;
+the sales rollups only count completed orders, so they aren't used here.
+Multiplying by the recipe matrix (ingredients x items) turns that into
+ingredient usage per bucket, and every forecast below is matrix
+arithmetic on that result rather than a Python loop over ingredients or
+days.
+
+Each ingredient's forecast for a future bucket is its exponentially
+weighted mean usage on the same weekday (hour of day for hourly buckets),
+so recent weeks count most and weekly patterns carry over. The current,
+unfinished bucket is left out of the history; what it has used so far is
+subtracted from its own forecast, since stock already reflects it.
+
+Sales are cached per process in two parts: the finished buckets, rebuilt
+when the current bucket ends or an earlier order is cancelled, and the
+current bucket, re-read (a small range query) once an order is placed,
+changes status or is archived. Recipes, stock and thresholds are read
+fresh on every call. Buckets are in UTC, like created_at.
+"""
+import threading
+from datetime import datetime, timedelta
+from itertools import chain
+import numpy as np
+from sqlalchemy import bindparam, cast, func, literal_column, select, union_all
+from app.models import InventoryItem, Order, OrderHistory, OrderItem, OrderItemHistory, RecipeIngredient
+from app.services.order_changes import current_change_cursor
+from app.services.sales_rollup import bucket_start
+from app.extensions import db
+
+BUCKET_SECONDS = {'day': 86400, 'hour': 3600}
+# Forecasts follow the weekday for daily buckets and the hour of day for hourly ones
+SEASON_LENGTH = {'day': 7, 'hour': 24}
+# Buckets after which a past bucket counts half as much
+HALF_LIFE = {'day': 28, 'hour': 14 * 24}
+# (history, horizon) in buckets when not given, and the most either may be
+DEFAULT_WINDOW = {'day': (365, 7), 'hour': (28 * 24, 24)}
+MAX_WINDOW = {'day': (730, 90), 'hour': (90 * 24, 7 * 24)}
+# Safety stock covers this many standard deviations of demand (about 95%)
+SERVICE_Z = 1.65
+
+
+def _bucket_index(created_at, seconds):
+    """Whole buckets between :start and a timestamp column, in SQL"""
+    dialect = db.engine.dialect.name
+    if dialect == 'sqlite':
+        offset = cast(func.strftime('%s', created_at), db.Integer) - bindparam('start_epoch', type_=db.Integer)
+    elif dialect == 'mysql':
+        offset = func.timestampdiff(
+            literal_column('SECOND'), bindparam('start', type_=db.DateTime), created_at, type_=db.Integer
+        )
+    else:
+        raise ValueError(f'No forecasting support for {dialect}')
+    # Integer division: / on SQLite, DIV on MySQL
+    return (offset // seconds).label('bucket')
+
+
+def _sales_statement(seconds):
+    """Portions per (menu item, bucket) for live and archived orders since :start, cancelled ones excluded"""
+    parts = []
+    for order_model, item_model in ((Order, OrderItem), (OrderHistory, OrderItemHistory)):
+        bucket = _bucket_index(order_model.created_at, seconds)
+        parts.append(
+            select(item_model.menu_item_id, bucket, func.sum(item_model.quantity))
+            .join(order_model, order_model.id == item_model.order_id)
+            .where(
+                order_model.created_at >= bindparam('start', type_=db.DateTime),
+                order_model.created_at < bindparam('end', type_=db.DateTime),
+                order_model.status != 'cancelled'
+            )
+            .group_by(item_model.menu_item_id, bucket)
+        )
+    return union_all(*parts)
+
+
+def _matrix(result, buckets):
+    """(menu_item_ids, items x buckets matrix) from (menu_item_id, bucket, portions) rows"""
+    columns = np.fromiter(chain.from_iterable(result), dtype=np.float64).reshape(-1, 3)
+    menu_item_ids, rows = np.unique(columns[:, 0].astype(np.int64), return_inverse=True)
+    slots = np.clip(columns[:, 1].astype(np.int64), 0, buckets - 1)
+    matrix = np.bincount(
+        rows * buckets + slots, weights=columns[:, 2], minlength=len(menu_item_ids) * buckets
+    ).reshape(len(menu_item_ids), buckets)
+    return menu_item_ids, matrix
+
+
+def _window(start, buckets, bucket):
+    seconds = BUCKET_SECONDS[bucket]
+    return {
+        'start': start,
+        'end': start + timedelta(seconds=seconds * buckets),
+        'start_epoch': int((start - datetime(1970, 1, 1)).total_seconds()),
+    }
+
+
+def sales_matrix(start, buckets, bucket):
+    """
+    Returns (menu_item_ids, matrix) where matrix[i, b] is the number of
+    portions of menu_item_ids[i] ordered in bucket b after `start`, from
+    the orders themselves. One query; the rows go straight into arrays.
+    """
+    result = db.session.execute(_sales_statement(BUCKET_SECONDS[bucket]), _window(start, buckets, bucket))
+    return _matrix(result, buckets)
+
+
+def recipe_matrix(menu_item_ids):
+    """Returns (inventory_item_ids, matrix) with matrix[j, i] the amount of ingredient j in one portion of item i"""
+    rows = db.session.query(
+        RecipeIngredient.inventory_item_id, RecipeIngredient.menu_item_id, RecipeIngredient.quantity
+    ).all()
+    columns = np.array(rows, dtype=np.float64).reshape(-1, 3)
+    inventory_item_ids, ingredient_rows = np.unique(columns[:, 0].astype(np.int64), return_inverse=True)
+    item_columns = np.searchsorted(menu_item_ids, columns[:, 1].astype(np.int64))
+    known = item_columns < len(menu_item_ids)
+    known[known] = menu_item_ids[item_columns[known]] == columns[known, 1]
+    matrix = np.zeros((len(inventory_item_ids), len(menu_item_ids)))
+    np.add.at(matrix, (ingredient_rows[known], item_columns[known]), columns[known, 2])
+    return inventory_item_ids, matrix
+
+
+def forecast_usage(usage, first_phase, bucket, horizon):
+    """
+    Forecast from ingredient usage per bucket.
+
+    `usage` is ingredients x buckets with the last column the current,
+    unfinished bucket, and `first_phase` the weekday (or hour) of its first
+    column. Returns (forecast, level, spread): forecast is ingredients x
+    horizon starting with the current bucket, level the weighted mean per
+    bucket and spread the weighted standard deviation around the forecast.
+    """
+    history = usage[:, :-1]
+    buckets = history.shape[1]
+    season = SEASON_LENGTH[bucket]
+    weights = 0.5 ** (np.arange(buckets - 1, -1, -1) / HALF_LIFE[bucket])
+    phases = (first_phase + np.arange(buckets)) % season
+    by_phase = np.zeros((buckets, season))
+    by_phase[np.arange(buckets), phases] = weights
+
+    level = history @ weights / weights.sum() if buckets else np.zeros(len(usage))
+    phase_weight = by_phase.sum(axis=0)
+    seasonal = np.where(
+        phase_weight > 0,
+        (history @ by_phase) / np.where(phase_weight > 0, phase_weight, 1),
+        level[:, None]
+    )
+    residual = history - seasonal[:, phases]
+    spread = np.sqrt((residual ** 2) @ weights / weights.sum()) if buckets else np.zeros(len(usage))
+
+    upcoming = (first_phase + buckets + np.arange(horizon)) % season
+    forecast = seasonal[:, upcoming]
+    # Stock already reflects what the current bucket has used
+    forecast[:, 0] = np.maximum(forecast[:, 0] - usage[:, -1], 0)
+    return forecast, level, spread
+
+
+class DemandForecastCache:
+    """Sales matrices by key, each kept until its token moves; the last key element is the bucket start"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries = {}
+
+    def get(self, key, token, build):
+        with self._lock:
+            entry = self._entries.get(key)
+        if entry is not None and entry[0] == token:
+            return entry[1]
+        value = build()
+        with self._lock:
+            # Older bucket starts can't be asked for again
+            self._entries = {k: v for k, v in self._entries.items() if k[:-1] != key[:-1]}
+            self._entries[key] = (token, value)
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+demand_forecast_cache = DemandForecastCache()
+
+
+def _orders_token():
+    """Moves whenever an order is placed, changes status or is archived; two primary-key lookups"""
+    return db.session.query(func.max(Order.id)).scalar() or 0, current_change_cursor()
+
+
+def _history_token(before):
+    """
+    Moves when an order placed before `before` is cancelled (or a cancelled
+    one archived or re-opened), the only way finished buckets change. A
+    count over the (status, created_at) index.
+    """
+    return db.session.query(func.count(Order.id)).filter(
+        Order.status == 'cancelled', Order.created_at < before
+    ).scalar()
+
+
+def _combine(history, current):
+    """One items x (history + 1) matrix from the finished buckets and the current one"""
+    (history_ids, history_sales), (current_ids, current_sales) = history, current
+    menu_item_ids = np.union1d(history_ids, current_ids)
+    sales = np.zeros((len(menu_item_ids), history_sales.shape[1] + 1))
+    sales[np.searchsorted(menu_item_ids, history_ids), :-1] = history_sales
+    sales[np.searchsorted(menu_item_ids, current_ids), -1] = current_sales[:, 0]
+    return menu_item_ids, sales
+
+
+def forecast_ingredients(bucket='day', history=None, horizon=None, now=None):
+    """
+    Per-ingredient usage forecasts and reorder suggestions.
+
+    `history` is the number of complete buckets to learn from and `horizon`
+    the number of buckets to plan for, starting with the current one
+    (DEFAULT_WINDOW when not given). Raises ValueError for a bad window. The
+    suggested order brings stock up to the forecast demand plus safety stock
+    on top of min_quantity. Returns a dict ready for jsonify.
+    """
+    if bucket not in BUCKET_SECONDS:
+        raise ValueError('bucket must be day or hour')
+    history = DEFAULT_WINDOW[bucket][0] if history is None else history
+    horizon = DEFAULT_WINDOW[bucket][1] if horizon is None else horizon
+    if not 1 <= history <= MAX_WINDOW[bucket][0]:
+        raise ValueError(f'history must be between 1 and {MAX_WINDOW[bucket][0]}')
+    if not 1 <= horizon <= MAX_WINDOW[bucket][1]:
+        raise ValueError(f'horizon must be between 1 and {MAX_WINDOW[bucket][1]}')
+    now = now or datetime.utcnow()
+    current = bucket_start(now, bucket)
+    start = current - timedelta(seconds=BUCKET_SECONDS[bucket] * history)
+    # New orders only land in the current bucket, so the history behind it
+    # is built once per bucket, by the same rule as the current column, and
+    # only the current column is re-read after an order
+    menu_item_ids, sales = _combine(
+        demand_forecast_cache.get(
+            ('history', bucket, history, current), _history_token(current),
+            lambda: sales_matrix(start, history, bucket)
+        ),
+        demand_forecast_cache.get(
+            ('current', bucket, current), _orders_token(),
+            lambda: sales_matrix(current, 1, bucket)
+        )
+    )
+
+    # Days before the first sale are before there was anything to learn
+    # from, not days with no demand
+    sold = np.flatnonzero(sales[:, :-1].sum(axis=0))
+    skip = int(sold[0]) if sold.size else history
+    start += timedelta(seconds=BUCKET_SECONDS[bucket] * skip)
+
+    inventory_item_ids, recipes = recipe_matrix(menu_item_ids)
+    usage = recipes @ sales[:, skip:]
+    first_phase = start.weekday() if bucket == 'day' else start.hour
+    forecast, level, spread = forecast_usage(usage, first_phase, bucket, horizon)
+    demand = forecast.sum(axis=1)
+    safety = SERVICE_Z * spread * np.sqrt(horizon)
+
+    items = {item.id: item for item in db.session.query(
+        InventoryItem.id, InventoryItem.name, InventoryItem.unit, InventoryItem.stock, InventoryItem.min_quantity
+    ).filter(InventoryItem.id.in_(inventory_item_ids.tolist()))}
+    stock = np.array([items[i].stock if i in items else 0.0 for i in inventory_item_ids.tolist()])
+    minimum = np.array([items[i].min_quantity if i in items else 0.0 for i in inventory_item_ids.tolist()])
+    suggested = np.maximum(demand + safety + minimum - stock, 0)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        cover = np.where(level > 0, stock / level, np.inf)
+
+    ingredients = []
+    for j, inventory_item_id in enumerate(inventory_item_ids.tolist()):
+        item = items.get(inventory_item_id)
+        if item is None:
+            continue
+        ingredients.append({
+            'inventory_item_id': inventory_item_id,
+            'name': item.name,
+            'unit': item.unit,
+            'stock': round(float(stock[j]), 6) or 0.0,
+            'min_quantity': item.min_quantity,
+            'used_current': round(float(usage[j, -1]), 6),
+            'average': round(float(level[j]), 6),
+            'forecast': np.round(forecast[j], 6).tolist(),
+            'forecast_total': round(float(demand[j]), 6),
+            'safety_stock': round(float(safety[j]), 6),
+            'buckets_of_cover': round(float(cover[j]), 2) if np.isfinite(cover[j]) else None,
+            'reorder': bool(suggested[j] > 1e-6),
+            'suggested_order': round(float(suggested[j]), 6)
+        })
+    # What to buy first: reorders by how short they run, then by id
+    ingredients.sort(key=lambda row: (
+        not row['reorder'],
+        row['buckets_of_cover'] if row['buckets_of_cover'] is not None else float('inf'),
+        row['inventory_item_id']
+    ))
+    return {
+        'bucket': bucket,
+        'history': history - skip,
+        'horizon': horizon,
+        'from': start.isoformat(),
+        'current_bucket': current.isoformat(),
+        'ingredients': ingredients
+    }
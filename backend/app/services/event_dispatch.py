@@ -0,0 +1,97 @@
+"""
+Background dispatch stage for Socket.IO emits.
+
+Request handlers hand their events to a bounded queue and return; one
+background task performs the emits in submission order, so order intake
+does not wait on fanning out to every connected screen. When the queue is
+full the event is emitted inline instead of dropped, which pushes back on
+producers and shows up as 'overflow' in stats(). close() drains what is
+queued at shutdown.
+"""
+import logging
+import queue
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+
+class EventDispatcher:
+
+    def __init__(self, start_task, queue_size=10000):
+        self._start_task = start_task
+        self.queue_size = queue_size
+        self._queue = None
+        self._lock = threading.Lock()
+        self._drained = threading.Event()
+        self._closed = False
+        self._counters = {
+            'submitted': 0, 'dispatched': 0, 'overflow': 0, 'errors': 0,
+            'high_water': 0, 'lag_ms_max': 0.0, 'lag_ms_total': 0.0,
+        }
+
+    def _ensure_started(self):
+        if self._queue is not None:
+            return
+        with self._lock:
+            if self._queue is None:
+                self._queue = queue.Queue(maxsize=self.queue_size)
+                self._start_task(self._run)
+
+    def submit(self, fn, *args):
+        """Queue fn(*args) for the dispatch task; runs it inline when disabled or full"""
+        if not self.queue_size or self._closed:
+            fn(*args)
+            return
+        self._ensure_started()
+        try:
+            self._queue.put_nowait((time.monotonic(), fn, args))
+        except queue.Full:
+            with self._lock:
+                self._counters['overflow'] += 1
+            fn(*args)
+            return
+        with self._lock:
+            self._counters['submitted'] += 1
+            self._counters['high_water'] = max(self._counters['high_water'], self._queue.qsize())
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                break
+            queued_at, fn, args = item
+            lag_ms = (time.monotonic() - queued_at) * 1000
+            try:
+                fn(*args)
+                failed = False
+            except Exception:
+                logger.exception('Socket.IO dispatch failed')
+                failed = True
+            with self._lock:
+                self._counters['dispatched'] += 1
+                self._counters['errors'] += failed
+                self._counters['lag_ms_total'] += lag_ms
+                self._counters['lag_ms_max'] = max(self._counters['lag_ms_max'], lag_ms)
+        self._drained.set()
+
+    def close(self, timeout=5):
+        """Stop accepting work and wait for the queued emits to go out"""
+        self._closed = True
+        if self._queue is None:
+            return True
+        try:
+            self._queue.put(None, timeout=timeout)
+        except queue.Full:
+            return False
+        return self._drained.wait(timeout)
+
+    def stats(self):
+        with self._lock:
+            counters = dict(self._counters)
+        total_lag = counters.pop('lag_ms_total')
+        counters['depth'] = self._queue.qsize() if self._queue is not None else 0
+        counters['capacity'] = self.queue_size
+        counters['lag_ms_avg'] = round(total_lag / counters['dispatched'], 2) if counters['dispatched'] else 0.0
+        counters['lag_ms_max'] = round(counters['lag_ms_max'], 2)
+        return counters
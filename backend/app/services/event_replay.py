@@ -0,0 +1,85 @@
+"""
+Numbered Socket.IO events with a bounded per-room replay buffer.
+
+Every event sent to a room gets the next sequence number for that room and
+is kept in a ring buffer of the last `size` events. A reconnecting client
+sends the last sequence number it saw per room and gets back only the
+events it missed; it needs a full refetch only when the gap is larger than
+the buffer.
+
+Sequence numbers are per process. Each buffer has a random `stream` id, and
+a client whose stream differs (the worker restarted, or it reconnected to a
+different worker) is told to resync instead of being replayed the wrong
+events.
+
+With a Socket.IO message queue, rooms get events from every worker, each
+numbered by its own buffer, and no single buffer knows which of the
+others' events a client missed. Such a buffer is created with
+replayable=False and always answers with a resync.
+"""
+import threading
+import uuid
+from collections import OrderedDict, deque
+
+
+class EventReplayBuffer:
+
+    def __init__(self, size=500, max_rooms=10000, replayable=True):
+        self.size = size
+        self.max_rooms = max_rooms
+        self.replayable = replayable
+        self.stream = uuid.uuid4().hex[:12]
+        self._lock = threading.RLock()
+        self._rooms = OrderedDict()  # room -> [last seq, deque of (seq, event, data)]
+
+    def _room(self, room):
+        state = self._rooms.get(room)
+        if state is None:
+            state = self._rooms[room] = [0, deque(maxlen=self.size)]
+            if len(self._rooms) > self.max_rooms:
+                # Quietest room goes first; its clients resync if they ask
+                self._rooms.popitem(last=False)
+        else:
+            self._rooms.move_to_end(room)
+        return state
+
+    def send(self, room, event, data, emit):
+        """
+        Number an event, keep it, and hand it to `emit(event, data, meta)`.
+
+        Numbering and emitting happen under one lock, so a room's events go
+        out in sequence order.
+        """
+        with self._lock:
+            state = self._room(room)
+            state[0] += 1
+            state[1].append((state[0], event, data))
+            emit(event, data, {'room': room, 'seq': state[0], 'stream': self.stream})
+
+    def since(self, room, seq, stream):
+        """
+        Events for `room` after `seq`, or None when the client must resync.
+        """
+        with self._lock:
+            state = self._rooms.get(room)
+            if stream != self.stream or not self.replayable:
+                return None
+            if state is None:
+                return [] if seq == 0 else None
+            last_seq, events = state
+            if seq > last_seq:
+                return None
+            if seq == last_seq:
+                return []
+            # The buffer has to reach back to the first missed event
+            if not events or events[0][0] > seq + 1:
+                return None
+            return [
+                {'room': room, 'seq': event_seq, 'event': event, 'data': data}
+                for event_seq, event, data in events if event_seq > seq
+            ]
+
+    def last_seq(self, room):
+        with self._lock:
+            state = self._rooms.get(room)
+            return state[0] if state else 0
@@ -0,0 +1,119 @@
+"""
+Background compaction of the inventory ledger.
+
+Sales only append inventory_movements and rewrite servings for dishes that
+ran out, so without compaction the ledger tail behind every stock read
+keeps growing and servings_possible drifts. A commit that recorded
+movements wakes a per-process background thread, which folds the ledger
+and refreshes servings at most once per interval. It
+keeps going for a while after the last sale, until the movements the
+compaction lag held back have been folded too. Pruning old movements is
+left to `flask compact-inventory`.
+"""
+import atexit
+import threading
+import time
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from flask import current_app
+from app.extensions import db
+
+
+class InventoryCompactor:
+
+    def __init__(self, app, interval=30, lag_seconds=60):
+        self.app = app
+        self.interval = interval
+        self.lag_seconds = lag_seconds
+        self._wake = threading.Event()
+        self._lock = threading.Lock()
+        self._thread = None
+        self._stopping = False
+        self._stopped = threading.Event()
+        self._last_request = None
+
+    def request(self):
+        """Ask for a compaction soon; cheap enough to call after every commit"""
+        if self._stopping:
+            return
+        self._last_request = time.monotonic()
+        self._ensure_started()
+        self._wake.set()
+
+    def close(self):
+        with self._lock:
+            if self._thread is None or self._stopping:
+                return
+            self._stopping = True
+        self._stopped.set()
+        self._wake.set()
+        self._thread.join(self.interval)
+
+    def _ensure_started(self):
+        if self._thread is not None:
+            return
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run, name='inventory-compactor', daemon=True
+                )
+                self._thread.start()
+
+    def _pending(self):
+        # Movements from the last sale only become foldable after the lag
+        last = self._last_request
+        return last is not None and time.monotonic() - last <= self.lag_seconds + self.interval
+
+    def _run(self):
+        while True:
+            self._wake.wait(None if not self._pending() else self.interval)
+            if self._stopping:
+                return
+            self._wake.clear()
+            self.run_once()
+            # At most one pass per interval, however busy the tills are
+            if self._stopped.wait(self.interval):
+                return
+
+    def run_once(self):
+        """Fold the ledger and refresh servings; returns (items compacted, menu items refreshed)"""
+        from app.services.inventory_ledger import compact_inventory
+        from app.services.inventory_service import refresh_servings
+
+        with self.app.app_context():
+            try:
+                compacted = compact_inventory(self.lag_seconds)
+                refreshed = refresh_servings()
+                db.session.commit()
+                return compacted, refreshed
+            except Exception as e:
+                db.session.rollback()
+                self.app.logger.error(f'Error compacting inventory: {str(e)}')
+                return 0, 0
+            finally:
+                db.session.remove()
+
+
+@event.listens_for(Session, 'after_commit')
+def _request_compaction_after_commit(session):
+    if session.info.pop('inventory_moved', None):
+        compactor = current_app.extensions.get('inventory_compactor')
+        if compactor is not None:
+            compactor.request()
+
+
+@event.listens_for(Session, 'after_rollback')
+def _forget_rolled_back_movements(session):
+    session.info.pop('inventory_moved', None)
+
+
+def init_inventory_compactor(app):
+    """Attach a background compactor using INVENTORY_COMPACT_INTERVAL_SECONDS and _LAG_SECONDS"""
+    compactor = InventoryCompactor(
+        app,
+        interval=app.config.get('INVENTORY_COMPACT_INTERVAL_SECONDS', 30),
+        lag_seconds=app.config.get('INVENTORY_COMPACT_LAG_SECONDS', 60)
+    )
+    app.extensions['inventory_compactor'] = compactor
+    atexit.register(compactor.close)
+    return compactor
@@ -0,0 +1,97 @@
+"""
+Append-only inventory ledger.
+
+Writers only insert inventory_movements rows, so a rush of orders using
+the same staple ingredient doesn't queue up behind one inventory_items row.
+Current stock is each item's snapshot (inventory_items.quantity as of
+snapshot_movement_id) plus the movements after it, which is what
+InventoryItem.stock computes.
+
+compact_inventory() folds the tail into new snapshots so that sum stays
+short. It only folds movements older than a lag: ids are handed out at
+insert time but committed in any order, and a movement that commits after
+the fold's cut-off id would otherwise be skipped for good.
+"""
+from datetime import datetime, timedelta
+from sqlalchemy import and_, exists, func, insert, select, update
+from app.models import InventoryItem, InventoryMovement
+from app.extensions import db
+
+MOVEMENT_KINDS = ('sale', 'delivery', 'waste', 'adjustment')
+
+
+def record_movements(movements):
+    """
+    Insert stock movements in the caller's transaction, as one multi-row
+    INSERT. Each is a dict with inventory_item_id, delta and kind, and
+    optionally order_id and note. Committing them wakes the background
+    compactor (see inventory_compactor).
+    """
+    if not movements:
+        return
+    now = datetime.utcnow()
+    db.session.execute(insert(InventoryMovement), [{
+        'inventory_item_id': movement['inventory_item_id'],
+        'delta': movement['delta'],
+        'kind': movement['kind'],
+        'order_id': movement.get('order_id'),
+        'note': movement.get('note'),
+        'created_at': now
+    } for movement in movements])
+    db.session.info['inventory_moved'] = True
+
+
+def current_stock(inventory_item_ids):
+    """{id: current stock} for the given items in one query"""
+    if not inventory_item_ids:
+        return {}
+    return dict(db.session.query(InventoryItem.id, InventoryItem.stock).filter(
+        InventoryItem.id.in_(inventory_item_ids)
+    ).all())
+
+
+def compact_inventory(lag_seconds=60, now=None):
+    """
+    Fold movements older than `lag_seconds` into the item snapshots with
+    one UPDATE. Returns the number of items whose snapshot moved; the
+    caller commits.
+    """
+    now = now or datetime.utcnow()
+    cutoff = db.session.query(func.max(InventoryMovement.id)).filter(
+        InventoryMovement.created_at < now - timedelta(seconds=lag_seconds)
+    ).scalar()
+    if cutoff is None:
+        return 0
+
+    in_tail = and_(
+        InventoryMovement.inventory_item_id == InventoryItem.id,
+        InventoryMovement.id > InventoryItem.snapshot_movement_id,
+        InventoryMovement.id <= cutoff
+    )
+    folded = select(func.coalesce(func.sum(InventoryMovement.delta), 0)).where(in_tail).scalar_subquery()
+    result = db.session.execute(
+        update(InventoryItem)
+        .where(InventoryItem.snapshot_movement_id < cutoff, exists().where(in_tail))
+        .values(
+            quantity=func.round(InventoryItem.quantity + folded, 6),
+            snapshot_movement_id=cutoff,
+            snapshot_at=now,
+            updated_at=InventoryItem.updated_at
+        )
+        .execution_options(synchronize_session=False)
+    )
+    return result.rowcount
+
+
+def prune_inventory_movements(before):
+    """
+    Drop movements older than `before` that their item's snapshot has
+    already folded in; returns how many went.
+    """
+    snapshot = select(InventoryItem.snapshot_movement_id).where(
+        InventoryItem.id == InventoryMovement.inventory_item_id
+    ).scalar_subquery()
+    return db.session.query(InventoryMovement).filter(
+        InventoryMovement.created_at < before,
+        InventoryMovement.id <= snapshot
+    ).delete(synchronize_session=False)
@@ -1,22 +1,272 @@
-from app.models import MenuItem, InventoryItem
+from flask import current_app
+from sqlalchemy import and_, create_engine, delete, event, func, insert, not_, or_, select, update
+from sqlalchemy.orm import Session
+from app.models import MenuItem, InventoryItem, InventoryMovement, RecipeIngredient
+from app.services.menu_cache import bump_menu_version
+from app.services.inventory_ledger import record_movements
 from app import db
 
-def reduce_inventory_for_order(order):
+
+class InsufficientStock(Exception):
+    """An order needs more of some ingredient than is in stock"""
+
+    def __init__(self, shortages):
+        super().__init__('Not enough stock for ' + ', '.join(s['name'] for s in shortages))
+        self.shortages = shortages
+
+
+def servings_possible_expression():
     """
-    Reduces inventory levels based on ordered items.
+    Correlated subquery giving each menu item's servings from current stock:
+    the minimum over its recipe of floor(stock / per-portion quantity).
+    NULL for items without a recipe.
     """
-    for item in order.order_items:
-        menu_item = item.menu_item
+    # The epsilon keeps 1.2 / 0.4 = 2.9999999999999996 from flooring to 2
+    return select(
+        func.min(func.floor(InventoryItem.stock / RecipeIngredient.quantity + 1e-9))
+    ).select_from(RecipeIngredient).join(
+        InventoryItem, InventoryItem.id == RecipeIngredient.inventory_item_id
+    ).where(
+        RecipeIngredient.menu_item_id == MenuItem.id
+    ).scalar_subquery()
+
+
+def _refresh_servings(*conditions, sold_out_only=False):
+    servings = servings_possible_expression()
+    if sold_out_only:
+        conditions += (servings <= 0,)
 
-        inventory_items = InventoryItem.query.filter_by(menu_item_id=menu_item.id).all()
+    def write(*where):
+        # updated_at is left alone: a stock change isn't an edit to the dish
+        return db.session.execute(
+            update(MenuItem).values(servings_possible=servings, updated_at=MenuItem.updated_at)
+            .where(*where, *conditions).execution_options(synchronize_session=False)
+        ).rowcount
 
-        for inv in inventory_items:
-            reduction_amount = inv.quantity * item.quantity
+    # Items running out or coming back change what the cached menus show
+    in_stock = or_(servings.is_(None), servings > 0)
+    changed = write(or_(and_(MenuItem.in_stock, not_(in_stock)), and_(not_(MenuItem.in_stock), in_stock)))
+    if changed:
+        bump_menu_version()
+    if not sold_out_only:
+        # Counts that moved on the same side of zero don't
+        changed += write(MenuItem.servings_possible.is_distinct_from(servings))
+    return changed
 
-            if inv.quantity < reduction_amount:
-                raise Exception(f"Not enough stock for {inv.name}")
 
-            inv.quantity -= reduction_amount
+def refresh_servings(menu_item_ids=None):
+    """
+    Recompute servings_possible over the given menu items (or the whole
+    menu), writing only rows whose value changed. The menu version is only
+    bumped when an item runs out or comes back into stock; the cached menus
+    show in_stock rather than the count, which is served uncached by
+    GET /api/menu/servings. Runs in the caller's transaction; returns rows
+    changed.
+    """
+    if menu_item_ids is None:
+        return _refresh_servings()
+    if not menu_item_ids:
+        return 0
+    return _refresh_servings(MenuItem.id.in_(menu_item_ids))
+
+
+def refresh_servings_for_inventory(inventory_item_ids, sold_out_only=False):
+    """
+    refresh_servings() for every menu item whose recipe uses these inventory
+    items. With sold_out_only, only items that have just run out are written.
+    """
+    if not inventory_item_ids:
+        return 0
+    return _refresh_servings(MenuItem.id.in_(select(RecipeIngredient.menu_item_id).where(
+        RecipeIngredient.inventory_item_id.in_(inventory_item_ids)
+    )), sold_out_only=sold_out_only)
+
+
+def set_recipe(menu_item_id, ingredients):
+    """
+    Replace a menu item's recipe with `ingredients`, a list of
+    {'inventory_item_id', 'quantity'} per portion, and refresh its servings.
+    """
+    db.session.execute(delete(RecipeIngredient).where(RecipeIngredient.menu_item_id == menu_item_id))
+    if ingredients:
+        db.session.execute(insert(RecipeIngredient), [{
+            'menu_item_id': menu_item_id,
+            'inventory_item_id': ingredient['inventory_item_id'],
+            'quantity': ingredient['quantity']
+        } for ingredient in ingredients])
+    refresh_servings([menu_item_id])
+
+
+def deduct_stock(lines, order_id=None):
+    """
+    Take the ingredients for a set of order lines out of stock.
+
+    `lines` are dicts with 'menu_item_id' and 'quantity' (portions). The
+    amount per inventory item comes from the recipes and goes into the
+    ledger as 'sale' movements in one INSERT; no inventory_items row is
+    written. Stock is then checked with the new movements included, and
+    if any item has gone below zero InsufficientStock is raised and the
+    caller must roll back.
+
+    Nothing is locked by default, so orders sharing an ingredient don't
+    queue behind each other. On SQLite the check is a plain read: the
+    INSERT has already taken the database's write lock. On MySQL it reads
+    the ledger on a separate READ UNCOMMITTED connection, so sales still in
+    flight in other transactions count against the stock too. Of several
+    orders racing for the last portions, the last one to check sees all of
+    them, so stock never goes below zero. The cost is that an order can be
+    turned away for a sale that then rolls back. (A delivery that rolls back
+    can likewise be counted while it is in flight.) With
+    INVENTORY_LOCK_ON_SALE the ingredient rows are locked instead and read
+    back with a locking read, which is exact either way but serializes
+    orders that share an ingredient.
+
+    Servings are only rewritten here for dishes that just ran out; the
+    rest catch up at the next background compaction. Items without a recipe aren't
+    stock-tracked.
+    """
+    portions = {}
+    for line in lines:
+        portions[line['menu_item_id']] = portions.get(line['menu_item_id'], 0) + int(line['quantity'])
+    if not portions:
+        return {}
+
+    needed = {}
+    for inventory_item_id, menu_item_id, per_portion in db.session.query(
+        RecipeIngredient.inventory_item_id, RecipeIngredient.menu_item_id, RecipeIngredient.quantity
+    ).filter(RecipeIngredient.menu_item_id.in_(portions)):
+        needed[inventory_item_id] = needed.get(inventory_item_id, 0) + per_portion * portions[menu_item_id]
+    if not needed:
+        return {}
+    # Sums of float per-portion amounts pick up noise (0.4 * 3 = 1.2000000000000002)
+    needed = {inventory_item_id: round(total, 6) for inventory_item_id, total in needed.items()}
 
-    db.session.commit()
+    lock = current_app.config.get('INVENTORY_LOCK_ON_SALE', False)
+    if lock:
+        db.session.query(InventoryItem.id).filter(
+            InventoryItem.id.in_(needed)
+        ).order_by(InventoryItem.id).with_for_update().all()
 
+    record_movements([
+        {'inventory_item_id': inventory_item_id, 'delta': -amount, 'kind': 'sale', 'order_id': order_id}
+        for inventory_item_id, amount in needed.items()
+    ])
+    rows = _stock_rows(needed, lock=lock)
+    if lock or db.engine.dialect.name == 'sqlite':
+        stock = {row.id: row.stock for row in rows}
+    else:
+        stock = _in_flight_stock(needed)
+    short = [row for row in rows if stock[row.id] < -1e-6]
+    if short:
+        raise InsufficientStock([{
+            'inventory_item_id': row.id,
+            'name': row.name,
+            'available': round(stock[row.id] + needed[row.id], 6),
+            'needed': needed[row.id]
+        } for row in short])
+
+    update_low_stock(rows=rows)
+    refresh_servings_for_inventory(list(needed), sold_out_only=True)
+    return needed
+
+
+def adjust_stock(inventory_item_id, delta, kind, note=None):
+    """Record a delivery, waste or correction and refresh the servings it affects"""
+    record_movements([{'inventory_item_id': inventory_item_id, 'delta': delta, 'kind': kind, 'note': note}])
+    update_low_stock([inventory_item_id])
+    refresh_servings_for_inventory([inventory_item_id])
+
+
+def _stock_rows(inventory_item_ids, lock=False):
+    if not lock:
+        return db.session.query(
+            InventoryItem.id, InventoryItem.name, InventoryItem.unit, InventoryItem.stock,
+            InventoryItem.min_quantity, InventoryItem.is_low
+        ).filter(InventoryItem.id.in_(inventory_item_ids)).all()
+    # A locking read on MySQL sees the latest committed movements rather than
+    # the transaction's snapshot; SQLite ignores the lock clauses
+    tail = select(func.coalesce(func.sum(InventoryMovement.delta), 0)).where(
+        InventoryMovement.inventory_item_id == InventoryItem.id,
+        InventoryMovement.id > InventoryItem.snapshot_movement_id
+    ).correlate_except(InventoryMovement).with_for_update(read=True).scalar_subquery()
+    return db.session.execute(select(
+        InventoryItem.id, InventoryItem.name, InventoryItem.unit,
+        (InventoryItem.quantity + tail).label('stock'),
+        InventoryItem.min_quantity, InventoryItem.is_low
+    ).where(InventoryItem.id.in_(inventory_item_ids)).with_for_update()).all()
+
+
+_in_flight_engines = {}
+
+
+def _in_flight_stock(inventory_item_ids):
+    """
+    {id: stock} counting every movement inserted so far, committed or not,
+    read on a READ UNCOMMITTED connection of its own. It comes from a
+    separate pool: a request already holds a connection from the main one
+    and could otherwise wait on it forever.
+    """
+    url = db.engine.url
+    engine = _in_flight_engines.get(url)
+    if engine is None:
+        engine = _in_flight_engines.setdefault(url, create_engine(
+            url, isolation_level='READ UNCOMMITTED', pool_pre_ping=True
+        ))
+    with engine.connect() as connection:
+        return dict(connection.execute(
+            select(InventoryItem.id, InventoryItem.stock).where(InventoryItem.id.in_(inventory_item_ids))
+        ).all())
+
+
+def update_low_stock(inventory_item_ids=None, rows=None):
+    """
+    Flip is_low on the items whose stock has crossed min_quantity since the
+    flag was last set, and queue an 'inventory:low' event for them to go out
+    when the transaction commits. Pass `rows` (from _stock_rows) when the
+    caller has already read them. Items that didn't cross aren't written.
+    """
+    if rows is None:
+        rows = _stock_rows(inventory_item_ids) if inventory_item_ids else []
+    crossed = [row for row in rows if (round(row.stock, 6) <= row.min_quantity) != row.is_low]
+    for is_low in (True, False):
+        ids = [row.id for row in crossed if row.is_low != is_low]
+        if ids:
+            db.session.execute(
+                update(InventoryItem).where(InventoryItem.id.in_(ids))
+                .values(is_low=is_low, updated_at=InventoryItem.updated_at)
+                .execution_options(synchronize_session=False)
+            )
+    if crossed:
+        db.session.info.setdefault('inventory_low', []).extend({
+            'id': row.id,
+            'name': row.name,
+            'quantity': round(row.stock, 6) or 0.0,
+            'unit': row.unit,
+            'min_quantity': row.min_quantity,
+            'is_low': not row.is_low
+        } for row in crossed)
+    return len(crossed)
+
+
+@event.listens_for(Session, 'after_commit')
+def _emit_low_stock_after_commit(session):
+    items = session.info.pop('inventory_low', None)
+    if items:
+        from app.socketio import emit_inventory_low
+        emit_inventory_low(items)
+
+
+@event.listens_for(Session, 'after_rollback')
+def _forget_rolled_back_low_stock(session):
+    session.info.pop('inventory_low', None)
+
+
+def reduce_inventory_for_order(order):
+    """
+    Reduces inventory levels based on ordered items, in the caller's
+    transaction. Raises InsufficientStock when the order can't be made.
+    """
+    return deduct_stock([
+        {'menu_item_id': item.menu_item_id, 'quantity': item.quantity}
+        for item in order.order_items
+    ])
@@ -0,0 +1,179 @@
+import threading
+from datetime import datetime
+from app.models import Order
+from app.services.prep_time import prep_time_stats
+from app.services.order_changes import current_change_cursor, settled_change_cursor, changed_order_ids
+from app.services.order_serializer import order_rows, serialize_kitchen_orders, KITCHEN_COLUMNS
+
+ACTIVE_STATUSES = ['pending', 'preparing', 'ready']
+
+
+def _ticket_item(item):
+    return {
+        'id': item.get('id'),
+        'menuItemId': item.get('menu_item_id'),
+        'name': item.get('name') or 'Unknown Item',
+        'quantity': item['quantity'],
+        'specialRequests': item.get('special_requests')
+    }
+
+
+class KitchenBoard:
+    """
+    Process-local materialized view of the active kitchen tickets.
+
+    Built once from the database, then kept current by the same code paths
+    that broadcast order:created / order:updated, so GET /api/kitchen/orders
+    and /api/kitchen/stats never touch the database. verify() rebuilds a
+    fresh copy from the database and reports any drift.
+
+    With several worker processes each has its own board and only sees its
+    own broadcasts; sync() catches up on the orders other workers changed
+    by following the order_changes log.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._tickets = {}
+        self._loaded = False
+        self._cursor = 0
+
+    def _load_from_database(self, order_ids=None):
+        query = order_rows(*KITCHEN_COLUMNS).filter(Order.status.in_(ACTIVE_STATUSES))
+        if order_ids is not None:
+            query = query.filter(Order.id.in_(order_ids))
+        rows = query.order_by(Order.created_at.asc()).all()
+        return {ticket['id']: ticket for ticket in serialize_kitchen_orders(rows)}
+
+    def rebuild(self):
+        """Replace the board with the active orders currently in the database"""
+        # Read the cursor first so changes racing the load are picked up by sync()
+        cursor = settled_change_cursor()
+        tickets = self._load_from_database()
+        with self._lock:
+            self._tickets = tickets
+            self._loaded = True
+            self._cursor = cursor
+
+    def sync(self, cursor=None, settled=None):
+        """
+        Reload the orders changed since the board's cursor (by any worker).
+
+        A no-op when nothing changed; otherwise two queries covering only the
+        changed orders. Falls back to a full rebuild when the change log has
+        been pruned past the board's cursor. The board only advances to the
+        settled cursor, so orders changed within the commit lag are
+        reloaded again on the next sync rather than risk skipping one.
+        """
+        if not self._loaded:
+            self.rebuild()
+            return
+        settled = settled_change_cursor() if settled is None else settled
+        cursor = current_change_cursor() if cursor is None else cursor
+        since = self._cursor
+        if cursor <= since:
+            return
+        order_ids = changed_order_ids(since, cursor)
+        if order_ids is None:
+            self.rebuild()
+            return
+        fresh = self._load_from_database(order_ids)
+        with self._lock:
+            for order_id in order_ids:
+                if order_id in fresh:
+                    self._tickets[order_id] = fresh[order_id]
+                else:
+                    self._tickets.pop(order_id, None)
+            self._cursor = max(self._cursor, min(settled, cursor))
+
+    def _ensure_loaded(self):
+        if not self._loaded:
+            self.rebuild()
+
+    def apply_created(self, orders_data):
+        """Add tickets for newly committed orders (order payload format)"""
+        with self._lock:
+            for order_data in orders_data:
+                if order_data['status'] not in ACTIVE_STATUSES:
+                    continue
+                self._tickets[order_data['id']] = {
+                    'id': order_data['id'],
+                    'tableNumber': order_data.get('table_number'),
+                    'status': order_data['status'],
+                    'createdAt': order_data.get('created_at'),
+                    'items': [_ticket_item(item) for item in order_data.get('items', [])]
+                }
+
+    def apply_updated(self, orders_data):
+        """Move, add or drop tickets after committed status changes"""
+        with self._lock:
+            for order_data in orders_data:
+                order_id = order_data['id']
+                if order_data['status'] not in ACTIVE_STATUSES:
+                    self._tickets.pop(order_id, None)
+                    continue
+                ticket = self._tickets.get(order_id)
+                if ticket is None:
+                    # Re-opened order: the update payload carries everything a ticket needs
+                    ticket = {
+                        'id': order_id,
+                        'tableNumber': order_data.get('table_number'),
+                        'createdAt': order_data.get('created_at'),
+                        'items': [_ticket_item(item) for item in order_data.get('items', [])]
+                    }
+                self._tickets[order_id] = dict(ticket, status=order_data['status'])
+
+    def tickets(self, order_ids=None):
+        """Active tickets, oldest first, with current per-item prep estimates"""
+        self._ensure_loaded()
+        with self._lock:
+            if order_ids is None:
+                tickets = list(self._tickets.values())
+            else:
+                tickets = [self._tickets[i] for i in order_ids if i in self._tickets]
+        hour = datetime.utcnow().hour
+        return [dict(ticket, items=[
+            dict(item, estimatedTime=prep_time_stats.estimate(item['menuItemId'], hour))
+            for item in ticket['items']
+        ]) for ticket in sorted(tickets, key=lambda ticket: (ticket['createdAt'] or '', ticket['id']))]
+
+    def status_counts(self):
+        self._ensure_loaded()
+        counts = {}
+        with self._lock:
+            for ticket in self._tickets.values():
+                counts[ticket['status']] = counts.get(ticket['status'], 0) + 1
+        return counts
+
+    def verify(self, repair=False):
+        """
+        Compares the board with a fresh load from the database.
+
+        Returns {'missing': [...], 'stale': [...], 'mismatched': [...]} order
+        ids; with repair=True the board is replaced by the fresh copy.
+        """
+        fresh = self._load_from_database()
+        with self._lock:
+            current = dict(self._tickets)
+            if repair:
+                self._tickets = fresh
+                self._loaded = True
+
+        def comparable(ticket):
+            return (
+                ticket['status'], ticket['tableNumber'], ticket['createdAt'],
+                [(item['name'], item['quantity'], item['specialRequests'] or '')
+                 for item in ticket['items']]
+            )
+
+        return {
+            'missing': sorted(set(fresh) - set(current)),
+            'stale': sorted(set(current) - set(fresh)),
+            'mismatched': sorted(
+                order_id for order_id in set(fresh) & set(current)
+                if comparable(fresh[order_id]) != comparable(current[order_id])
+            )
+        }
+
+
+kitchen_board = KitchenBoard()
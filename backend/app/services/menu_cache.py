@@ -0,0 +1,92 @@
+"""
+Versioned in-process cache of the serialized menu.
+
+Every menu write calls bump_menu_version() inside its transaction, which
+increments the 'menu' row in cache_versions. Readers compare that row with
+the version their cached bytes were built from, at most once every
+MENU_VERSION_CHECK_SECONDS, so a change made by any worker process is
+picked up within that interval (immediately in the process that made it).
+Responses are pre-serialized JSON bytes with a strong ETag taken from
+their content.
+"""
+import hashlib
+import threading
+import time
+from flask import current_app
+from sqlalchemy import event, update
+from sqlalchemy.orm import Session
+from app.models import CacheVersion
+from app.extensions import db
+
+MENU_VERSION = 'menu'
+
+
+def bump_menu_version():
+    """Mark the menu as changed; call inside the writing transaction"""
+    result = db.session.execute(
+        update(CacheVersion).where(CacheVersion.name == MENU_VERSION)
+        .values(version=CacheVersion.version + 1)
+    )
+    if not result.rowcount:
+        db.session.add(CacheVersion(name=MENU_VERSION, version=1))
+    db.session.info['menu_changed'] = True
+
+
+def current_menu_version():
+    return db.session.query(CacheVersion.version).filter(
+        CacheVersion.name == MENU_VERSION
+    ).scalar() or 0
+
+
+class MenuCache:
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries = {}       # variant -> (version, body, etag)
+        self._version = None
+        self._checked_at = 0.0
+
+    def _version_now(self):
+        interval = current_app.config.get('MENU_VERSION_CHECK_SECONDS', 1)
+        now = time.monotonic()
+        if self._version is None or now - self._checked_at >= interval:
+            self._version = current_menu_version()
+            self._checked_at = now
+        return self._version
+
+    def get(self, variant, build):
+        """
+        Returns (body, etag) for a menu variant, rebuilding it with build()
+        only when the menu version has moved.
+        """
+        version = self._version_now()
+        with self._lock:
+            entry = self._entries.get(variant)
+        if entry is not None and entry[0] == version:
+            return entry[1], entry[2]
+
+        body = current_app.json.dumps(build()).encode('utf-8')
+        etag = hashlib.sha256(body).hexdigest()[:32]
+        with self._lock:
+            self._entries[variant] = (version, body, etag)
+        return body, etag
+
+    def invalidate(self):
+        """Forget the cached version so the next read checks the database"""
+        with self._lock:
+            self._entries.clear()
+            self._version = None
+
+
+menu_cache = MenuCache()
+
+
+@event.listens_for(Session, 'after_commit')
+def _invalidate_after_menu_commit(session):
+    if session.info.pop('menu_changed', False):
+        menu_cache.invalidate()
+
+
+@event.listens_for(Session, 'after_rollback')
+def _forget_rolled_back_menu_change(session):
+    session.info.pop('menu_changed', None)
@@ -0,0 +1,216 @@
+"""
+Bulk menu import: validate a whole batch of rows, then apply it as set-based
+inserts and updates in one transaction.
+
+A row with an "id" updates that item. A row without one updates the
+unretired item with the same (name, category) if there is one and is
+inserted otherwise.
+Fields missing from an update row are left as they are. If any row fails
+validation nothing is written and the report says which rows and why.
+"""
+import csv
+import io
+from datetime import datetime
+from decimal import Decimal, InvalidOperation
+from sqlalchemy import insert, tuple_, update
+from app.models import MenuItem
+from app.extensions import db
+from app.services.menu_cache import bump_menu_version
+
+FIELDS = ('id', 'name', 'description', 'price', 'category', 'is_available', 'image_url')
+TRUE_VALUES = ('1', 'true', 'yes', 'y')
+FALSE_VALUES = ('0', 'false', 'no', 'n')
+LOOKUP_CHUNK = 500
+
+
+class MenuImportError(Exception):
+    """The batch as a whole can't be read (bad format, too many rows)"""
+
+
+def read_csv_rows(stream, max_rows):
+    """Rows from a CSV byte stream with a header line, read incrementally"""
+    reader = csv.DictReader(io.TextIOWrapper(stream, encoding='utf-8-sig', newline=''))
+    if reader.fieldnames is None:
+        raise MenuImportError('CSV upload is empty')
+    unknown = set(reader.fieldnames) - set(FIELDS)
+    if unknown:
+        raise MenuImportError(f'Unknown CSV columns: {", ".join(sorted(unknown))}')
+    rows = []
+    for row in reader:
+        if len(rows) >= max_rows:
+            raise MenuImportError(f'Too many rows (maximum {max_rows})')
+        # Empty cells mean "not given", like a missing key in JSON
+        rows.append({key: value for key, value in row.items() if value not in (None, '')})
+    return rows
+
+
+def _clean(row):
+    """Returns (values, errors) for one input row"""
+    if not isinstance(row, dict):
+        return None, ['row must be an object']
+    values, errors = {}, []
+    unknown = set(row) - set(FIELDS)
+    if unknown:
+        errors.append(f'unknown fields: {", ".join(sorted(unknown))}')
+
+    if row.get('id') is not None:
+        try:
+            values['id'] = int(row['id'])
+        except (TypeError, ValueError):
+            errors.append('id must be an integer')
+
+    for field, max_length in (('name', 100), ('category', 50), ('image_url', 255)):
+        if field in row:
+            value = row[field]
+            if value is not None and not isinstance(value, str):
+                errors.append(f'{field} must be a string')
+            elif value is not None and len(value.strip()) > max_length:
+                errors.append(f'{field} is longer than {max_length} characters')
+            else:
+                values[field] = value.strip() if value is not None else None
+    for field in ('name', 'category'):
+        if field in values and not values[field]:
+            errors.append(f'{field} must not be empty')
+
+    if 'description' in row:
+        if row['description'] is not None and not isinstance(row['description'], str):
+            errors.append('description must be a string')
+        else:
+            values['description'] = row['description']
+
+    if 'price' in row:
+        try:
+            price = Decimal(str(row['price']))
+            if not price.is_finite() or price < 0 or price >= Decimal('1e8'):
+                raise InvalidOperation
+            values['price'] = price.quantize(Decimal('0.01'))
+        except (InvalidOperation, ValueError):
+            errors.append('price must be a non-negative number')
+
+    if 'is_available' in row:
+        value = row['is_available']
+        if isinstance(value, bool):
+            values['is_available'] = value
+        elif str(value).strip().lower() in TRUE_VALUES:
+            values['is_available'] = True
+        elif str(value).strip().lower() in FALSE_VALUES:
+            values['is_available'] = False
+        else:
+            errors.append('is_available must be true or false')
+
+    return values, errors
+
+
+def _chunks(values, size=LOOKUP_CHUNK):
+    values = list(values)
+    for start in range(0, len(values), size):
+        yield values[start:start + size]
+
+
+def _ids_by_key(keys):
+    """{(name, category): id} for items on the menu, newest id per key"""
+    found = {}
+    for chunk in _chunks(keys):
+        rows = db.session.query(MenuItem.id, MenuItem.name, MenuItem.category).filter(
+            tuple_(MenuItem.name, MenuItem.category).in_(chunk), MenuItem.retired_at.is_(None)
+        ).order_by(MenuItem.id)
+        for item_id, name, category in rows:
+            found[(name, category)] = item_id
+    return found
+
+
+def _existing_ids(ids):
+    found = set()
+    for chunk in _chunks(ids):
+        found.update(item_id for item_id, in db.session.query(MenuItem.id).filter(MenuItem.id.in_(chunk)))
+    return found
+
+
+def import_menu_items(rows):
+    """
+    Validate and apply a batch of menu rows.
+
+    Returns (ok, report). report['rows'] has one entry per input row with its
+    'status' ('created', 'updated', 'error', or 'valid' for a good row in a
+    rejected batch), the item 'id' and any 'errors'.
+    The caller commits; nothing is flushed when ok is False.
+    """
+    cleaned = [_clean(row) for row in rows]
+    results = [{'row': index, 'status': None, 'id': None, 'errors': errors}
+               for index, (_, errors) in enumerate(cleaned)]
+
+    ids = {values['id'] for values, errors in cleaned if not errors and 'id' in values}
+    existing = _existing_ids(ids)
+    keys = {(values['name'], values['category'])
+            for values, errors in cleaned
+            if not errors and 'id' not in values and 'name' in values and 'category' in values}
+    ids_by_key = _ids_by_key(keys)
+
+    inserts, updates, seen = [], [], {}
+    for (values, errors), result in zip(cleaned, results):
+        if errors:
+            continue
+        if 'id' in values:
+            item_id = values['id']
+            if item_id not in existing:
+                errors.append(f'menu item {item_id} does not exist')
+                continue
+        elif 'name' not in values or 'category' not in values:
+            errors.append('name and category are required without an id')
+            continue
+        else:
+            item_id = ids_by_key.get((values['name'], values['category']))
+            if item_id is None and 'price' not in values:
+                errors.append('price is required for a new item')
+                continue
+
+        identity = item_id if item_id is not None else (values['name'], values['category'])
+        if identity in seen:
+            errors.append(f'same item as row {seen[identity]}')
+            continue
+        seen[identity] = result['row']
+
+        if item_id is None:
+            values.setdefault('description', '')
+            values.setdefault('is_available', True)
+            inserts.append((values, result))
+            result['status'] = 'created'
+        else:
+            values['id'] = item_id
+            updates.append(values)
+            result['status'] = 'updated'
+            result['id'] = item_id
+
+    failed = [result for result in results if result['errors']]
+    for result in results:
+        if result['errors']:
+            result['status'] = 'error'
+        elif failed:
+            # Would have been applied; the batch was rejected as a whole
+            result['status'] = 'valid'
+    report = {
+        'created': len(inserts) if not failed else 0,
+        'updated': len(updates) if not failed else 0,
+        'failed': len(failed),
+        'rows': results,
+    }
+    if failed or not (inserts or updates):
+        return not failed, report
+
+    now = datetime.utcnow()
+    if updates:
+        for values in updates:
+            values['updated_at'] = now
+        # ORM bulk UPDATE by primary key: one executemany per set of columns
+        db.session.execute(update(MenuItem), updates)
+    if inserts:
+        db.session.execute(insert(MenuItem), [
+            dict(values, created_at=now, updated_at=now) for values, _ in inserts
+        ])
+        # Read the new ids back by key rather than relying on RETURNING,
+        # which MySQL doesn't have
+        new_ids = _ids_by_key({(values['name'], values['category']) for values, _ in inserts})
+        for values, result in inserts:
+            result['id'] = new_ids.get((values['name'], values['category']))
+    bump_menu_version()
+    return True, report
@@ -0,0 +1,98 @@
+"""
+Retiring and purging menu items.
+
+Retiring is the normal way to take a dish off the menu: one UPDATE stamps
+retired_at and marks it unavailable, so it disappears from customer
+listings and search while every order that references it keeps its
+history. Purging really deletes retired items and the order lines that
+reference them, in chunks, for when the data has to go.
+"""
+import time
+from datetime import datetime
+from sqlalchemy import delete, update
+from app.models import InventoryItem, MenuItem, OrderItem
+from app.services.menu_cache import bump_menu_version
+from app.services.order_changes import record_order_changes
+from app.extensions import db
+
+
+def retire_menu_items(item_ids, now=None):
+    """Retire the given items in the caller's transaction; returns how many changed"""
+    result = db.session.execute(
+        update(MenuItem)
+        .where(MenuItem.id.in_(item_ids), MenuItem.retired_at.is_(None))
+        .values(retired_at=now or datetime.utcnow(), is_available=False,
+                updated_at=now or datetime.utcnow())
+    )
+    if result.rowcount:
+        bump_menu_version()
+    return result.rowcount
+
+
+def restore_menu_items(item_ids):
+    """Put retired items back on the menu (still unavailable until re-enabled)"""
+    result = db.session.execute(
+        update(MenuItem)
+        .where(MenuItem.id.in_(item_ids), MenuItem.retired_at.isnot(None))
+        .values(retired_at=None, updated_at=datetime.utcnow())
+    )
+    if result.rowcount:
+        bump_menu_version()
+    return result.rowcount
+
+
+def retired_menu_item_ids(before):
+    return [item_id for item_id, in db.session.query(MenuItem.id).filter(
+        MenuItem.retired_at < before
+    ).order_by(MenuItem.id)]
+
+
+def purge_menu_items(item_ids, chunk_size=1000, pause=0.1):
+    """
+    Deletes retired menu items together with the order_items that reference them.
+
+    Order lines go first in chunks of `chunk_size`, each selected by id and
+    removed with one DELETE in its own transaction, with `pause` seconds
+    between chunks. The items themselves go last, in one transaction that
+    also detaches their inventory rows. Items that aren't retired are left
+    alone. Returns (order_items_deleted, menu_items_deleted).
+    """
+    item_ids = [item_id for item_id, in db.session.query(MenuItem.id).filter(
+        MenuItem.id.in_(item_ids), MenuItem.retired_at.isnot(None)
+    )]
+    if not item_ids:
+        return 0, 0
+
+    lines_deleted = 0
+    while True:
+        rows = db.session.query(OrderItem.id, OrderItem.order_id).filter(
+            OrderItem.menu_item_id.in_(item_ids)
+        ).order_by(OrderItem.id).limit(chunk_size).all()
+        if not rows:
+            break
+        try:
+            db.session.execute(delete(OrderItem).where(OrderItem.id.in_([row.id for row in rows])))
+            record_order_changes(sorted({row.order_id for row in rows}), 'updated')
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+        lines_deleted += len(rows)
+        if len(rows) < chunk_size:
+            break
+        if pause:
+            time.sleep(pause)
+
+    try:
+        db.session.execute(
+            update(InventoryItem).where(InventoryItem.menu_item_id.in_(item_ids)).values(menu_item_id=None)
+        )
+        result = db.session.execute(
+            delete(MenuItem).where(MenuItem.id.in_(item_ids), MenuItem.retired_at.isnot(None))
+        )
+        bump_menu_version()
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+    return lines_deleted, result.rowcount
@@ -0,0 +1,93 @@
+"""
+Menu search backed by the database's full-text index.
+
+SQLite matches against the menu_items_fts FTS5 table and ranks with bm25();
+MySQL uses MATCH ... AGAINST on the FULLTEXT index. Either way the rank
+comes from the database, lower is better, and pages are keyset-paginated
+on (rank, id). Without a search term results are in id order. Retired
+items never match, and available=True also leaves out items with no
+servings left in stock.
+"""
+import re
+from sqlalchemy import and_, column, func, literal_column, or_, table
+from sqlalchemy.dialects.mysql import match as mysql_match
+from app.models import MenuItem
+from app.extensions import db
+
+_menu_items_fts = table('menu_items_fts', column('rowid'))
+_WORD = re.compile(r'\w+', re.UNICODE)
+
+
+def _fts5_query(text):
+    """Each word as a quoted prefix term, all required: 'chick tikk' -> "chick"* "tikk"*"""
+    return ' '.join(f'"{word}"*' for word in _WORD.findall(text))
+
+
+def _ranked_ids(q):
+    """A query of (id, rank) for items matching `q`, or None when nothing can match"""
+    dialect = db.engine.dialect.name
+    if dialect == 'sqlite':
+        match = _fts5_query(q)
+        if not match:
+            return None
+        return db.session.query(
+            _menu_items_fts.c.rowid.label('id'),
+            func.bm25(literal_column('menu_items_fts')).label('rank')
+        ).select_from(_menu_items_fts).filter(
+            literal_column('menu_items_fts').op('MATCH')(match)
+        )
+    if dialect == 'mysql':
+        score = mysql_match(MenuItem.name, MenuItem.description, against=q).in_natural_language_mode()
+        return db.session.query(MenuItem.id.label('id'), (-score).label('rank')).filter(score > 0)
+    raise ValueError(f'No full-text search support for {dialect}')
+
+
+def search_menu(q=None, categories=None, available=None, min_price=None,
+                max_price=None, limit=50, cursor=None):
+    """
+    Returns (items, ranks, next_cursor) for one page of matching menu items.
+
+    `cursor` is the (rank, id) or (id,) of the last item on the previous page.
+    """
+    query = db.session.query(MenuItem)
+    if q:
+        ranked = _ranked_ids(q)
+        if ranked is None:
+            return [], [], None
+        ranked = ranked.subquery()
+        rank = ranked.c.rank
+        query = db.session.query(MenuItem, rank).join(ranked, ranked.c.id == MenuItem.id)
+        if cursor:
+            last_rank, last_id = cursor
+            query = query.filter(or_(rank > last_rank, and_(rank == last_rank, MenuItem.id > last_id)))
+        query = query.order_by(rank.asc(), MenuItem.id.asc())
+    else:
+        if cursor:
+            query = query.filter(MenuItem.id > cursor[-1])
+        query = query.order_by(MenuItem.id.asc())
+
+    query = query.filter(MenuItem.retired_at.is_(None))
+    if categories:
+        query = query.filter(MenuItem.category.in_(categories))
+    if available:
+        query = query.filter(MenuItem.is_available == True, MenuItem.in_stock)
+    elif available is not None:
+        query = query.filter(or_(MenuItem.is_available == False, MenuItem.servings_possible <= 0))
+    if min_price is not None:
+        query = query.filter(MenuItem.price >= min_price)
+    if max_price is not None:
+        query = query.filter(MenuItem.price <= max_price)
+
+    rows = query.limit(limit + 1).all()
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    if q:
+        items = [item for item, _ in rows]
+        ranks = [float(item_rank) for _, item_rank in rows]
+    else:
+        items, ranks = rows, [None] * len(rows)
+
+    next_cursor = None
+    if has_more and items:
+        next_cursor = (ranks[-1], items[-1].id) if q else (items[-1].id,)
+    return items, ranks, next_cursor
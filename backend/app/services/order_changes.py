@@ -0,0 +1,97 @@
+"""
+Order change log behind the ?since= polling cursors.
+
+Change ids are handed out when a row is inserted but only become visible
+when its transaction commits, and concurrent transactions commit in any
+order. Handing out the newest id would let a poller step over a lower id
+that commits a moment later and never see it. So the cursor given to
+clients is settled_change_cursor(): the id of the newest change older
+than ORDER_CHANGE_COMMIT_LAG_SECONDS, below anything still in flight
+(the same lag inventory compaction uses). Responses still include every
+change up to current_change_cursor(); the ones past the settled cursor
+are simply sent again on the next poll.
+"""
+from datetime import datetime, timedelta
+from flask import current_app
+from sqlalchemy import func, insert
+from app.models import OrderChange
+from app.extensions import db
+
+
+def record_order_changes(order_ids, change):
+    """Stamps a change for each order in the caller's transaction"""
+    if not order_ids:
+        return
+    now = datetime.utcnow()
+    db.session.execute(insert(OrderChange), [
+        {'order_id': order_id, 'change': change, 'changed_at': now}
+        for order_id in order_ids
+    ])
+
+
+def current_change_cursor():
+    """The newest change id; a primary-key lookup, cheap enough for every poll"""
+    return db.session.query(func.max(OrderChange.id)).scalar() or 0
+
+
+def _newest_change_before(moment):
+    # Newest by time, not by id: one step back along the changed_at index
+    return db.session.query(OrderChange.id).filter(
+        OrderChange.changed_at < moment
+    ).order_by(OrderChange.changed_at.desc()).limit(1).scalar()
+
+
+def settled_change_cursor(now=None):
+    """
+    The cursor to hand to clients: no change still uncommitted can end up
+    with an id at or below it. Read it before current_change_cursor().
+    """
+    lag = current_app.config.get('ORDER_CHANGE_COMMIT_LAG_SECONDS', 10)
+    return _newest_change_before((now or datetime.utcnow()) - timedelta(seconds=lag)) or 0
+
+
+def parse_since(value, head):
+    """
+    Parse a ?since= cursor, None when absent. Raises ValueError for one that
+    isn't a non-negative integer or is ahead of `head`, which this server
+    never handed out; the client should drop it and refetch without since.
+    """
+    if value is None or value == '':
+        return None
+    try:
+        since = int(value)
+    except ValueError:
+        raise ValueError('since must be a non-negative integer')
+    if since < 0:
+        raise ValueError('since must be a non-negative integer')
+    if since > head:
+        raise ValueError('since is ahead of the newest change')
+    return since
+
+
+def changed_order_ids(since, until):
+    """
+    Ids of orders changed after cursor `since` up to `until`, or None when
+    `since` is older than the retained log and the client must resync.
+    """
+    if since >= until:
+        return set()
+    oldest = db.session.query(func.min(OrderChange.id)).scalar()
+    if oldest is None or since < oldest - 1:
+        return None
+    return {row.order_id for row in db.session.query(OrderChange.order_id).filter(
+        OrderChange.id > since, OrderChange.id <= until
+    ).distinct()}
+
+
+def prune_order_changes(before):
+    """
+    Drop log entries older than `before`; clients behind that point resync.
+    The newest of them stays, since a settled cursor may still point at it.
+    """
+    keep = _newest_change_before(before)
+    if keep is None:
+        return 0
+    return db.session.query(OrderChange).filter(
+        OrderChange.changed_at < before, OrderChange.id < keep
+    ).delete(synchronize_session=False)
@@ -0,0 +1,117 @@
+"""
+Coalescing, delta-encoding emitter for order status updates.
+
+Updates are buffered for a short window (SOCKETIO_COALESCE_MS). Several
+updates to the same order inside one window merge into one, and each room
+then gets a single 'order:delta' frame: a list of
+{'id', 'version', 'base', 'changes'} entries, where 'changes' holds only
+the fields that differ from the last frame sent for that order.
+
+'version' is the order_changes cursor at the time of the update, which is
+monotonic across worker processes. A client applies a delta only when its
+copy of the order is at 'base'; otherwise it refetches the order.
+
+Only the last `max_orders` snapshots are kept, least recently updated
+going first. An order with no snapshot, because it is new to this process
+or its snapshot was evicted, has no base to send a delta against and goes
+out in full as 'order:updated' instead.
+"""
+import json
+import threading
+from collections import OrderedDict
+
+FINISHED_STATUSES = ('completed', 'cancelled')
+
+
+def _size(payload):
+    return len(json.dumps(payload, separators=(',', ':'), default=str))
+
+
+class OrderEventCoalescer:
+    """Per-process buffer of order updates, flushed every `window` seconds"""
+
+    def __init__(self, emit, start_task, sleep, window_ms=50, max_orders=10000):
+        self._emit = emit
+        self._start_task = start_task
+        self._sleep = sleep
+        self.window = window_ms / 1000
+        self.max_orders = max_orders
+        self._lock = threading.Lock()
+        self._pending = {}           # order id -> (rooms, latest payload, version)
+        self._sent = OrderedDict()   # order id -> (version, last payload sent)
+        self._flush_scheduled = False
+        self._counters = {
+            'updates_in': 0, 'updates_merged': 0, 'frames_sent': 0,
+            'bytes_sent': 0, 'bytes_full': 0, 'snapshots_evicted': 0,
+        }
+
+    def add(self, orders_data, version, rooms_for):
+        """Buffer status update payloads; `rooms_for(order)` names their rooms"""
+        with self._lock:
+            for order_data in orders_data:
+                rooms = rooms_for(order_data)
+                self._counters['updates_in'] += 1
+                # What the uncoalesced path would have sent: the full payload to every room
+                self._counters['bytes_full'] += _size(order_data) * len(rooms)
+                previous = self._pending.get(order_data['id'])
+                if previous is not None:
+                    self._counters['updates_merged'] += 1
+                    rooms = previous[0] | rooms
+                self._pending[order_data['id']] = (rooms, order_data, version)
+            if self._flush_scheduled or not self._pending:
+                return
+            self._flush_scheduled = True
+        self._start_task(self._flush_later)
+
+    def _flush_later(self):
+        self._sleep(self.window)
+        self.flush()
+
+    def flush(self):
+        """
+        Send what is buffered now: one 'order:delta' frame per room, plus an
+        'order:updated' for each order there was no snapshot to diff against
+        """
+        with self._lock:
+            pending, self._pending = self._pending, {}
+            self._flush_scheduled = False
+            frames = {}
+            full = []
+            for order_id, (rooms, order_data, version) in pending.items():
+                base, last = self._sent.pop(order_id, (None, None))
+                if order_data['status'] not in FINISHED_STATUSES:
+                    # Nothing follows a finished order; don't keep its snapshot
+                    self._sent[order_id] = (version, order_data)
+                    if len(self._sent) > self.max_orders:
+                        self._sent.popitem(last=False)
+                        self._counters['snapshots_evicted'] += 1
+                if last is None:
+                    full.extend((room, order_data) for room in rooms)
+                    continue
+                changes = {
+                    field: value for field, value in order_data.items()
+                    if last.get(field) != value
+                }
+                delta = {'id': order_id, 'version': version, 'base': base, 'changes': changes}
+                for room in rooms:
+                    frames.setdefault(room, []).append(delta)
+            for frame in frames.values():
+                self._counters['frames_sent'] += 1
+                self._counters['bytes_sent'] += _size(frame)
+            for _, order_data in full:
+                self._counters['frames_sent'] += 1
+                self._counters['bytes_sent'] += _size(order_data)
+
+        for room, order_data in full:
+            self._emit('order:updated', order_data, room)
+        for room, frame in frames.items():
+            self._emit('order:delta', frame, room)
+
+    def stats(self):
+        with self._lock:
+            counters = dict(self._counters)
+            counters['pending'] = len(self._pending)
+            counters['tracked_orders'] = len(self._sent)
+        counters['bytes_saved'] = counters['bytes_full'] - counters['bytes_sent']
+        counters['window_ms'] = round(self.window * 1000)
+        return counters
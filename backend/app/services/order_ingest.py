@@ -0,0 +1,231 @@
+import atexit
+import queue
+import threading
+import time
+from sqlalchemy import insert
+from app.models import Order, OrderItem
+from app.extensions import db
+from app.socketio import emit_orders_created
+from app.services.order_serializer import order_rows, serialize_orders, serialize_new_order
+from app.services.order_changes import record_order_changes
+from app.services.inventory_service import deduct_stock, InsufficientStock
+
+
+class IngestQueueFull(Exception):
+    """Raised when the ingestion queue cannot take another order"""
+
+
+class IngestTimeout(Exception):
+    """Raised when an order is still queued or being written after the timeout; it may yet commit"""
+
+
+class IngestFailed(Exception):
+    """Raised when the batch holding an order could not be written; nothing from it was committed"""
+
+
+class _PendingOrder:
+    __slots__ = ('order', 'lines', 'done', 'order_data', 'error', 'created', 'replay_of')
+
+    def __init__(self, order, lines):
+        self.order = order
+        self.lines = lines
+        self.done = threading.Event()
+        self.order_data = None
+        self.error = None
+        self.created = True
+        self.replay_of = None
+
+
+class OrderIngestor:
+    """
+    Group-commit writer for new orders.
+
+    Request threads hand a validated, transient Order plus its lines to
+    submit() and block until the batch containing it has been committed.
+    A single writer thread drains the queue, collecting up to max_batch
+    orders or waiting at most max_wait_ms after the first one, and writes
+    the whole batch in one transaction: the orders in one flush and every
+    order line in one multi-row INSERT.
+
+    Orders carry an idempotency key. One whose key is already taken, by a
+    committed order or an earlier one in the same batch, is not written
+    again: submit() hands back the existing order instead, so a client that
+    timed out can safely retry with the same key.
+    """
+
+    def __init__(self, app, max_batch=50, max_wait_ms=5, queue_size=1000, timeout=10):
+        self.app = app
+        self.max_batch = max_batch
+        self.max_wait = max_wait_ms / 1000.0
+        self.timeout = timeout
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._thread = None
+        self._lock = threading.Lock()
+        self._stopping = False
+
+    def submit(self, order, lines):
+        """
+        Queue an order and return (payload, created) once the batch is
+        durable; created is False when its idempotency key belonged to an
+        order that already exists, whose payload is returned instead.
+        """
+        self._ensure_writer()
+        pending = _PendingOrder(order, lines)
+        try:
+            self._queue.put_nowait(pending)
+        except queue.Full:
+            raise IngestQueueFull('Order ingestion queue is full')
+
+        if not pending.done.wait(self.timeout):
+            raise IngestTimeout('Timed out waiting for order batch to commit')
+        if isinstance(pending.error, InsufficientStock):
+            raise pending.error
+        if pending.error:
+            raise IngestFailed(str(pending.error)) from pending.error
+        return pending.order_data, pending.created
+
+    def close(self):
+        """Stop the writer after it has flushed everything already queued"""
+        with self._lock:
+            if self._thread is None or self._stopping:
+                return
+            self._stopping = True
+        self._queue.put(None)
+        self._thread.join(self.timeout)
+
+    def _ensure_writer(self):
+        if self._thread is not None:
+            return
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run, name='order-ingest-writer', daemon=True
+                )
+                self._thread.start()
+
+    def _run(self):
+        while True:
+            first = self._queue.get()
+            if first is None:
+                return
+
+            batch = [first]
+            deadline = time.monotonic() + self.max_wait
+            stop = False
+            while len(batch) < self.max_batch:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    pending = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if pending is None:
+                    stop = True
+                    break
+                batch.append(pending)
+
+            self._write(batch)
+            if stop:
+                return
+
+    def _write(self, batch):
+        replays = []
+        with self.app.app_context():
+            try:
+                # Orders whose key is already taken are answered with the existing order
+                keys = [pending.order.idempotency_key for pending in batch if pending.order.idempotency_key]
+                existing = dict(db.session.query(Order.idempotency_key, Order.id).filter(
+                    Order.idempotency_key.in_(keys)
+                )) if keys else {}
+                claimed = {}
+                for pending in batch:
+                    key = pending.order.idempotency_key
+                    if key and (key in existing or key in claimed):
+                        pending.created = False
+                        pending.replay_of = claimed.get(key)
+                        replays.append(pending)
+                    elif key:
+                        claimed[key] = pending
+                batch = [pending for pending in batch if pending.created]
+
+                db.session.add_all([pending.order for pending in batch])
+                db.session.flush()  # Get the order IDs
+
+                # Each order's stock comes out under its own savepoint, so one
+                # that runs short is turned away without failing the batch
+                rejected = []
+                for pending in batch:
+                    try:
+                        with db.session.begin_nested():
+                            deduct_stock(pending.lines, pending.order.id)
+                    except InsufficientStock as e:
+                        pending.error = e
+                        rejected.append(pending)
+                for pending in rejected:
+                    db.session.delete(pending.order)
+                accepted = [pending for pending in batch if pending.error is None]
+
+                rows = [{
+                    'order_id': pending.order.id,
+                    'menu_item_id': line['menu_item_id'],
+                    'quantity': line['quantity'],
+                    'price': line['price'],
+                    'special_requests': line['special_requests']
+                } for pending in accepted for line in pending.lines]
+                if rows:
+                    db.session.execute(insert(OrderItem), rows)
+                record_order_changes([pending.order.id for pending in accepted], 'created')
+
+                orders_data = [
+                    serialize_new_order(pending.order, pending.lines) for pending in accepted
+                ]
+
+                db.session.commit()
+
+                earlier = {row['id']: row for row in serialize_orders(order_rows().filter(
+                    Order.idempotency_key.in_([pending.order.idempotency_key for pending in replays])
+                ).all())} if replays else {}
+            except Exception as e:
+                db.session.rollback()
+                self.app.logger.error(f'Error writing order batch: {str(e)}')
+                for pending in batch + replays:
+                    pending.error = e
+                    pending.done.set()
+                return
+            finally:
+                db.session.remove()
+
+        for pending in rejected:
+            pending.done.set()
+        for pending, order_data in zip(accepted, orders_data):
+            pending.order_data = order_data
+            pending.done.set()
+        for pending in replays:
+            key = pending.order.idempotency_key
+            if pending.replay_of is not None:
+                pending.order_data = pending.replay_of.order_data
+                pending.error = pending.replay_of.error
+            else:
+                pending.order_data = earlier.get(existing[key])
+            pending.done.set()
+        if not orders_data:
+            return
+
+        try:
+            emit_orders_created(orders_data)
+        except Exception as e:
+            self.app.logger.error(f'Error broadcasting order batch: {str(e)}')
+
+
+def init_order_ingestor(app):
+    """Attach a group-commit ingestor to the app using its ORDER_GROUP_COMMIT_* settings"""
+    ingestor = OrderIngestor(
+        app,
+        max_batch=app.config.get('ORDER_GROUP_COMMIT_MAX_BATCH', 50),
+        max_wait_ms=app.config.get('ORDER_GROUP_COMMIT_MAX_WAIT_MS', 5),
+        queue_size=app.config.get('ORDER_GROUP_COMMIT_QUEUE_SIZE', 1000)
+    )
+    app.extensions['order_ingestor'] = ingestor
+    atexit.register(ingestor.close)
+    return ingestor
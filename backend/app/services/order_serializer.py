@@ -0,0 +1,132 @@
+"""
+Order and kitchen payloads built from column projections.
+
+Queries here select only the columns a view needs and come back as plain
+row tuples, so listings never hydrate identity-mapped Order/OrderItem
+instances or trigger lazy loads. Items for a page of orders are fetched
+with one IN query and attached in a single pass.
+"""
+
+from app.models import MenuItem, Order, OrderItem, OrderHistory, OrderItemHistory
+from app.extensions import db
+
+
+ORDER_COLUMNS = (
+    Order.id, Order.customer_id, Order.customer_name, Order.status,
+    Order.table_number, Order.created_at
+)
+
+KITCHEN_COLUMNS = (Order.id, Order.status, Order.table_number, Order.created_at)
+
+def _iso(value):
+    return value.isoformat() if value else None
+
+
+def order_rows(*columns):
+    """Start a projected query over orders, defaulting to the listing columns"""
+    return db.session.query(*(columns or ORDER_COLUMNS))
+
+
+def history_order_rows(*columns):
+    """The same projection as order_rows(), over orders_history"""
+    return db.session.query(*(getattr(OrderHistory, c.key) for c in columns or ORDER_COLUMNS))
+
+
+def _item_select(model, order_ids):
+    return db.session.query(
+        model.order_id, model.id, model.menu_item_id, MenuItem.name,
+        model.quantity, model.price, model.special_requests
+    ).outerjoin(
+        MenuItem, MenuItem.id == model.menu_item_id
+    ).filter(model.order_id.in_(order_ids))
+
+
+def load_item_rows(order_ids, include_history=False):
+    """
+    Fetches the lines of every given order, with menu names, in one query.
+    With include_history the archived order_items_history rows are unioned in.
+    """
+    items = {order_id: [] for order_id in order_ids}
+    if not items:
+        return items
+    query = _item_select(OrderItem, items)
+    if include_history:
+        query = query.union_all(_item_select(OrderItemHistory, items))
+    for row in query.order_by(OrderItem.id):
+        items[row.order_id].append(row)
+    return items
+
+
+def _item_payload(item, unknown_name='Unknown'):
+    return {
+        'id': item.id,
+        'menu_item_id': item.menu_item_id,
+        'name': item.name or unknown_name,
+        'quantity': item.quantity,
+        'price': float(item.price) if item.price else 0.0,
+        'special_requests': item.special_requests
+    }
+
+
+def serialize_orders(rows, include_history=False):
+    """Order listing payloads for rows selected with ORDER_COLUMNS"""
+    items = load_item_rows([row.id for row in rows], include_history=include_history)
+    return [{
+        'id': row.id,
+        'customer_id': row.customer_id,
+        'customer_name': row.customer_name,
+        'status': row.status,
+        'table_number': row.table_number,
+        'created_at': _iso(row.created_at),
+        'items': [_item_payload(item) for item in items[row.id]]
+    } for row in rows]
+
+
+def serialize_kitchen_orders(rows):
+    """Kitchen ticket payloads for rows selected with KITCHEN_COLUMNS"""
+    items = load_item_rows([row.id for row in rows])
+    return [{
+        'id': row.id,
+        'tableNumber': row.table_number,
+        'status': row.status,
+        'createdAt': _iso(row.created_at),
+        'items': [{
+            'id': item.id,
+            'menuItemId': item.menu_item_id,
+            'name': item.name or 'Unknown Item',
+            'quantity': item.quantity,
+            'specialRequests': item.special_requests
+        } for item in items[row.id]]
+    } for row in rows]
+
+
+def serialize_status_updates(updates):
+    """
+    Attaches item lists to the status change dicts from bulk_update_status.
+    """
+    items = load_item_rows([update['id'] for update in updates])
+    for update in updates:
+        update['items'] = [_item_payload(item) for item in items[update['id']]]
+    return updates
+
+
+def serialize_new_order(order, lines):
+    """
+    Payload for a freshly flushed order, built from the request's own lines
+    so creation does not read its items back.
+    """
+    return {
+        'id': order.id,
+        'customer_id': order.customer_id,
+        'customer_name': order.customer_name,
+        'status': order.status,
+        'table_number': order.table_number,
+        'created_at': _iso(order.created_at),
+        'items': [{
+            'menu_item_id': line['menu_item_id'],
+            'name': line['name'],
+            'quantity': line['quantity'],
+            'price': float(line['price']),
+            'special_requests': line['special_requests']
+        } for line in lines]
+    }
@@ -0,0 +1,178 @@
+from datetime import datetime
+from sqlalchemy import insert
+from app.models import MenuItem, Order, OrderItem, OrderStatusHistory
+from app.services.prep_time import prep_minutes_for
+from app.services.order_changes import record_order_changes
+from app.services.sales_rollup import record_sales
+from app.extensions import db
+
+
+class MenuItemsUnavailable(Exception):
+    """An order names menu items that can't be ordered"""
+
+    def __init__(self, menu_item_ids):
+        super().__init__('Menu items not available: ' + ', '.join(str(i) for i in sorted(menu_item_ids)))
+        self.menu_item_ids = sorted(menu_item_ids)
+
+
+class OrderStatusConflict(Exception):
+    """Orders changed status between being read and written; nothing was applied"""
+
+    def __init__(self, order_ids):
+        super().__init__('Order status changed concurrently: ' + ', '.join(str(i) for i in sorted(order_ids)))
+        self.order_ids = sorted(order_ids)
+
+
+def fetch_menu_items(menu_item_ids):
+    """
+    Loads (name, price) for every referenced menu item that can be ordered
+    with a single IN query. Retired, disabled and out-of-stock items are
+    left out, as on the customer menu.
+    """
+    ids = {int(menu_item_id) for menu_item_id in menu_item_ids}
+    if not ids:
+        return {}
+    rows = db.session.query(MenuItem.id, MenuItem.name, MenuItem.price).filter(
+        MenuItem.id.in_(ids), MenuItem.retired_at.is_(None),
+        MenuItem.is_available == True, MenuItem.in_stock
+    ).all()
+    return {row.id: row for row in rows}
+
+
+def prepare_order_lines(items, menu_items):
+    """
+    Turns the request's item list into order line dicts. Raises
+    MenuItemsUnavailable naming every item fetch_menu_items() didn't return,
+    so an order is never placed with lines quietly missing.
+    """
+    unavailable = {int(item['menu_item_id']) for item in items} - set(menu_items)
+    if unavailable:
+        raise MenuItemsUnavailable(unavailable)
+
+    lines = []
+    for item in items:
+        menu_item = menu_items[int(item['menu_item_id'])]
+
+        # Use provided price if available, otherwise use menu item price
+        lines.append({
+            'menu_item_id': menu_item.id,
+            'name': menu_item.name,
+            'quantity': item['quantity'],
+            'price': item.get('price', menu_item.price),
+            'special_requests': item.get('special_requests', '')
+        })
+    return lines
+
+
+def insert_order_lines(order_id, lines):
+    """
+    Inserts all lines of an order as one multi-row INSERT.
+    """
+    if not lines:
+        return
+    db.session.execute(insert(OrderItem), [{
+        'order_id': order_id,
+        'menu_item_id': line['menu_item_id'],
+        'quantity': line['quantity'],
+        'price': line['price'],
+        'special_requests': line['special_requests']
+    } for line in lines])
+
+
+ORDER_STATUSES = ['pending', 'preparing', 'ready', 'served', 'completed', 'cancelled']
+
+
+def bulk_update_status(updates, allowed_statuses=ORDER_STATUSES):
+    """
+    Applies many (order_id, status) changes in one transaction.
+
+    Current statuses are read with one locking IN query and each
+    (previous, new) status pair is written with one set-based UPDATE that
+    only matches rows still at the previous status; every transition is
+    logged to order_status_history in one multi-row INSERT and stamped in
+    the order_changes log. Orders reaching or leaving 'completed' update
+    the sales rollups. Entries that fail validation are reported back
+    instead of aborting the batch. Orders
+    reaching 'ready' carry prep_minutes. Returns (updated, errors); the
+    caller commits.
+
+    The lock keeps two batches moving the same order from recording the
+    transition (and its sale) twice. Where the database ignores it (SQLite
+    reads before taking the write lock) an order can still change under the
+    batch; its UPDATE then matches fewer rows and OrderStatusConflict is
+    raised so the caller rolls back and the client can retry.
+    """
+    errors = []
+    targets = {}
+    for entry in updates:
+        order_id = entry.get('order_id') if isinstance(entry, dict) else None
+        new_status = entry.get('status') if isinstance(entry, dict) else None
+        if not isinstance(order_id, int):
+            errors.append({'order_id': order_id, 'error': 'Invalid order id'})
+        elif new_status not in allowed_statuses:
+            errors.append({'order_id': order_id, 'error': 'Invalid status'})
+        else:
+            # Last entry wins if the same order appears twice
+            targets[order_id] = new_status
+
+    if not targets:
+        return [], errors
+
+    current = {
+        row.id: row for row in db.session.query(
+            Order.id, Order.status, Order.customer_id, Order.customer_name,
+            Order.table_number, Order.created_at
+        ).filter(Order.id.in_(targets)).order_by(Order.id).with_for_update().all()
+    }
+    for order_id in list(targets):
+        if order_id not in current:
+            errors.append({'order_id': order_id, 'error': 'Order not found'})
+            del targets[order_id]
+
+    now = datetime.utcnow()
+    by_status = {}
+    for order_id, new_status in targets.items():
+        by_status.setdefault((current[order_id].status, new_status), []).append(order_id)
+    conflicts = []
+    for (previous_status, new_status), order_ids in by_status.items():
+        changed = db.session.query(Order).filter(
+            Order.id.in_(order_ids), Order.status == previous_status
+        ).update({'status': new_status, 'updated_at': now}, synchronize_session=False)
+        if changed != len(order_ids):
+            conflicts.extend(order_ids)
+    if conflicts:
+        raise OrderStatusConflict(conflicts)
+
+    transitions = [{
+        'order_id': order_id,
+        'from_status': current[order_id].status,
+        'to_status': new_status,
+        'changed_at': now
+    } for order_id, new_status in targets.items() if current[order_id].status != new_status]
+    if transitions:
+        db.session.execute(insert(OrderStatusHistory), transitions)
+
+    prep_minutes = prep_minutes_for(
+        [t['order_id'] for t in transitions if t['to_status'] == 'ready'],
+        now,
+        {order_id: row.created_at for order_id, row in current.items()}
+    )
+
+    record_order_changes(list(targets), 'updated')
+    record_sales(
+        [t['order_id'] for t in transitions if t['to_status'] == 'completed'],
+        [t['order_id'] for t in transitions if t['from_status'] == 'completed']
+    )
+
+    updated = [{
+        'id': order_id,
+        'customer_id': current[order_id].customer_id,
+        'customer_name': current[order_id].customer_name,
+        'status': new_status,
+        'previous_status': current[order_id].status,
+        'table_number': current[order_id].table_number,
+        'created_at': current[order_id].created_at.isoformat() if current[order_id].created_at else None,
+        'updated_at': now.isoformat(),
+        'prep_minutes': prep_minutes.get(order_id)
+    } for order_id, new_status in targets.items()]
+    return updated, errors
@@ -0,0 +1,269 @@
+import math
+import threading
+from datetime import datetime, timedelta
+from flask import current_app
+from sqlalchemy import and_, func, select
+from app.models import Order, OrderHistory, OrderItem, OrderItemHistory, OrderStatusHistory
+from app.services.order_changes import current_change_cursor, settled_change_cursor
+from app.extensions import db
+
+DEFAULT_PREP_MINUTES = 15
+# Below this many observations an item's own sketch is too noisy to trust
+MIN_SAMPLES = 5
+
+
+class QuantileSketch:
+    """
+    Mergeable quantile sketch with bounded relative error.
+
+    Values land in logarithmic buckets of width `relative_accuracy`, so any
+    quantile is accurate to within that fraction of the true value. Two
+    sketches merge by adding bucket counts, which lets per-item and
+    per-hour sketches be combined without keeping the raw samples.
+    """
+
+    __slots__ = ('gamma', 'log_gamma', 'buckets', 'count', 'total')
+
+    def __init__(self, relative_accuracy=0.02):
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self.log_gamma = math.log(self.gamma)
+        self.buckets = {}
+        self.count = 0
+        self.total = 0.0
+
+    def add(self, value):
+        value = max(value, 1e-3)
+        key = math.ceil(math.log(value) / self.log_gamma)
+        self.buckets[key] = self.buckets.get(key, 0) + 1
+        self.count += 1
+        self.total += value
+
+    def merge(self, other):
+        for key, count in other.buckets.items():
+            self.buckets[key] = self.buckets.get(key, 0) + count
+        self.count += other.count
+        self.total += other.total
+        return self
+
+    def quantile(self, q):
+        if not self.count:
+            return None
+        rank = q * (self.count - 1)
+        seen = 0
+        for key in sorted(self.buckets):
+            seen += self.buckets[key]
+            if seen > rank:
+                return 2 * self.gamma ** key / (self.gamma + 1)
+        return 2 * self.gamma ** max(self.buckets) / (self.gamma + 1)
+
+    @property
+    def mean(self):
+        return self.total / self.count if self.count else None
+
+
+class _DaySketches:
+    __slots__ = ('by_item', 'by_hour', 'overall')
+
+    def __init__(self):
+        self.by_item = {}
+        self.by_hour = {}
+        self.overall = QuantileSketch()
+
+
+class PrepTimeStats:
+    """
+    Preparation-time statistics per menu item and per hour of day, over the
+    last `window_days`.
+
+    One observation per transition to 'ready' in order_status_history
+    (minutes since the order last entered 'preparing', or since it was
+    placed when that step was skipped), so the kitchen endpoints read
+    estimates in constant time. Sketches are kept per day the order became
+    ready, and days that fall out of the window are dropped whole, so the
+    window is accurate to a day.
+
+    Loaded from the database the first time it is read. After that sync()
+    picks up transitions recorded since, by any worker process, and is a
+    no-op while the order_changes cursor hasn't moved, like the kitchen
+    board's.
+    """
+
+    def __init__(self, window_days=28):
+        self._lock = threading.Lock()
+        self._days = {}
+        self._seen = {}  # history id -> day, so no transition is counted twice
+        self._merged = None
+        self._loaded = False
+        self._cursor = 0
+        self._synced_at = None
+        self.window_days = window_days
+
+    def _ensure_loaded(self):
+        if not self._loaded:
+            self.rebuild()
+
+    def record(self, sample_id, menu_item_ids, ready_at, minutes):
+        """Add one ready transition, keyed by its order_status_history id"""
+        with self._lock:
+            if sample_id in self._seen:
+                return
+            day = ready_at.date()
+            self._seen[sample_id] = day
+            sketches = self._days.setdefault(day, _DaySketches())
+            for menu_item_id in set(menu_item_ids):
+                sketches.by_item.setdefault(menu_item_id, QuantileSketch()).add(minutes)
+            sketches.by_hour.setdefault(ready_at.hour, QuantileSketch()).add(minutes)
+            sketches.overall.add(minutes)
+            self._merged = None
+
+    def _view(self):
+        """Sketches merged over the days still in the window; caller holds the lock"""
+        oldest = (datetime.utcnow() - timedelta(days=self.window_days)).date()
+        expired = [day for day in self._days if day < oldest]
+        if expired:
+            for day in expired:
+                del self._days[day]
+            self._seen = {sample_id: day for sample_id, day in self._seen.items() if day >= oldest}
+            self._merged = None
+        if self._merged is None:
+            merged = _DaySketches()
+            for sketches in self._days.values():
+                for target, source in ((merged.by_item, sketches.by_item), (merged.by_hour, sketches.by_hour)):
+                    for key, sketch in source.items():
+                        target.setdefault(key, QuantileSketch()).merge(sketch)
+                merged.overall.merge(sketches.overall)
+            self._merged = merged
+        return self._merged
+
+    def estimate(self, menu_item_id=None, hour=None):
+        """Median prep minutes for an item, falling back to the hour, then overall"""
+        self._ensure_loaded()
+        with self._lock:
+            view = self._view()
+            for sketch in (view.by_item.get(menu_item_id), view.by_hour.get(hour), view.overall):
+                if sketch is not None and sketch.count >= MIN_SAMPLES:
+                    return round(sketch.quantile(0.5))
+        return DEFAULT_PREP_MINUTES
+
+    def summary(self):
+        self._ensure_loaded()
+        with self._lock:
+            overall = self._view().overall
+            if not overall.count:
+                return {'avg': DEFAULT_PREP_MINUTES, 'p50': None, 'p90': None, 'samples': 0}
+            return {
+                'avg': round(overall.mean, 1),
+                'p50': round(overall.quantile(0.5), 1),
+                'p90': round(overall.quantile(0.9), 1),
+                'samples': overall.count
+            }
+
+    def _load(self, since):
+        """
+        Every ready transition from `since` on, as (id, menu_item_ids,
+        ready_at, minutes). Three range queries over the (to_status,
+        changed_at) index, joined by order id to the preparing transitions,
+        the orders and their lines.
+        """
+        ready = OrderStatusHistory.__table__.alias('ready')
+        in_range = and_(ready.c.to_status == 'ready', ready.c.changed_at >= since)
+        preparing = OrderStatusHistory.__table__.alias('preparing')
+        rows = db.session.execute(
+            select(
+                ready.c.id, ready.c.order_id, ready.c.changed_at,
+                func.coalesce(func.max(preparing.c.changed_at), Order.created_at, OrderHistory.created_at, type_=db.DateTime)
+            ).select_from(ready)
+            .outerjoin(preparing, and_(
+                preparing.c.order_id == ready.c.order_id,
+                preparing.c.to_status == 'preparing'
+            ))
+            .outerjoin(Order, Order.id == ready.c.order_id)
+            .outerjoin(OrderHistory, OrderHistory.id == ready.c.order_id)
+            .where(in_range)
+            .group_by(ready.c.id, ready.c.order_id, ready.c.changed_at, Order.created_at, OrderHistory.created_at)
+        ).all()
+
+        items = {}
+        for model in (OrderItem, OrderItemHistory):
+            for order_id, menu_item_id in db.session.execute(
+                select(model.order_id, model.menu_item_id).join(
+                    ready, ready.c.order_id == model.order_id
+                ).where(in_range).distinct()
+            ):
+                items.setdefault(order_id, []).append(menu_item_id)
+
+        samples = []
+        for sample_id, order_id, ready_at, started in rows:
+            if started is None or started > ready_at:
+                continue
+            samples.append((sample_id, items.get(order_id, []), ready_at,
+                            (ready_at - started).total_seconds() / 60))
+        return samples
+
+    def rebuild(self, window_days=None):
+        """
+        Reload the sketches from order_status_history for the last
+        `window_days` (default: the instance's window).
+        """
+        window_days = window_days or self.window_days
+        # Read first so transitions racing the load are picked up by sync()
+        cursor = settled_change_cursor()
+        now = datetime.utcnow()
+        fresh = PrepTimeStats(window_days)
+        for sample in self._load(now - timedelta(days=window_days)):
+            fresh.record(*sample)
+        with self._lock:
+            self._days, self._seen, self._merged = fresh._days, fresh._seen, None
+            self.window_days = window_days
+            self._loaded = True
+            self._cursor, self._synced_at = cursor, now
+
+    def sync(self, cursor=None, settled=None):
+        """
+        Add the ready transitions recorded since the last sync, by any
+        worker. Pass the change cursors when already read. A no-op while
+        nothing has changed past the settled cursor; otherwise one range
+        query from the last sync, reaching back by the commit lag for
+        transitions that committed late.
+        """
+        if not self._loaded:
+            self.rebuild()
+            return
+        settled = settled_change_cursor() if settled is None else settled
+        cursor = current_change_cursor() if cursor is None else cursor
+        if cursor <= self._cursor:
+            return
+        now = datetime.utcnow()
+        lag = current_app.config.get('ORDER_CHANGE_COMMIT_LAG_SECONDS', 10)
+        for sample in self._load(self._synced_at - timedelta(seconds=lag)):
+            self.record(*sample)
+        with self._lock:
+            # Like the kitchen board, only move up to the settled cursor, so
+            # a change committing late still triggers a sync
+            self._cursor, self._synced_at = max(self._cursor, min(settled, cursor)), now
+
+
+def prep_minutes_for(order_ids, now, created_at):
+    """
+    Minutes each order spent being prepared, for orders moving to 'ready'.
+
+    Uses the latest 'preparing' transition, or the order's created_at when
+    it went straight to ready. One query for the whole batch.
+    """
+    if not order_ids:
+        return {}
+    started = dict(db.session.query(
+        OrderStatusHistory.order_id, func.max(OrderStatusHistory.changed_at)
+    ).filter(
+        OrderStatusHistory.to_status == 'preparing',
+        OrderStatusHistory.order_id.in_(order_ids)
+    ).group_by(OrderStatusHistory.order_id).all())
+    minutes = {}
+    for order_id in order_ids:
+        start = started.get(order_id) or created_at.get(order_id)
+        if start is not None and start <= now:
+            minutes[order_id] = round((now - start).total_seconds() / 60, 2)
+    return minutes
+
+
+prep_time_stats = PrepTimeStats()
@@ -0,0 +1,190 @@
+"""
+Hourly and daily sales rollups behind the dashboard and sales reports.
+
+bulk_update_status() calls record_sales() in the same transaction for every
+order that reaches 'completed' or leaves it (cancelled after completion,
+or moved back). Each affected rollup row gets one atomic increment, an
+INSERT ... ON CONFLICT / ON DUPLICATE KEY upsert, so concurrent
+completions don't lose updates and no read-modify-write is needed. Orders
+count towards the hour and day they were placed in, in UTC like
+created_at.
+
+rebuild_sales_rollups() recomputes them from orders and orders_history
+with set-based INSERT ... SELECTs, for a backfill or after a bulk change.
+"""
+from collections import defaultdict
+from datetime import datetime, timedelta
+from decimal import Decimal
+from sqlalchemy import delete, func, insert, literal, select, union_all
+from sqlalchemy.dialects.mysql import insert as mysql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from app.models import Order, OrderItem, OrderHistory, OrderItemHistory, SalesRollup, SalesItemRollup
+from app.extensions import db
+
+PERIODS = {'hour': timedelta(hours=1), 'day': timedelta(days=1)}
+CENT = Decimal('0.01')
+
+
+def bucket_start(moment, period):
+    """Start of the hour or day `moment` falls in"""
+    if period == 'day':
+        return moment.replace(hour=0, minute=0, second=0, microsecond=0)
+    return moment.replace(minute=0, second=0, microsecond=0)
+
+
+def _bucket_start_sql(created_at, period):
+    """bucket_start() in SQL, stored exactly as the ORM would store the datetime"""
+    dialect = db.engine.dialect.name
+    if dialect == 'sqlite':
+        return func.strftime('%Y-%m-%d 00:00:00.000000' if period == 'day' else '%Y-%m-%d %H:00:00.000000', created_at)
+    if dialect == 'mysql':
+        return func.date_format(created_at, '%Y-%m-%d 00:00:00' if period == 'day' else '%Y-%m-%d %H:00:00')
+    raise ValueError(f'No sales rollup support for {dialect}')
+
+
+def _add(model, rows, keys, counters):
+    """Add each row's counters onto the row with the same keys, inserting it when there is none"""
+    if not rows:
+        return
+    # Same lock order in every transaction
+    rows = sorted(rows, key=lambda row: tuple(row[key] for key in keys))
+    dialect = db.engine.dialect.name
+    if dialect == 'sqlite':
+        statement = sqlite_insert(model)
+        added = statement.excluded
+    elif dialect == 'mysql':
+        statement = mysql_insert(model)
+        added = statement.inserted
+    else:
+        raise ValueError(f'No sales rollup support for {dialect}')
+    values = {column: getattr(model, column) + added[column] for column in counters}
+    if 'updated_at' in rows[0]:
+        values['updated_at'] = added['updated_at']
+    if dialect == 'sqlite':
+        statement = statement.on_conflict_do_update(index_elements=keys, set_=values)
+    else:
+        statement = statement.on_duplicate_key_update(values)
+    db.session.execute(statement, rows)
+
+
+def record_sales(completed_order_ids=(), reverted_order_ids=()):
+    """
+    Add orders that just reached 'completed' to the rollups and take out
+    ones that just left it. One read of the orders' lines, then one upsert
+    per rollup table; the caller commits.
+    """
+    signs = {order_id: 1 for order_id in completed_order_ids}
+    signs.update({order_id: -1 for order_id in reverted_order_ids})
+    if not signs:
+        return
+
+    totals = defaultdict(lambda: {'revenue': Decimal(0), 'orders': 0, 'items': 0})
+    by_item = defaultdict(lambda: {'quantity': 0, 'revenue': Decimal(0)})
+    counted = set()
+    for order_id, created_at, menu_item_id, quantity, revenue in db.session.query(
+        Order.id, Order.created_at, OrderItem.menu_item_id,
+        func.sum(OrderItem.quantity), func.sum(OrderItem.quantity * OrderItem.price)
+    ).outerjoin(OrderItem, OrderItem.order_id == Order.id).filter(
+        Order.id.in_(signs)
+    ).group_by(Order.id, Order.created_at, OrderItem.menu_item_id):
+        if created_at is None:
+            continue
+        sign = signs[order_id]
+        quantity = sign * int(quantity or 0)
+        revenue = sign * Decimal(str(revenue or 0)).quantize(CENT)
+        for period in PERIODS:
+            start = bucket_start(created_at, period)
+            total = totals[(period, start)]
+            total['revenue'] += revenue
+            total['items'] += quantity
+            if (order_id, period) not in counted:
+                counted.add((order_id, period))
+                total['orders'] += sign
+            if menu_item_id is not None:
+                item = by_item[(period, start, menu_item_id)]
+                item['quantity'] += quantity
+                item['revenue'] += revenue
+
+    now = datetime.utcnow()
+    _add(SalesRollup, [
+        dict(total, period=period, bucket_start=start, updated_at=now)
+        for (period, start), total in totals.items()
+    ], ['period', 'bucket_start'], ['revenue', 'orders', 'items'])
+    _add(SalesItemRollup, [
+        dict(item, period=period, bucket_start=start, menu_item_id=menu_item_id)
+        for (period, start, menu_item_id), item in by_item.items()
+    ], ['period', 'bucket_start', 'menu_item_id'], ['quantity', 'revenue'])
+
+
+def rebuild_sales_rollups(since=None):
+    """
+    Recompute the rollups from completed orders, live and archived, placed
+    from the start of `since`'s day onwards (everything when None).
+    Replaces the rows in that range in the caller's transaction; returns
+    the number of rollup rows written.
+    """
+    if since is not None:
+        since = bucket_start(since, 'day')
+    for model in (SalesRollup, SalesItemRollup):
+        statement = delete(model)
+        if since is not None:
+            statement = statement.where(model.bucket_start >= since)
+        db.session.execute(statement)
+
+    parts = []
+    for order_model, item_model in ((Order, OrderItem), (OrderHistory, OrderItemHistory)):
+        part = select(
+            order_model.id.label('order_id'), order_model.created_at.label('created_at'),
+            item_model.menu_item_id.label('menu_item_id'), item_model.quantity.label('quantity'),
+            (item_model.quantity * item_model.price).label('revenue')
+        ).outerjoin(item_model, item_model.order_id == order_model.id).where(
+            order_model.status == 'completed', order_model.created_at.isnot(None)
+        )
+        if since is not None:
+            part = part.where(order_model.created_at >= since)
+        parts.append(part)
+    lines = union_all(*parts).subquery()
+
+    now = datetime.utcnow()
+    written = 0
+    for period in PERIODS:
+        start = _bucket_start_sql(lines.c.created_at, period)
+        written += db.session.execute(insert(SalesRollup).from_select(
+            ['period', 'bucket_start', 'revenue', 'orders', 'items', 'updated_at'],
+            select(
+                literal(period), start, func.round(func.coalesce(func.sum(lines.c.revenue), 0), 2),
+                func.count(func.distinct(lines.c.order_id)), func.coalesce(func.sum(lines.c.quantity), 0),
+                literal(now)
+            ).group_by(start)
+        )).rowcount
+        written += db.session.execute(insert(SalesItemRollup).from_select(
+            ['period', 'bucket_start', 'menu_item_id', 'quantity', 'revenue'],
+            select(
+                literal(period), start, lines.c.menu_item_id,
+                func.sum(lines.c.quantity), func.round(func.sum(lines.c.revenue), 2)
+            ).where(lines.c.menu_item_id.isnot(None)).group_by(start, lines.c.menu_item_id)
+        )).rowcount
+    return written
+
+
+def sales_totals(period, start, end):
+    """SalesRollup rows for buckets starting in [start, end), in order"""
+    return db.session.query(SalesRollup).filter(
+        SalesRollup.period == period,
+        SalesRollup.bucket_start >= start,
+        SalesRollup.bucket_start < end
+    ).order_by(SalesRollup.bucket_start).all()
+
+
+def top_menu_items(period, start, end, limit=10):
+    """(menu_item_id, quantity, revenue) of the best sellers over [start, end), from the item rollups"""
+    quantity = func.sum(SalesItemRollup.quantity)
+    return db.session.query(
+        SalesItemRollup.menu_item_id, quantity.label('quantity'), func.sum(SalesItemRollup.revenue).label('revenue')
+    ).filter(
+        SalesItemRollup.period == period,
+        SalesItemRollup.bucket_start >= start,
+        SalesItemRollup.bucket_start < end
+    ).group_by(SalesItemRollup.menu_item_id).having(quantity > 0).order_by(
+        quantity.desc(), SalesItemRollup.menu_item_id
+    ).limit(limit).all()
@@ -0,0 +1,132 @@
+"""
+Local stand-in for the Socket.IO message queue.
+
+With SOCKETIO_MESSAGE_QUEUE=local://127.0.0.1:6390 every worker publishes
+its emits to a small TCP relay (`flask socketio-relay`), which fans them out
+to all subscribed workers, so an event emitted by one worker reaches the
+clients connected to any of them. It needs nothing beyond the standard
+library and is meant for development, tests and the fan-out benchmark;
+production deployments point SOCKETIO_MESSAGE_QUEUE at redis://, amqp://
+or kafka:// and Flask-SocketIO picks the matching manager.
+
+Wire format: one line per message, "<channel> <json>\\n". A connection that
+starts with a "SUBSCRIBE" line receives everything published afterwards.
+"""
+import socket
+import socketserver
+import threading
+import time
+from urllib.parse import urlparse
+import socketio
+
+DEFAULT_PORT = 6390
+_SUBSCRIBE = b'SUBSCRIBE\n'
+
+
+def parse_relay_url(url):
+    parsed = urlparse(url)
+    return parsed.hostname or '127.0.0.1', parsed.port or DEFAULT_PORT
+
+
+class _RelayHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        relay = self.server
+        first = self.rfile.readline()
+        if first == _SUBSCRIBE:
+            with relay.lock:
+                relay.subscribers.add(self.wfile)
+            try:
+                # Subscribers never send anything else; wait for them to hang up
+                while self.rfile.readline():
+                    pass
+            finally:
+                with relay.lock:
+                    relay.subscribers.discard(self.wfile)
+            return
+
+        line = first
+        while line:
+            relay.publish(line)
+            line = self.rfile.readline()
+
+
+class SocketRelay(socketserver.ThreadingTCPServer):
+    """Fan-out relay: every published line goes to every subscriber"""
+
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, address):
+        super().__init__(address, _RelayHandler)
+        self.lock = threading.Lock()
+        self.subscribers = set()
+
+    def publish(self, line):
+        with self.lock:
+            for subscriber in list(self.subscribers):
+                try:
+                    subscriber.write(line)
+                    subscriber.flush()
+                except OSError:
+                    self.subscribers.discard(subscriber)
+
+
+def start_relay(url):
+    """Start a relay on a daemon thread; returns the server (shutdown() stops it)"""
+    relay = SocketRelay(parse_relay_url(url))
+    threading.Thread(target=relay.serve_forever, daemon=True).start()
+    return relay
+
+
+class LocalRelayManager(socketio.PubSubManager):
+    """Socket.IO client manager that shares emits through a SocketRelay"""
+
+    name = 'local'
+
+    def __init__(self, url='local://127.0.0.1:6390', channel='flask-socketio',
+                 write_only=False, logger=None):
+        super().__init__(channel=channel, write_only=write_only, logger=logger)
+        self.address = parse_relay_url(url)
+        self._lock = threading.Lock()
+        self._sock = None
+
+    def _connect(self):
+        sock = socket.create_connection(self.address)
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        return sock
+
+    def _publish(self, data):
+        line = f'{self.channel} {self.json.dumps(data)}\n'.encode('utf-8')
+        with self._lock:
+            for _ in range(2):
+                try:
+                    if self._sock is None:
+                        self._sock = self._connect()
+                    self._sock.sendall(line)
+                    return
+                except OSError:
+                    # Relay restarted: reconnect once, then give up on this message
+                    if self._sock is not None:
+                        self._sock.close()
+                    self._sock = None
+        self._get_logger().error('Socket relay unreachable, event not shared with other workers')
+
+    def _listen(self):
+        prefix = f'{self.channel} '
+        while True:
+            try:
+                sock = self._connect()
+            except OSError:
+                time.sleep(1)
+                continue
+            try:
+                sock.sendall(_SUBSCRIBE)
+                with sock.makefile('r', encoding='utf-8') as reader:
+                    for line in reader:
+                        if line.startswith(prefix):
+                            yield line[len(prefix):]
+            except OSError:
+                pass
+            finally:
+                sock.close()
+            time.sleep(1)
@@ -1,40 +1,150 @@
-from flask_socketio import SocketIO, emit, join_room, leave_room
+from flask_socketio import SocketIO, emit, join_room, leave_room, rooms
 from flask import request
 from flask_jwt_extended import decode_token
 from .extensions import db
 from .models import Order
+from .services.kitchen_board import kitchen_board
+from .services.socket_relay import LocalRelayManager
+from .services.order_events import OrderEventCoalescer
+from .services.event_replay import EventReplayBuffer
+from .services.event_dispatch import EventDispatcher
+from .services.order_changes import current_change_cursor
+from .utils.order_tokens import load_order_token
+import atexit
 import os
 
 socketio = SocketIO(cors_allowed_origins="*")
 
+# Every order event is numbered per room and kept for replay (see event_replay)
+event_replay = EventReplayBuffer()
+
+# Emits run on a background task, off the request path (see event_dispatch)
+event_dispatcher = EventDispatcher(start_task=lambda task: socketio.start_background_task(task))
+
+def _send_to_room(event, data, room):
+    event_replay.send(
+        room, event, data,
+        lambda event, data, meta: socketio.emit(event, (data, meta), to=room)
+    )
+
+def emit_to_room(event, data, room):
+    """Queue a numbered event; clients get (data, {'room', 'seq', 'stream'})"""
+    event_dispatcher.submit(_send_to_room, event, data, room)
+
+# Status updates go out as coalesced 'order:delta' frames (see order_events)
+order_events = OrderEventCoalescer(
+    emit=emit_to_room,
+    start_task=lambda task: socketio.start_background_task(task),
+    sleep=lambda seconds: socketio.sleep(seconds)
+)
+
 def init_socketio(app):
-    socketio.init_app(app)
+    # With a message queue every emit is shared with the other worker
+    # processes, so clients get events whichever worker they are connected to
+    options = {}
+    message_queue = app.config.get('SOCKETIO_MESSAGE_QUEUE')
+    channel = app.config.get('SOCKETIO_CHANNEL', 'flask-socketio')
+    if message_queue and message_queue.startswith('local://'):
+        options['client_manager'] = LocalRelayManager(message_queue, channel=channel)
+    elif message_queue:
+        options['message_queue'] = message_queue
+        options['channel'] = channel
+    socketio.init_app(app, **options)
+    # 0 disables coalescing and sends full 'order:updated' payloads instead
+    order_events.window = app.config.get('SOCKETIO_COALESCE_MS', 50) / 1000
+    order_events.max_orders = app.config.get('SOCKETIO_COALESCE_MAX_ORDERS', 10000)
+    event_replay.size = app.config.get('SOCKETIO_REPLAY_BUFFER', 500)
+    # Other workers' events aren't in this worker's buffer: resume means resync
+    event_replay.replayable = not message_queue
+    # 0 emits inline on the request thread
+    event_dispatcher.queue_size = app.config.get('SOCKETIO_DISPATCH_QUEUE_SIZE', 10000)
+    atexit.register(event_dispatcher.close)
     
     @socketio.on('connect')
     def handle_connect():
-        try:
-            # Get token from query string
-            token = request.args.get('token')
-            if not token:
+        # Guests connect without a JWT and follow single orders through
+        # their tracking token (?order_token= or 'order:subscribe')
+        order_token = request.args.get('order_token')
+        if order_token:
+            order_id = load_order_token(order_token)
+            if order_id is None:
                 return False
-            
+            join_room(order_room(order_id))
+
+        token = request.args.get('token')
+        if not token:
+            emit_stream_position()
+            return
+        try:
             # Verify token
             decoded = decode_token(token)
             user_id = decoded['sub']['id']
             print(f"Client connected: {user_id}")
-            
-            # Join room for user's role
+
+            # Only the user's own updates, plus every ticket for kitchen staff
+            join_room(user_room(user_id))
             role = decoded['sub'].get('role', 'customer')
-            join_room(role)
-            
-            # If kitchen staff, join kitchen room
             if role in ['kitchen', 'admin']:
                 join_room('kitchen')
-                
+
         except Exception as e:
             print(f"Authentication failed: {str(e)}")
             return False
-    
+        emit_stream_position()
+
+    def emit_stream_position():
+        # Where each of this socket's rooms is now, so the client knows what
+        # to send to 'events:resume' after a reconnect
+        emit('events:stream', {
+            'stream': event_replay.stream,
+            'seq': {room: event_replay.last_seq(room) for room in rooms() if room != request.sid}
+        })
+
+    @socketio.on('events:resume')
+    def handle_events_resume(data):
+        """
+        Replay what a reconnecting client missed.
+
+        Takes {'stream': ..., 'seq': {room: last seq seen}} and acks with
+        {'stream', 'events': [{'room', 'seq', 'event', 'data'}, ...],
+        'resync': [rooms to refetch in full], 'seq': {room: current seq}}.
+        Only rooms this socket has joined are replayed, and with several
+        workers behind a message queue every joined room is a resync.
+        """
+        data = data or {}
+        joined = [room for room in rooms() if room != request.sid]
+        missed, resync = [], []
+        for room, seq in (data.get('seq') or {}).items():
+            if room not in joined:
+                continue
+            events = event_replay.since(room, seq, data.get('stream')) if isinstance(seq, int) else None
+            if events is None:
+                resync.append(room)
+            else:
+                missed.extend(events)
+        return {
+            'stream': event_replay.stream,
+            'events': missed,
+            'resync': resync,
+            'seq': {room: event_replay.last_seq(room) for room in joined}
+        }
+
+    @socketio.on('order:subscribe')
+    def handle_order_subscribe(data):
+        order_id = load_order_token((data or {}).get('token') or '')
+        if order_id is None:
+            return {'error': 'Invalid or expired order token'}
+        join_room(order_room(order_id))
+        return {'subscribed': order_id}
+
+    @socketio.on('order:unsubscribe')
+    def handle_order_unsubscribe(data):
+        order_id = load_order_token((data or {}).get('token') or '')
+        if order_id is None:
+            return {'error': 'Invalid or expired order token'}
+        leave_room(order_room(order_id))
+        return {'unsubscribed': order_id}
+
     @socketio.on('disconnect')
     def handle_disconnect():
         print('Client disconnected')
@@ -43,9 +153,49 @@ def init_socketio(app):
 
 def emit_order_created(order_data):
     """Emit event when a new order is created"""
-    socketio.emit('order:created', order_data, room='kitchen')
+    kitchen_board.apply_created([order_data])
+    emit_to_room('order:created', order_data, 'kitchen')
+
+def emit_orders_created(orders_data):
+    """Emit 'order:created' for each of a batch of orders committed together"""
+    kitchen_board.apply_created(orders_data)
+    for order_data in orders_data:
+        emit_to_room('order:created', order_data, 'kitchen')
+
+def user_room(user_id):
+    return f'user:{user_id}'
+
+def order_room(order_id):
+    return f'order:{order_id}'
+
+def _order_rooms(order_data):
+    """Kitchen, plus the owner's user room or, for guest orders, the order's own room"""
+    if order_data.get('customer_id') is not None:
+        return {'kitchen', user_room(order_data['customer_id'])}
+    return {'kitchen', order_room(order_data['id'])}
 
 def emit_order_updated(order_data):
     """Emit event when an order is updated"""
-    socketio.emit('order:updated', order_data, room='kitchen')
-    socketio.emit('order:updated', order_data, to=str(order_data['customer_id']))
\ No newline at end of file
+    kitchen_board.apply_updated([order_data])
+    if order_events.window:
+        order_events.add([order_data], current_change_cursor(), _order_rooms)
+        return
+    for room in _order_rooms(order_data):
+        emit_to_room('order:updated', order_data, room)
+
+def emit_orders_updated(orders_data):
+    """Emit one combined 'orders:updated' list per room for a batch of status changes"""
+    kitchen_board.apply_updated(orders_data)
+    if order_events.window:
+        order_events.add(orders_data, current_change_cursor(), _order_rooms)
+        return
+    by_room = {}
+    for order_data in orders_data:
+        for room in _order_rooms(order_data):
+            by_room.setdefault(room, []).append(order_data)
+    for room, room_orders in by_room.items():
+        emit_to_room('orders:updated', room_orders, room)
+
+def emit_inventory_low(items):
+    """Tell staff screens about items that crossed their low-stock threshold, either way"""
+    emit_to_room('inventory:low', items, 'kitchen')
@@ -0,0 +1,16 @@
+from flask import request, make_response
+
+
+def not_modified(etag):
+    """A bare 304 when the client's If-None-Match already has `etag`, else None"""
+    if request.if_none_match.contains(etag):
+        response = make_response('', 304)
+        response.set_etag(etag)
+        return response
+    return None
+
+
+def with_change_cursor(response, etag, cursor):
+    response.set_etag(etag)
+    response.headers['X-Change-Cursor'] = str(cursor)
+    return response
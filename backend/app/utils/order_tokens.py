@@ -0,0 +1,23 @@
+from flask import current_app
+from itsdangerous import BadSignature, URLSafeTimedSerializer
+
+_SALT = 'order-tracking'
+
+
+def _serializer():
+    return URLSafeTimedSerializer(current_app.config['SECRET_KEY'], salt=_SALT)
+
+
+def make_order_token(order_id):
+    """Signed token that lets its holder follow one order's updates"""
+    return _serializer().dumps(order_id)
+
+
+def load_order_token(token):
+    """The order id a tracking token was issued for, or None if it is invalid or expired"""
+    max_age = current_app.config.get('ORDER_TRACKING_TOKEN_MAX_AGE', 86400)
+    try:
+        order_id = _serializer().loads(token, max_age=max_age)
+    except BadSignature:
+        return None
+    return order_id if isinstance(order_id, int) else None
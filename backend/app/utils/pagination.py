@@ -0,0 +1,72 @@
+import base64
+import json
+from datetime import datetime
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+
+def parse_limit(value, default=DEFAULT_PAGE_SIZE, maximum=MAX_PAGE_SIZE):
+    """Parse a ?limit= query parameter, clamped to [1, maximum]"""
+    if value is None or value == '':
+        return default
+    try:
+        limit = int(value)
+    except ValueError:
+        raise ValueError('limit must be a positive integer')
+    if limit < 1:
+        raise ValueError('limit must be a positive integer')
+    return min(limit, maximum)
+
+
+def parse_datetime(value):
+    """Parse an ISO date or datetime query parameter, returning None when absent"""
+    if not value:
+        return None
+    return datetime.fromisoformat(value)
+
+
+def encode_cursor(*values):
+    """Encode a keyset position as an opaque URL-safe token.
+
+    Datetimes are stored as ISO strings so they survive the JSON round trip.
+    """
+    payload = [
+        {'dt': v.isoformat()} if isinstance(v, datetime) else v
+        for v in values
+    ]
+    raw = json.dumps(payload, separators=(',', ':')).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def decode_cursor(token, *types):
+    """Decode a token produced by encode_cursor back into its values.
+
+    When `types` are given the cursor must hold exactly one value of each,
+    in order (a type or tuple of types, as for isinstance). Anything else
+    raises ValueError, like a token that doesn't decode at all.
+    """
+    padded = token + '=' * (-len(token) % 4)
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (ValueError, TypeError):
+        raise ValueError('Invalid cursor')
+    if not isinstance(payload, list):
+        raise ValueError('Invalid cursor')
+    values = []
+    for v in payload:
+        if isinstance(v, dict):
+            if set(v) != {'dt'} or not isinstance(v['dt'], str):
+                raise ValueError('Invalid cursor')
+            try:
+                v = datetime.fromisoformat(v['dt'])
+            except ValueError:
+                raise ValueError('Invalid cursor')
+        elif isinstance(v, list):
+            raise ValueError('Invalid cursor')
+        values.append(v)
+    if types and (len(values) != len(types) or not all(
+        isinstance(v, t) and not isinstance(v, bool) for v, t in zip(values, types)
+    )):
+        raise ValueError('Invalid cursor')
+    return values
@@ -0,0 +1,189 @@
+"""
+EXPLAIN checks for the queries on the hot request paths.
+
+Each entry in HOT_QUERIES builds the query a route actually runs. check_plans()
+asks the database for its plan and flags any table it reads end to end,
+in table or index order, so a dropped or unusable index shows up before it
+shows up as latency.
+"""
+from datetime import datetime, timedelta
+from sqlalchemy import func
+from app.models import (
+    InventoryItem, MenuItem, Order, OrderChange, OrderItem, OrderHistory, Reservation, Review, SalesRollup
+)
+from app.extensions import db
+
+
+def _active_orders():
+    return db.session.query(Order.id).filter(
+        Order.status.in_(['pending', 'preparing', 'ready'])
+    ).order_by(Order.created_at.asc())
+
+
+def _active_status_counts():
+    return db.session.query(Order.status, func.count(Order.id)).filter(
+        Order.status.in_(['pending', 'preparing', 'ready'])
+    ).group_by(Order.status)
+
+
+def _newest_order():
+    return db.session.query(func.max(Order.created_at)).scalar_subquery()
+
+
+def _order_page():
+    return db.session.query(Order.id).filter(
+        Order.created_at <= _newest_order()
+    ).order_by(Order.created_at.desc(), Order.id.desc()).limit(50)
+
+
+def _order_page_by_status():
+    since = datetime.utcnow() - timedelta(days=1)
+    return db.session.query(Order.id).filter(
+        Order.status.in_(['completed']), Order.created_at >= since
+    ).order_by(Order.created_at.desc(), Order.id.desc()).limit(50)
+
+
+def _customer_orders():
+    return db.session.query(Order.id).filter(Order.customer_id == 1).order_by(
+        Order.created_at.desc()
+    ).limit(50)
+
+
+def _history_page():
+    since = datetime.utcnow() - timedelta(days=90)
+    return db.session.query(OrderHistory.id).filter(
+        OrderHistory.created_at >= since
+    ).order_by(OrderHistory.created_at.desc(), OrderHistory.id.desc()).limit(50)
+
+
+def _newest_archived_order():
+    return db.session.query(func.max(OrderHistory.created_at))
+
+
+def _order_items_for_page():
+    return db.session.query(OrderItem.id, MenuItem.name).outerjoin(
+        MenuItem, MenuItem.id == OrderItem.menu_item_id
+    ).filter(OrderItem.order_id.in_([1, 2, 3]))
+
+
+def _today_revenue():
+    today = datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
+    return db.session.query(SalesRollup.revenue).filter(
+        SalesRollup.period == 'day', SalesRollup.bucket_start == today
+    )
+
+
+def _recent_orders():
+    return db.session.query(Order.id).filter(
+        Order.created_at <= _newest_order()
+    ).order_by(Order.created_at.desc(), Order.id.desc()).limit(5)
+
+
+def _sales_report():
+    since = datetime.utcnow() - timedelta(days=30)
+    return db.session.query(SalesRollup.bucket_start, SalesRollup.revenue).filter(
+        SalesRollup.period == 'day', SalesRollup.bucket_start >= since
+    ).order_by(SalesRollup.bucket_start)
+
+
+def _order_changes_since():
+    return db.session.query(OrderChange.order_id).filter(
+        OrderChange.id > 1000, OrderChange.id <= 2000
+    ).distinct()
+
+
+def _settled_change_cursor():
+    return db.session.query(OrderChange.id).filter(
+        OrderChange.changed_at < datetime.utcnow() - timedelta(seconds=10)
+    ).order_by(OrderChange.changed_at.desc()).limit(1)
+
+
+def _menu_by_category():
+    return db.session.query(MenuItem.id).filter(
+        MenuItem.category.in_(['main', 'dessert']), MenuItem.is_available == True
+    ).order_by(MenuItem.id).limit(50)
+
+
+def _inventory_for_menu_item():
+    return db.session.query(InventoryItem.id).filter(InventoryItem.menu_item_id == 1)
+
+
+def _low_stock_page():
+    return db.session.query(InventoryItem.id).filter(
+        InventoryItem.is_low == True, InventoryItem.id > 0
+    ).order_by(InventoryItem.id).limit(50)
+
+
+def _approved_reviews_by_rating():
+    return db.session.query(func.count(Review.id)).filter(
+        Review.status == 'approved', Review.rating == 5
+    )
+
+
+def _reservations_for_day():
+    return db.session.query(Reservation.id).filter(
+        Reservation.date == datetime.utcnow().date()
+    ).order_by(Reservation.time)
+
+
+HOT_QUERIES = {
+    'kitchen active orders': _active_orders,
+    'kitchen status counts': _active_status_counts,
+    'order listing page': _order_page,
+    'order listing by status and date': _order_page_by_status,
+    'customer order listing': _customer_orders,
+    'order history page': _history_page,
+    'newest archived order': _newest_archived_order,
+    'order items for a page': _order_items_for_page,
+    'today revenue': _today_revenue,
+    'dashboard recent orders': _recent_orders,
+    'sales report': _sales_report,
+    'order changes since cursor': _order_changes_since,
+    'settled change cursor': _settled_change_cursor,
+    'menu search by category': _menu_by_category,
+    'inventory for menu item': _inventory_for_menu_item,
+    'low stock page': _low_stock_page,
+    'approved reviews by rating': _approved_reviews_by_rating,
+    'reservations for a day': _reservations_for_day,
+}
+
+
+def _compile(query):
+    return str(query.statement.compile(
+        dialect=db.engine.dialect, compile_kwargs={'literal_binds': True}
+    ))
+
+
+def explain(query):
+    """
+    Returns (plan_lines, full_scans) for a query on the current database.
+    """
+    sql = _compile(query)
+    dialect = db.engine.dialect.name
+    if dialect == 'sqlite':
+        rows = db.session.execute(db.text(f'EXPLAIN QUERY PLAN {sql}')).all()
+        lines = [row[3] for row in rows]
+        # Any SCAN reads the whole table, in rowid or index order alike:
+        # "SCAN orders USING INDEX ..." is still every row, just sorted.
+        # Only SEARCH seeks into a bounded range of an index.
+        scans = [line.split()[1] for line in lines if line.startswith('SCAN ')]
+    elif dialect == 'mysql':
+        result = db.session.execute(db.text(f'EXPLAIN {sql}'))
+        rows = [dict(row._mapping) for row in result]
+        lines = [
+            f"{row['table']}: type={row['type']} key={row['key']} rows={row['rows']} {row.get('Extra') or ''}"
+            for row in rows
+        ]
+        # 'index' is MySQL's full index scan, SQLite's SCAN ... USING INDEX
+        scans = [row['table'] for row in rows if row['type'] in ('ALL', 'index')]
+    else:
+        raise ValueError(f'No EXPLAIN support for {dialect}')
+    return lines, scans
+
+
+def check_plans(queries=None):
+    """Explain every hot query; returns {name: (plan_lines, full_scans)}"""
+    results = {}
+    for name, build in (queries or HOT_QUERIES).items():
+        results[name] = explain(build())
+    return results
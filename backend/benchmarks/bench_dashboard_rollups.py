@@ -0,0 +1,87 @@
+# backend/benchmarks/bench_dashboard_rollups.py
+"""
+GET /api/dashboard/stats latency as completed orders pile up: the old
+queries (today's revenue joined over order_items and orders, and a GROUP BY
+over every order for the five most recent) versus the endpoint as it is
+now, reading the sales rollups.
+
+    python benchmarks/bench_dashboard_rollups.py [orders,orders,...] [requests]
+"""
+import random
+import sys
+from datetime import datetime, timedelta
+from common import make_app, timed
+
+
+def seed(db, start_id, count, days):
+    from sqlalchemy import insert
+    from app.models import Order, OrderItem
+
+    rng = random.Random(start_id)
+    now = datetime.utcnow()
+    orders, lines = [], []
+    for order_id in range(start_id, start_id + count):
+        created_at = now - timedelta(seconds=rng.randint(0, days * 86400))
+        orders.append({'id': order_id, 'customer_name': 'Bench Guest', 'customer_phone': '555-0100',
+                       'status': 'completed', 'created_at': created_at, 'updated_at': created_at})
+        lines.extend({'order_id': order_id, 'menu_item_id': rng.randint(1, 50), 'quantity': rng.randint(1, 3),
+                      'price': rng.randint(3, 40), 'created_at': created_at} for _ in range(3))
+    db.session.execute(insert(Order), orders)
+    db.session.execute(insert(OrderItem), lines)
+    db.session.commit()
+
+
+def raw_dashboard():
+    """The two aggregate queries the dashboard used to run on every request"""
+    from sqlalchemy import func
+    from app.extensions import db
+    from app.models import Order, OrderItem
+
+    today = datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
+    db.session.query(func.coalesce(func.sum(OrderItem.quantity * OrderItem.price), 0)).join(
+        Order, Order.id == OrderItem.order_id
+    ).filter(
+        Order.status == 'completed', Order.created_at >= today, Order.created_at < today + timedelta(days=1)
+    ).scalar()
+    db.session.query(
+        Order, func.coalesce(func.sum(OrderItem.quantity * OrderItem.price), 0)
+    ).outerjoin(OrderItem, Order.id == OrderItem.order_id).group_by(Order.id).order_by(
+        Order.created_at.desc()
+    ).limit(5).all()
+
+
+def main():
+    volumes = [int(n) for n in sys.argv[1].split(',')] if len(sys.argv) > 1 else [10000, 50000, 200000]
+    requests = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+
+    from app.extensions import db
+    from app.models import MenuItem
+    from app.services.sales_rollup import rebuild_sales_rollups
+
+    app = make_app()
+    client = app.test_client()
+    with app.app_context():
+        db.session.add_all([MenuItem(name=f'Dish {i}', price=10, category='main') for i in range(50)])
+        db.session.commit()
+        seeded = 0
+        for volume in volumes:
+            seed(db, seeded + 1, volume - seeded, days=365)
+            seeded = volume
+            rebuild_sales_rollups()
+            db.session.commit()
+
+            with timed() as timing:
+                for _ in range(requests):
+                    raw_dashboard()
+                    db.session.rollback()
+            raw_ms = timing['seconds'] / requests * 1000
+            with timed() as timing:
+                for _ in range(requests):
+                    client.get('/api/dashboard/stats')
+            rollup_ms = timing['seconds'] / requests * 1000
+            print(f'{volume:>7} orders  raw aggregates {raw_ms:8.2f} ms   '
+                  f'/api/dashboard/stats on rollups {rollup_ms:6.2f} ms')
+
+
+if __name__ == '__main__':
+    main()
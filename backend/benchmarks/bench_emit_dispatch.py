@@ -0,0 +1,95 @@
+# backend/benchmarks/bench_emit_dispatch.py
+"""
+POST /api/orders/create latency against the number of connected kitchen
+screens, with Socket.IO emits sent inline versus through the background
+dispatcher (SOCKETIO_DISPATCH_QUEUE_SIZE=0 versus the default).
+
+    python benchmarks/bench_emit_dispatch.py [orders] [screens,screens,...]
+
+Runs the app in a separate server process with long-polling clients
+connected, as in bench_socket_fanout.py, and times each request from the
+outside.
+"""
+import json
+import multiprocessing
+import os
+import sys
+import time
+import urllib.request
+from common import DATABASE_URL, make_app
+from bench_socket_fanout import PollingClient, serve_worker, _free_port, _wait_for_port
+
+
+def percentile(samples, q):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+def measure(port, orders, payload):
+    url = f'http://127.0.0.1:{port}/api/orders/create'
+    body = json.dumps(payload).encode()
+    latencies = []
+    for _ in range(orders):
+        request = urllib.request.Request(url, data=body, headers={'Content-Type': 'application/json'})
+        start = time.perf_counter()
+        with urllib.request.urlopen(request, timeout=30) as response:
+            response.read()
+        latencies.append((time.perf_counter() - start) * 1000)
+    return latencies
+
+
+def run(screens, orders, payload, token, queue_size):
+    os.environ['SOCKETIO_DISPATCH_QUEUE_SIZE'] = str(queue_size)
+    port = _free_port()
+    process = multiprocessing.get_context('spawn').Process(
+        target=serve_worker, args=(port, DATABASE_URL, None), daemon=True
+    )
+    process.start()
+    try:
+        _wait_for_port(port)
+        clients = [PollingClient(f'http://127.0.0.1:{port}', token) for _ in range(screens)]
+        for client in clients:
+            client.connect()
+        time.sleep(1)
+        measure(port, 20, payload)  # Warm up
+        latencies = measure(port, orders, payload)
+        for client in clients:
+            client.stopped = True
+    finally:
+        process.terminate()
+        process.join()
+    return latencies
+
+
+def main():
+    orders = int(sys.argv[1]) if len(sys.argv) > 1 else 300
+    screen_counts = [int(n) for n in sys.argv[2].split(',')] if len(sys.argv) > 2 else [0, 50, 200]
+
+    from flask_jwt_extended import create_access_token
+    from app.extensions import db
+    from app.models import MenuItem
+
+    # Spawned servers re-import common; point them at this run's database
+    os.environ['BENCH_DATABASE_URL'] = DATABASE_URL
+
+    app = make_app()
+    with app.app_context():
+        db.session.add(MenuItem(name='Dish', price=9.5, category='main'))
+        db.session.commit()
+        menu_id = MenuItem.query.first().id
+        token = create_access_token(identity={'id': 1, 'email': 'kitchen@bench', 'role': 'kitchen'})
+    payload = {
+        'customer_name': 'Bench Guest',
+        'customer_phone': '555-0100',
+        'items': [{'menu_item_id': menu_id, 'quantity': 1}] * 3
+    }
+
+    for screens in screen_counts:
+        for label, queue_size in (('inline', 0), ('dispatched', 10000)):
+            latencies = run(screens, orders, payload, token, queue_size)
+            print(f'{screens:>4} screens  {label:<10}  p50 {percentile(latencies, 0.5):6.2f} ms'
+                  f'  p99 {percentile(latencies, 0.99):6.2f} ms')
+
+
+if __name__ == '__main__':
+    main()
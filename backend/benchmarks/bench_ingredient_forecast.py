@@ -0,0 +1,122 @@
+# backend/benchmarks/bench_ingredient_forecast.py
+"""
+Ingredient forecast latency over a year of order history: walking every
+order line in Python and adding up recipe usage per ingredient per day,
+versus forecast_ingredients() (one grouped query and NumPy matrix
+products): cold, served from its cache, and right after a new order.
+
+    python benchmarks/bench_ingredient_forecast.py [menu_items] [ingredients] [orders_per_day]
+"""
+import random
+import sys
+from datetime import datetime, timedelta
+from common import make_app, timed
+
+DAYS = 365
+
+
+def seed(db, menu_items, ingredients, orders_per_day):
+    from sqlalchemy import insert
+    from app.models import InventoryItem, MenuItem, Order, OrderItem, RecipeIngredient
+
+    rng = random.Random(5)
+    db.session.execute(insert(MenuItem), [
+        {'name': f'Dish {i}', 'price': rng.randint(3, 40), 'category': 'main', 'is_available': True}
+        for i in range(menu_items)
+    ])
+    db.session.execute(insert(InventoryItem), [
+        {'name': f'Ingredient {i}', 'quantity': rng.randint(0, 500), 'unit': 'kg', 'min_quantity': 20}
+        for i in range(ingredients)
+    ])
+    db.session.execute(insert(RecipeIngredient), [
+        {'menu_item_id': item + 1, 'inventory_item_id': ingredient + 1, 'quantity': rng.randint(1, 20) / 10}
+        for item in range(menu_items)
+        for ingredient in rng.sample(range(ingredients), 4)
+    ])
+
+    today = datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
+    popularity = [rng.random() ** 3 for _ in range(menu_items)]
+    order_id = 0
+    for day in range(DAYS, 0, -1):
+        orders, lines = [], []
+        for _ in range(orders_per_day):
+            order_id += 1
+            created_at = today - timedelta(days=day, seconds=-rng.randint(36000, 82800))
+            orders.append({'id': order_id, 'customer_name': 'Bench Guest', 'customer_phone': '555-0100',
+                           'status': 'completed', 'created_at': created_at, 'updated_at': created_at})
+            for menu_item_id in rng.choices(range(1, menu_items + 1), weights=popularity, k=3):
+                lines.append({'order_id': order_id, 'menu_item_id': menu_item_id,
+                              'quantity': rng.randint(1, 3), 'price': 10, 'created_at': created_at})
+        db.session.execute(insert(Order), orders)
+        db.session.execute(insert(OrderItem), lines)
+    db.session.commit()
+    return order_id
+
+
+def python_usage():
+    """Usage per (ingredient, day) from every order line, one line at a time"""
+    from app.extensions import db
+    from app.models import Order, OrderItem, RecipeIngredient
+
+    recipes = {}
+    for menu_item_id, inventory_item_id, quantity in db.session.query(
+        RecipeIngredient.menu_item_id, RecipeIngredient.inventory_item_id, RecipeIngredient.quantity
+    ):
+        recipes.setdefault(menu_item_id, []).append((inventory_item_id, quantity))
+    since = datetime.utcnow() - timedelta(days=DAYS + 1)
+    usage = {}
+    for created_at, menu_item_id, quantity in db.session.query(
+        Order.created_at, OrderItem.menu_item_id, OrderItem.quantity
+    ).join(Order, Order.id == OrderItem.order_id).filter(
+        Order.created_at >= since, Order.status != 'cancelled'
+    ):
+        for inventory_item_id, per_portion in recipes.get(menu_item_id, ()):
+            key = (inventory_item_id, created_at.date())
+            usage[key] = usage.get(key, 0) + per_portion * quantity
+    return usage
+
+
+def main():
+    menu_items = int(sys.argv[1]) if len(sys.argv) > 1 else 300
+    ingredients = int(sys.argv[2]) if len(sys.argv) > 2 else 150
+    orders_per_day = int(sys.argv[3]) if len(sys.argv) > 3 else 300
+
+    from app.extensions import db
+    from app.services.demand_forecast import forecast_ingredients, demand_forecast_cache
+
+    app = make_app()
+    with app.app_context():
+        orders = seed(db, menu_items, ingredients, orders_per_day)
+        print(f'{menu_items} menu items, {ingredients} ingredients, {orders} orders over {DAYS} days')
+
+        with timed() as timing:
+            python_usage()
+        print(f'{"python loop":<18} {timing["seconds"] * 1000:8.1f} ms  (usage only, no forecast)')
+
+        demand_forecast_cache.clear()
+        with timed() as timing:
+            result = forecast_ingredients()
+        print(f'{"numpy, cold":<18} {timing["seconds"] * 1000:8.1f} ms  '
+              f'({sum(row["reorder"] for row in result["ingredients"])} reorder suggestions)')
+
+        with timed() as timing:
+            for _ in range(20):
+                forecast_ingredients()
+        print(f'{"numpy, cached":<18} {timing["seconds"] / 20 * 1000:8.1f} ms')
+
+        # A new order only invalidates the current day's column
+        from app.models import Order, OrderItem
+        total = 0
+        for _ in range(20):
+            order = Order(customer_name='Bench Guest', customer_phone='555-0100')
+            order.order_items.append(OrderItem(menu_item_id=1, quantity=1, price=10))
+            db.session.add(order)
+            db.session.commit()
+            with timed() as timing:
+                forecast_ingredients()
+            total += timing['seconds']
+        print(f'{"numpy, new order":<18} {total / 20 * 1000:8.1f} ms')
+
+
+if __name__ == '__main__':
+    main()
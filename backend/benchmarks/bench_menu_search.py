@@ -0,0 +1,79 @@
+# backend/benchmarks/bench_menu_search.py
+"""
+Menu search latency on a large synthetic catalogue: loading every item and
+filtering in Python (what a client-side search over GET /api/menu amounts
+to) versus search_menu() on the full-text and category indexes.
+
+    python benchmarks/bench_menu_search.py [items] [queries]
+"""
+import random
+import sys
+from common import make_app, timed
+
+WORDS = ['chicken', 'paneer', 'tikka', 'masala', 'garlic', 'butter', 'lamb', 'spicy',
+         'grilled', 'rice', 'noodle', 'soup', 'salad', 'lemon', 'chocolate', 'mango',
+         'cheese', 'tofu', 'coconut', 'curry', 'smoked', 'crispy', 'pepper', 'herb']
+CATEGORIES = ['starter', 'main', 'dessert', 'drink', 'side']
+
+
+def seed(db, count):
+    from sqlalchemy import insert
+    from app.models import MenuItem
+
+    rng = random.Random(7)
+    db.session.execute(insert(MenuItem), [{
+        'name': ' '.join(rng.sample(WORDS, 3)).title(),
+        'description': ' '.join(rng.sample(WORDS, 8)),
+        'price': rng.randint(3, 40),
+        'category': rng.choice(CATEGORIES),
+        'is_available': rng.random() < 0.8,
+    } for _ in range(count)])
+    db.session.commit()
+
+
+def python_search(q, category):
+    from app.models import MenuItem
+
+    words = q.lower().split()
+    matches = [
+        item for item in MenuItem.query.all()
+        if item.is_available and item.category == category
+        and all(any(w.startswith(word) for w in f'{item.name} {item.description}'.lower().split())
+                for word in words)
+    ]
+    return sorted(matches, key=lambda item: item.id)[:20]
+
+
+def indexed_search(q, category):
+    from app.services.menu_search import search_menu
+
+    items, _, _ = search_menu(q=q, categories=[category], available=True, limit=20)
+    return items
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+    queries = int(sys.argv[2]) if len(sys.argv) > 2 else 50
+
+    from app.extensions import db
+
+    app = make_app()
+    rng = random.Random(11)
+    terms = [(f'{rng.choice(WORDS)[:4]} {rng.choice(WORDS)}', rng.choice(CATEGORIES))
+             for _ in range(queries)]
+    with app.app_context():
+        seed(db, count)
+        for label, search in (('python filter', python_search), ('full-text index', indexed_search)):
+            search(*terms[0])  # Warm up
+            db.session.expire_all()
+            with timed() as timing:
+                found = 0
+                for q, category in terms:
+                    found += len(search(q, category))
+                    db.session.expire_all()
+            print(f'{label:<16} {count} items: {timing["seconds"] / queries * 1000:8.2f} ms/query '
+                  f'({found} results)')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,53 @@
+# backend/benchmarks/bench_order_create.py
+"""
+Statements and latency per POST /api/orders/create as the order grows.
+
+    python benchmarks/bench_order_create.py
+
+The statement count should stay flat across line counts: one IN lookup for
+the menu items, one INSERT for the order and one multi-row INSERT for its
+lines.
+"""
+from common import make_app, count_statements, timed
+
+LINE_COUNTS = [1, 5, 20, 50]
+REPEATS = 20
+
+
+def seed_menu(db, count):
+    from app.models import MenuItem
+
+    db.session.add_all([
+        MenuItem(name=f'Dish {i}', price=10 + i % 7, category='main')
+        for i in range(count)
+    ])
+    db.session.commit()
+    return [item.id for item in MenuItem.query.all()]
+
+
+def main():
+    from app.extensions import db
+
+    app = make_app()
+    with app.app_context():
+        menu_ids = seed_menu(db, max(LINE_COUNTS))
+        engine = db.engine
+
+    client = app.test_client()
+    print(f'{"lines":>6} {"statements":>11} {"ms/order":>9}')
+    for lines in LINE_COUNTS:
+        payload = {
+            'customer_name': 'Bench Guest',
+            'customer_phone': '555-0100',
+            'items': [{'menu_item_id': menu_id, 'quantity': 2} for menu_id in menu_ids[:lines]]
+        }
+        with count_statements(engine) as counter, timed() as timing:
+            for _ in range(REPEATS):
+                response = client.post('/api/orders/create', json=payload)
+                assert response.status_code == 201, response.get_json()
+        print(f'{lines:>6} {counter["statements"] / REPEATS:>11.1f} '
+              f'{timing["seconds"] * 1000 / REPEATS:>9.2f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,72 @@
+# backend/benchmarks/bench_order_ingest.py
+"""
+Orders/sec through POST /api/orders/create with per-request commits versus
+the group-commit ingestion mode, under concurrent clients.
+
+    python benchmarks/bench_order_ingest.py [clients] [orders_per_client]
+
+The gap widens with commit latency, so the interesting numbers come from
+running it against MySQL via BENCH_DATABASE_URL.
+"""
+import sys
+import threading
+from common import make_app, timed
+
+LINES_PER_ORDER = 4
+
+
+def run_clients(app, clients, orders_per_client, payload):
+    errors = []
+
+    def client_loop():
+        client = app.test_client()
+        for _ in range(orders_per_client):
+            response = client.post('/api/orders/create', json=payload)
+            if response.status_code != 201:
+                errors.append(response.status_code)
+
+    threads = [threading.Thread(target=client_loop) for _ in range(clients)]
+    with timed() as timing:
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    return timing['seconds'], errors
+
+
+def main():
+    clients = int(sys.argv[1]) if len(sys.argv) > 1 else 16
+    orders_per_client = int(sys.argv[2]) if len(sys.argv) > 2 else 50
+
+    from app.extensions import db
+    from app.models import MenuItem
+    from app.services.order_ingest import init_order_ingestor
+
+    app = make_app()
+    with app.app_context():
+        db.session.add_all([
+            MenuItem(name=f'Dish {i}', price=9.5, category='main')
+            for i in range(LINES_PER_ORDER)
+        ])
+        db.session.commit()
+        menu_ids = [item.id for item in MenuItem.query.all()]
+
+    payload = {
+        'customer_name': 'Bench Guest',
+        'customer_phone': '555-0100',
+        'items': [{'menu_item_id': menu_id, 'quantity': 1} for menu_id in menu_ids]
+    }
+    total = clients * orders_per_client
+
+    app.extensions.pop('order_ingestor', None)
+    seconds, errors = run_clients(app, clients, orders_per_client, payload)
+    print(f'per-request commit: {total / seconds:8.1f} orders/s  ({len(errors)} errors)')
+
+    ingestor = init_order_ingestor(app)
+    seconds, errors = run_clients(app, clients, orders_per_client, payload)
+    print(f'group commit:       {total / seconds:8.1f} orders/s  ({len(errors)} errors)')
+    ingestor.close()
+
+
+if __name__ == '__main__':
+    main()
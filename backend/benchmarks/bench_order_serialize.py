@@ -0,0 +1,96 @@
+# backend/benchmarks/bench_order_serialize.py
+"""
+Time and peak memory to serialize a large order listing: full ORM
+hydration with eager-loaded items versus the column-projected serializer.
+
+    python benchmarks/bench_order_serialize.py [orders]
+"""
+import sys
+import tracemalloc
+from common import make_app, timed
+
+ITEMS_PER_ORDER = 4
+
+
+def seed(db, order_count):
+    from sqlalchemy import insert
+    from app.models import MenuItem, Order, OrderItem
+
+    db.session.add_all([
+        MenuItem(name=f'Dish {i}', price=8 + i, category='main')
+        for i in range(ITEMS_PER_ORDER)
+    ])
+    db.session.execute(insert(Order), [{
+        'customer_name': f'Guest {i}',
+        'customer_phone': '555-0100',
+        'status': 'completed'
+    } for i in range(order_count)])
+    db.session.execute(insert(OrderItem), [{
+        'order_id': order_id,
+        'menu_item_id': item + 1,
+        'quantity': 1,
+        'price': 8 + item
+    } for order_id in range(1, order_count + 1) for item in range(ITEMS_PER_ORDER)])
+    db.session.commit()
+
+
+def orm_listing(db):
+    from sqlalchemy.orm import selectinload
+    from app.models import Order, OrderItem
+
+    orders = Order.query.options(
+        selectinload(Order.order_items).joinedload(OrderItem.menu_item)
+    ).order_by(Order.created_at.desc()).all()
+    return [{
+        'id': order.id,
+        'customer_id': order.customer_id,
+        'customer_name': order.customer_name,
+        'status': order.status,
+        'table_number': order.table_number,
+        'created_at': order.created_at.isoformat(),
+        'items': [{
+            'id': item.id,
+            'menu_item_id': item.menu_item_id,
+            'name': item.menu_item.name if item.menu_item else 'Unknown',
+            'quantity': item.quantity,
+            'price': float(item.price) if item.price else 0.0,
+            'special_requests': item.special_requests
+        } for item in order.order_items]
+    } for order in orders]
+
+
+def projected_listing(db):
+    from app.models import Order
+    from app.services.order_serializer import order_rows, serialize_orders
+
+    return serialize_orders(order_rows().order_by(Order.created_at.desc()).all())
+
+
+def measure(app, db, listing):
+    with app.app_context():
+        tracemalloc.start()
+        with timed() as timing:
+            payload = listing(db)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        db.session.remove()
+    return len(payload), timing['seconds'], peak
+
+
+def main():
+    order_count = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+
+    from app.extensions import db
+
+    app = make_app()
+    with app.app_context():
+        seed(db, order_count)
+
+    for label, listing in [('ORM hydration', orm_listing), ('column projection', projected_listing)]:
+        rows, seconds, peak = measure(app, db, listing)
+        print(f'{label:<18} {rows} orders  {seconds * 1000:8.1f} ms  '
+              f'peak {peak / 1024 / 1024:6.1f} MiB')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,219 @@
+# backend/benchmarks/bench_socket_fanout.py
+"""
+Load test for order:created delivery across several worker processes.
+
+Starts N worker processes, each serving the app on its own port, connects
+kitchen Socket.IO clients to every worker, has every worker create orders
+over HTTP and counts the order:created events each client receives. Every
+client should see every order, whichever worker created it. It runs first
+with no message queue, where each client only sees its own worker's
+orders, and then through the local relay (SOCKETIO_MESSAGE_QUEUE=local://...).
+
+    python benchmarks/bench_socket_fanout.py [workers] [clients_per_worker] [orders_per_worker]
+
+Set BENCH_MESSAGE_QUEUE=redis://... to test a real broker instead of the relay.
+The clients speak Engine.IO long-polling with urllib so nothing beyond the
+app's own requirements is needed.
+"""
+import json
+import logging
+import multiprocessing
+import os
+import socket
+import sys
+import threading
+import time
+import urllib.request
+from common import DATABASE_URL, make_app, timed
+
+DELIVERY_TIMEOUT = 30
+
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def _wait_for_port(port, timeout=30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            socket.create_connection(('127.0.0.1', port), timeout=1).close()
+            return
+        except OSError:
+            time.sleep(0.1)
+    raise RuntimeError(f'worker on port {port} did not start')
+
+
+def serve_worker(port, database_url, message_queue):
+    os.environ['DATABASE_URL'] = database_url
+    if message_queue:
+        os.environ['SOCKETIO_MESSAGE_QUEUE'] = message_queue
+    else:
+        os.environ.pop('SOCKETIO_MESSAGE_QUEUE', None)
+
+    from app import create_app, socketio
+
+    logging.getLogger('werkzeug').setLevel(logging.ERROR)
+    app = create_app()
+    socketio.run(app, host='127.0.0.1', port=port, log_output=False, allow_unsafe_werkzeug=True)
+
+
+class PollingClient:
+    """Minimal Socket.IO client over Engine.IO v4 long-polling"""
+
+    def __init__(self, base_url, token, event='order:created'):
+        self.base_url = f'{base_url}/socket.io/?EIO=4&transport=polling'
+        self.token = token
+        self.event = event
+        self.received = 0
+        self.connected = False
+        self.stopped = False
+
+    def _request(self, url, body=None):
+        data = body.encode() if body is not None else None
+        with urllib.request.urlopen(urllib.request.Request(url, data=data), timeout=60) as response:
+            return response.read().decode()
+
+    def connect(self):
+        handshake = self._request(f'{self.base_url}&token={self.token}')
+        self.sid = json.loads(handshake[1:])['sid']
+        self.poll_url = f'{self.base_url}&sid={self.sid}'
+        self._request(self.poll_url, '40')
+        threading.Thread(target=self._poll, daemon=True).start()
+
+    def _poll(self):
+        while not self.stopped:
+            try:
+                payload = self._request(self.poll_url)
+                if payload == '2':
+                    self._request(self.poll_url, '3')  # pong
+            except Exception:
+                return  # Server went away at the end of a run
+            for packet in payload.split('\x1e'):
+                if packet == '2':
+                    continue
+                elif packet.startswith('40'):
+                    self.connected = True
+                elif packet.startswith('42'):
+                    name, *_ = json.loads(packet[2:])
+                    if name == self.event:
+                        self.received += 1
+
+
+def create_orders(port, count, payload, errors):
+    url = f'http://127.0.0.1:{port}/api/orders/create'
+    body = json.dumps(payload).encode()
+    for _ in range(count):
+        request = urllib.request.Request(url, data=body, headers={'Content-Type': 'application/json'})
+        try:
+            with urllib.request.urlopen(request, timeout=30) as response:
+                if response.status != 201:
+                    errors.append(response.status)
+        except OSError as e:
+            errors.append(str(e))
+
+
+def run(workers, clients_per_worker, orders_per_worker, message_queue, payload, token):
+    ctx = multiprocessing.get_context('spawn')
+    ports = [_free_port() for _ in range(workers)]
+    processes = [
+        ctx.Process(target=serve_worker, args=(port, DATABASE_URL, message_queue), daemon=True)
+        for port in ports
+    ]
+    for process in processes:
+        process.start()
+    try:
+        for port in ports:
+            _wait_for_port(port)
+
+        clients = [
+            PollingClient(f'http://127.0.0.1:{port}', token)
+            for port in ports for _ in range(clients_per_worker)
+        ]
+        for client in clients:
+            client.connect()
+        time.sleep(1)  # Let the namespace connects and queue subscriptions settle
+
+        expected = workers * orders_per_worker
+        errors = []
+        with timed() as timing:
+            threads = [
+                threading.Thread(target=create_orders, args=(port, orders_per_worker, payload, errors))
+                for port in ports
+            ]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            deadline = time.monotonic() + DELIVERY_TIMEOUT
+            while min(client.received for client in clients) < expected and time.monotonic() < deadline:
+                time.sleep(0.05)
+        for client in clients:
+            client.stopped = True
+    finally:
+        for process in processes:
+            process.terminate()
+            process.join()
+
+    counts = [client.received for client in clients]
+    return {
+        'connected': sum(client.connected for client in clients),
+        'expected': expected * len(counts),
+        'delivered': sum(min(count, expected) for count in counts),
+        'complete_clients': sum(count >= expected for count in counts),
+        'clients': len(counts),
+        'errors': len(errors),
+        'seconds': timing['seconds'],
+    }
+
+
+def report(label, result):
+    ratio = result['delivered'] / result['expected'] if result['expected'] else 0
+    print(f'{label:<14} {result["delivered"]:>6}/{result["expected"]:<6} events ({ratio:6.1%}), '
+          f'{result["complete_clients"]}/{result["clients"]} clients complete, '
+          f'{result["delivered"] / result["seconds"]:7.0f} deliveries/s, '
+          f'{result["errors"]} order errors, {result["connected"]} sockets connected')
+
+
+def main():
+    workers = int(sys.argv[1]) if len(sys.argv) > 1 else 4
+    clients_per_worker = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+    orders_per_worker = int(sys.argv[3]) if len(sys.argv) > 3 else 50
+
+    from flask_jwt_extended import create_access_token
+    from app.extensions import db
+    from app.models import MenuItem
+    from app.services.socket_relay import start_relay
+
+    # Spawned workers re-import common; point them at this run's database
+    os.environ['BENCH_DATABASE_URL'] = DATABASE_URL
+
+    app = make_app()
+    with app.app_context():
+        db.session.add(MenuItem(name='Dish', price=9.5, category='main'))
+        db.session.commit()
+        menu_id = MenuItem.query.first().id
+        token = create_access_token(identity={'id': 1, 'email': 'kitchen@bench', 'role': 'kitchen'})
+    payload = {
+        'customer_name': 'Bench Guest',
+        'customer_phone': '555-0100',
+        'items': [{'menu_item_id': menu_id, 'quantity': 1}]
+    }
+
+    report('no queue', run(workers, clients_per_worker, orders_per_worker, None, payload, token))
+
+    message_queue = os.environ.get('BENCH_MESSAGE_QUEUE')
+    relay = None
+    if not message_queue:
+        message_queue = f'local://127.0.0.1:{_free_port()}'
+        relay = start_relay(message_queue)
+    report(message_queue.split('://')[0] + ' queue',
+           run(workers, clients_per_worker, orders_per_worker, message_queue, payload, token))
+    if relay:
+        relay.shutdown()
+
+
+if __name__ == '__main__':
+    main()
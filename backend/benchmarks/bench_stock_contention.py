@@ -0,0 +1,111 @@
+# backend/benchmarks/bench_stock_contention.py
+"""
+Sale throughput when every order uses the same ingredient: several
+processes each take stock out with deduct_stock() and commit, as fast as
+they can, once with INVENTORY_LOCK_ON_SALE off and once with it on.
+
+    python benchmarks/bench_stock_contention.py [processes] [sales_per_process]
+
+Stock is plentiful, so every sale should go through; afterwards the stock
+left must match the sales. Run it against MySQL (BENCH_DATABASE_URL) to see
+what the lock costs: there it queues every sale behind the ingredient row.
+SQLite serializes writers whatever the setting, so both runs come out
+about the same.
+"""
+import multiprocessing
+import os
+import sys
+import time
+from common import DATABASE_URL, make_app
+
+PER_PORTION = 0.25
+
+
+def sell(database_url, lock, sales, start, results):
+    os.environ['DATABASE_URL'] = database_url
+    os.environ['INVENTORY_LOCK_ON_SALE'] = '1' if lock else ''
+    os.environ['INVENTORY_COMPACT_INTERVAL_SECONDS'] = '0'
+
+    from app import create_app
+    from app.extensions import db
+    from app.services.inventory_service import deduct_stock
+
+    app = create_app()
+    with app.app_context():
+        start.wait()
+        began = time.perf_counter()
+        sold = failed = 0
+        for _ in range(sales):
+            try:
+                deduct_stock([{'menu_item_id': 1, 'quantity': 1}])
+                db.session.commit()
+                sold += 1
+            except Exception:
+                db.session.rollback()
+                failed += 1
+        results.put((sold, failed, time.perf_counter() - began))
+
+
+def run(app, processes, sales, lock):
+    from app.extensions import db
+    from app.models import InventoryItem, InventoryMovement
+
+    with app.app_context():
+        db.session.query(InventoryMovement).delete()
+        db.session.query(InventoryItem).filter(InventoryItem.id == 1).update(
+            {'quantity': processes * sales * PER_PORTION * 2, 'snapshot_movement_id': 0}
+        )
+        db.session.commit()
+        stock_before = db.session.get(InventoryItem, 1).stock
+
+    ctx = multiprocessing.get_context('spawn')
+    start, results = ctx.Event(), ctx.Queue()
+    workers = [ctx.Process(target=sell, args=(DATABASE_URL, lock, sales, start, results)) for _ in range(processes)]
+    for worker in workers:
+        worker.start()
+    # Let every worker finish importing and building its app first
+    time.sleep(3)
+    start.set()
+    outcomes = [results.get() for _ in workers]
+    for worker in workers:
+        worker.join()
+
+    sold = sum(outcome[0] for outcome in outcomes)
+    failed = sum(outcome[1] for outcome in outcomes)
+    seconds = max(outcome[2] for outcome in outcomes)
+    with app.app_context():
+        db.session.expire_all()
+        stock_left = db.session.get(InventoryItem, 1).stock
+    ok = abs(stock_before - stock_left - sold * PER_PORTION) < 1e-6
+    print(f'  lock {"on " if lock else "off"}  {sold:6d} sales in {seconds:6.2f}s  '
+          f'{sold / seconds:8.0f} sales/s  failed {failed}  {"stock matches" if ok else "STOCK MISMATCH"}')
+    return ok
+
+
+def main():
+    processes = int(sys.argv[1]) if len(sys.argv) > 1 else 4
+    sales = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+
+    from app.extensions import db
+    from app.models import InventoryItem, MenuItem, RecipeIngredient
+
+    # Spawned workers re-import common; point them at this run's database
+    os.environ['BENCH_DATABASE_URL'] = DATABASE_URL
+
+    app = make_app()
+    with app.app_context():
+        db.session.add_all([
+            MenuItem(id=1, name='Dish', price=9.5, category='main'),
+            InventoryItem(id=1, name='Rice', quantity=0, unit='kg', min_quantity=0),
+            RecipeIngredient(menu_item_id=1, inventory_item_id=1, quantity=PER_PORTION),
+        ])
+        db.session.commit()
+
+    print(f'{processes} processes x {sales} sales of one shared ingredient on {DATABASE_URL.split(":")[0]}')
+    ok = all([run(app, processes, sales, lock=False), run(app, processes, sales, lock=True)])
+    if not ok:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
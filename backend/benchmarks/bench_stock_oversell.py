@@ -0,0 +1,115 @@
+# backend/benchmarks/bench_stock_oversell.py
+"""
+Concurrency check for stock deduction: fires many orders at once at a dish
+that stock can only cover part of, across several server processes, and
+checks that no more portions were sold than the stock allowed.
+
+    python benchmarks/bench_stock_oversell.py [orders] [servings] [workers]
+
+Every order either commits with its stock taken out or is turned away with
+"Not enough stock"; afterwards the stock left must equal what the accepted
+orders didn't use, and never go below zero. Set BENCH_DATABASE_URL to run it
+against MySQL instead of SQLite, with or without INVENTORY_LOCK_ON_SALE
+(see deduct_stock).
+"""
+import json
+import multiprocessing
+import os
+import sys
+import threading
+import urllib.error
+import urllib.request
+from common import DATABASE_URL, make_app, timed
+from bench_socket_fanout import serve_worker, _free_port, _wait_for_port
+
+PER_PORTION = 0.25
+
+
+def place_order(port, payload, results):
+    request = urllib.request.Request(
+        f'http://127.0.0.1:{port}/api/orders/create',
+        data=json.dumps(payload).encode(), headers={'Content-Type': 'application/json'}
+    )
+    try:
+        with urllib.request.urlopen(request, timeout=60) as response:
+            results.append(('accepted', response.status))
+    except urllib.error.HTTPError as e:
+        body = json.loads(e.read() or b'{}')
+        results.append(('short' if 'shortages' in body else 'error', e.code))
+    except OSError as e:
+        results.append(('error', str(e)))
+
+
+def main():
+    orders = int(sys.argv[1]) if len(sys.argv) > 1 else 400
+    servings = int(sys.argv[2]) if len(sys.argv) > 2 else 150
+    workers = int(sys.argv[3]) if len(sys.argv) > 3 else 2
+
+    from app.extensions import db
+    from app.models import InventoryItem, MenuItem, Order, OrderItem, RecipeIngredient
+
+    # Spawned servers re-import common; point them at this run's database
+    os.environ['BENCH_DATABASE_URL'] = DATABASE_URL
+
+    app = make_app()
+    with app.app_context():
+        db.session.add_all([
+            MenuItem(id=1, name='Dish', price=9.5, category='main', servings_possible=servings),
+            InventoryItem(id=1, name='Rice', quantity=servings * PER_PORTION, unit='kg', min_quantity=0),
+            RecipeIngredient(menu_item_id=1, inventory_item_id=1, quantity=PER_PORTION),
+        ])
+        db.session.commit()
+    payload = {
+        'customer_name': 'Bench Guest',
+        'customer_phone': '555-0100',
+        'items': [{'menu_item_id': 1, 'quantity': 1}]
+    }
+
+    ctx = multiprocessing.get_context('spawn')
+    ports = [_free_port() for _ in range(workers)]
+    processes = [ctx.Process(target=serve_worker, args=(port, DATABASE_URL, None), daemon=True) for port in ports]
+    for process in processes:
+        process.start()
+    results = []
+    try:
+        for port in ports:
+            _wait_for_port(port)
+        threads = [
+            threading.Thread(target=place_order, args=(ports[i % workers], payload, results))
+            for i in range(orders)
+        ]
+        with timed() as timing:
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+    finally:
+        for process in processes:
+            process.terminate()
+            process.join()
+
+    with app.app_context():
+        db.session.expire_all()
+        stock_left = db.session.get(InventoryItem, 1).stock
+        sold = db.session.query(db.func.coalesce(db.func.sum(OrderItem.quantity), 0)).scalar()
+        order_rows = db.session.query(Order).count()
+        servings_left = db.session.get(MenuItem, 1).servings_possible
+
+    accepted = sum(1 for outcome, _ in results if outcome == 'accepted')
+    short = sum(1 for outcome, _ in results if outcome == 'short')
+    errors = [detail for outcome, detail in results if outcome == 'error']
+    expected_left = servings * PER_PORTION - sold * PER_PORTION
+    print(f'{orders} orders for {servings} servings over {workers} workers in {timing["seconds"]:.2f}s')
+    print(f'  accepted {accepted}, turned away for stock {short}, other errors {len(errors)}')
+    if errors:
+        print(f'  first error: {errors[0]}')
+    print(f'  orders stored {order_rows}, portions sold {sold}, stock left {stock_left} '
+          f'(expected {expected_left}), servings_possible {servings_left}')
+    ok = sold <= servings and stock_left >= 0 and abs(stock_left - expected_left) < 1e-6 and accepted == order_rows
+    print('  OK: no oversell, stock matches sales' if ok else '  FAIL: stock and sales disagree')
+    if not ok:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
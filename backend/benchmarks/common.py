@@ -0,0 +1,78 @@
+# backend/benchmarks/common.py
+"""
+Shared setup for the benchmark scripts in this directory.
+
+Each script runs against a throwaway SQLite database by default; set
+BENCH_DATABASE_URL to point it at a MySQL instance instead.
+"""
+import os
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BACKEND_DIR))
+
+
+def _database_url():
+    url = os.environ.get('BENCH_DATABASE_URL')
+    if not url:
+        fd, path = tempfile.mkstemp(prefix='rms-bench-', suffix='.db')
+        os.close(fd)
+        url = f'sqlite:///{path}'
+    return url
+
+
+# config.py reads DATABASE_URL at import time, so it has to be set before
+# anything imports the app package.
+DATABASE_URL = os.environ['DATABASE_URL'] = _database_url()
+
+
+def make_app():
+    """Create the app on a fresh database with all tables in place"""
+    url = DATABASE_URL
+
+    from flask import Flask
+    from app.extensions import db
+    import app.models  # noqa: F401  (registers every table on db.metadata)
+
+    # create_app() queries the users table on startup, so the schema has to
+    # exist before it runs.
+    bootstrap = Flask('bench-bootstrap')
+    bootstrap.config['SQLALCHEMY_DATABASE_URI'] = url
+    db.init_app(bootstrap)
+    with bootstrap.app_context():
+        db.drop_all()
+        db.create_all()
+
+    from app import create_app
+    return create_app()
+
+
+@contextmanager
+def count_statements(engine):
+    """Count SQL statements sent to the database inside the block"""
+    from sqlalchemy import event
+
+    counter = {'statements': 0}
+
+    def before_cursor_execute(*args):
+        counter['statements'] += 1
+
+    event.listen(engine, 'before_cursor_execute', before_cursor_execute)
+    try:
+        yield counter
+    finally:
+        event.remove(engine, 'before_cursor_execute', before_cursor_execute)
+
+
+@contextmanager
+def timed():
+    result = {}
+    start = time.perf_counter()
+    try:
+        yield result
+    finally:
+        result['seconds'] = time.perf_counter() - start
@@ -0,0 +1,28 @@
+"""add orders.idempotency_key
+
+Revision ID: a3e9c7d5b182
+Revises: f7d2b5a9c364
+Create Date: 2026-10-18 22:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a3e9c7d5b182'
+down_revision = 'f7d2b5a9c364'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('orders', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('idempotency_key', sa.String(length=64), nullable=True))
+    op.create_index('uq_orders_idempotency_key', 'orders', ['idempotency_key'], unique=True)
+
+
+def downgrade():
+    op.drop_index('uq_orders_idempotency_key', table_name='orders')
+    with op.batch_alter_table('orders', schema=None) as batch_op:
+        batch_op.drop_column('idempotency_key')
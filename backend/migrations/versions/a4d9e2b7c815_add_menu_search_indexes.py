@@ -0,0 +1,42 @@
+"""add menu search indexes
+
+Revision ID: a4d9e2b7c815
+Revises: f3c7a2e9b461
+Create Date: 2026-10-18 15:00:00.000000
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = 'a4d9e2b7c815'
+down_revision = 'f3c7a2e9b461'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index('ix_menu_items_category_is_available', 'menu_items', ['category', 'is_available'], unique=False)
+
+    dialect = op.get_bind().dialect.name
+    if dialect == 'sqlite':
+        from app.models.menu_item import MENU_ITEMS_FTS_DDL
+        for statement in MENU_ITEMS_FTS_DDL:
+            op.execute(statement)
+        # Index the rows that already exist
+        op.execute("INSERT INTO menu_items_fts(menu_items_fts) VALUES ('rebuild')")
+    elif dialect == 'mysql':
+        op.create_index('ix_menu_items_name_description_ft', 'menu_items', ['name', 'description'],
+                        unique=False, mysql_prefix='FULLTEXT')
+
+
+def downgrade():
+    dialect = op.get_bind().dialect.name
+    if dialect == 'sqlite':
+        for trigger in ('menu_items_fts_ai', 'menu_items_fts_ad', 'menu_items_fts_au'):
+            op.execute(f'DROP TRIGGER IF EXISTS {trigger}')
+        op.execute('DROP TABLE IF EXISTS menu_items_fts')
+    elif dialect == 'mysql':
+        op.drop_index('ix_menu_items_name_description_ft', table_name='menu_items')
+
+    op.drop_index('ix_menu_items_category_is_available', table_name='menu_items')
@@ -0,0 +1,26 @@
+"""add menu_items.retired_at
+
+Revision ID: b5e8c1f4d293
+Revises: a4d9e2b7c815
+Create Date: 2026-10-18 16:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b5e8c1f4d293'
+down_revision = 'a4d9e2b7c815'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('menu_items', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('retired_at', sa.DateTime(), nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table('menu_items', schema=None) as batch_op:
+        batch_op.drop_column('retired_at')
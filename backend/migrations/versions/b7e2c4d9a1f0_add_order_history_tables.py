@@ -0,0 +1,72 @@
+"""add orders_history and order_items_history for archived orders
+
+Revision ID: b7e2c4d9a1f0
+Revises: afa33ebc1605
+Create Date: 2026-10-18 09:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b7e2c4d9a1f0'
+down_revision = 'afa33ebc1605'
+branch_labels = None
+depends_on = None
+
+
+def _reviews_order_fk():
+    inspector = sa.inspect(op.get_bind())
+    for fk in inspector.get_foreign_keys('reviews'):
+        if fk['referred_table'] == 'orders' and fk['constrained_columns'] == ['order_id']:
+            return fk['name']
+    return None
+
+
+def upgrade():
+    op.create_table(
+        'orders_history',
+        sa.Column('id', sa.Integer(), autoincrement=False, nullable=False),
+        sa.Column('customer_id', sa.Integer(), nullable=True),
+        sa.Column('customer_name', sa.String(length=100), nullable=False),
+        sa.Column('customer_phone', sa.String(length=20), nullable=False),
+        sa.Column('customer_email', sa.String(length=120), nullable=True),
+        sa.Column('customer_address', sa.Text(), nullable=True),
+        sa.Column('status', sa.String(length=20), nullable=False),
+        sa.Column('table_number', sa.Integer(), nullable=True),
+        sa.Column('is_guest_order', sa.Boolean(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.Column('notes', sa.Text(), nullable=True),
+        sa.Column('archived_at', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_table(
+        'order_items_history',
+        sa.Column('id', sa.Integer(), autoincrement=False, nullable=False),
+        sa.Column('order_id', sa.Integer(), nullable=False),
+        sa.Column('menu_item_id', sa.Integer(), nullable=False),
+        sa.Column('quantity', sa.Integer(), nullable=False),
+        sa.Column('price', sa.Numeric(precision=10, scale=2), nullable=False),
+        sa.Column('special_requests', sa.Text(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_order_items_history_order_id', 'order_items_history', ['order_id'])
+
+    # Reviews must survive their order moving to orders_history, so
+    # reviews.order_id becomes a plain column pointing at either table.
+    fk_name = _reviews_order_fk()
+    if fk_name:
+        with op.batch_alter_table('reviews', schema=None) as batch_op:
+            batch_op.drop_constraint(fk_name, type_='foreignkey')
+
+
+def downgrade():
+    with op.batch_alter_table('reviews', schema=None) as batch_op:
+        batch_op.create_foreign_key('fk_reviews_order_id_orders', 'orders', ['order_id'], ['id'])
+
+    op.drop_index('ix_order_items_history_order_id', table_name='order_items_history')
+    op.drop_table('order_items_history')
+    op.drop_table('orders_history')
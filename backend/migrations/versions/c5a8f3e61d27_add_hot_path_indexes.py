@@ -0,0 +1,42 @@
+"""add indexes for hot-path filters and sorts
+
+Revision ID: c5a8f3e61d27
+Revises: b7e2c4d9a1f0
+Create Date: 2026-10-18 10:00:00.000000
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = 'c5a8f3e61d27'
+down_revision = 'b7e2c4d9a1f0'
+branch_labels = None
+depends_on = None
+
+INDEXES = [
+    # Kitchen board, dashboard and active-order counts: status IN (...) ORDER BY created_at
+    ('ix_orders_status_created_at', 'orders', ['status', 'created_at']),
+    # Keyset-paginated order listing
+    ('ix_orders_created_at_id', 'orders', ['created_at', 'id']),
+    # Customers listing their own orders
+    ('ix_orders_customer_id_created_at', 'orders', ['customer_id', 'created_at']),
+    ('ix_order_items_order_id', 'order_items', ['order_id']),
+    ('ix_order_items_menu_item_id', 'order_items', ['menu_item_id']),
+    ('ix_inventory_items_menu_item_id', 'inventory_items', ['menu_item_id']),
+    ('ix_reviews_status_rating', 'reviews', ['status', 'rating']),
+    ('ix_reviews_order_id', 'reviews', ['order_id']),
+    ('ix_reservations_date_time', 'reservations', ['date', 'time']),
+    ('ix_orders_history_created_at_id', 'orders_history', ['created_at', 'id']),
+    ('ix_orders_history_customer_id_created_at', 'orders_history', ['customer_id', 'created_at']),
+]
+
+
+def upgrade():
+    for name, table, columns in INDEXES:
+        op.create_index(name, table, columns)
+
+
+def downgrade():
+    for name, table, _ in reversed(INDEXES):
+        op.drop_index(name, table_name=table)
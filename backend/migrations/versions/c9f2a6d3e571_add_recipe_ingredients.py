@@ -0,0 +1,55 @@
+"""add recipe_ingredients and menu_items.servings_possible
+
+Revision ID: c9f2a6d3e571
+Revises: b5e8c1f4d293
+Create Date: 2026-10-18 17:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c9f2a6d3e571'
+down_revision = 'b5e8c1f4d293'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'recipe_ingredients',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('menu_item_id', sa.Integer(), nullable=False),
+        sa.Column('inventory_item_id', sa.Integer(), nullable=False),
+        sa.Column('quantity', sa.Float(), nullable=False),
+        sa.ForeignKeyConstraint(['menu_item_id'], ['menu_items.id'], ),
+        sa.ForeignKeyConstraint(['inventory_item_id'], ['inventory_items.id'], ),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('menu_item_id', 'inventory_item_id', name='uq_recipe_ingredients_item_ingredient')
+    )
+    op.create_index('ix_recipe_ingredients_inventory_item_id', 'recipe_ingredients', ['inventory_item_id'], unique=False)
+
+    with op.batch_alter_table('menu_items', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('servings_possible', sa.Integer(), nullable=True))
+
+    # Existing inventory links become one unit per portion until someone
+    # enters the real recipe
+    op.execute(
+        "INSERT INTO recipe_ingredients (menu_item_id, inventory_item_id, quantity) "
+        "SELECT menu_item_id, id, 1 FROM inventory_items WHERE menu_item_id IS NOT NULL"
+    )
+    op.execute(
+        "UPDATE menu_items SET servings_possible = ("
+        "SELECT MIN(FLOOR(i.quantity / r.quantity + 1e-9)) FROM recipe_ingredients r "
+        "JOIN inventory_items i ON i.id = r.inventory_item_id "
+        "WHERE r.menu_item_id = menu_items.id)"
+    )
+
+
+def downgrade():
+    with op.batch_alter_table('menu_items', schema=None) as batch_op:
+        batch_op.drop_column('servings_possible')
+
+    op.drop_index('ix_recipe_ingredients_inventory_item_id', table_name='recipe_ingredients')
+    op.drop_table('recipe_ingredients')
@@ -0,0 +1,36 @@
+"""add order_status_history
+
+Revision ID: d2f6a9c4e813
+Revises: c5a8f3e61d27
+Create Date: 2026-10-18 11:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd2f6a9c4e813'
+down_revision = 'c5a8f3e61d27'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'order_status_history',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('order_id', sa.Integer(), nullable=False),
+        sa.Column('from_status', sa.String(length=20), nullable=True),
+        sa.Column('to_status', sa.String(length=20), nullable=False),
+        sa.Column('changed_at', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_order_status_history_order_id_to_status', 'order_status_history', ['order_id', 'to_status'])
+    op.create_index('ix_order_status_history_to_status_changed_at', 'order_status_history', ['to_status', 'changed_at'])
+
+
+def downgrade():
+    op.drop_index('ix_order_status_history_to_status_changed_at', table_name='order_status_history')
+    op.drop_index('ix_order_status_history_order_id_to_status', table_name='order_status_history')
+    op.drop_table('order_status_history')
@@ -0,0 +1,56 @@
+"""add inventory_movements ledger and inventory snapshots
+
+Revision ID: d4b7e9a2c618
+Revises: c9f2a6d3e571
+Create Date: 2026-10-18 18:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd4b7e9a2c618'
+down_revision = 'c9f2a6d3e571'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'inventory_movements',
+        sa.Column('id', sa.BigInteger().with_variant(sa.Integer(), 'sqlite'), nullable=False),
+        sa.Column('inventory_item_id', sa.Integer(), nullable=False),
+        sa.Column('delta', sa.Float(), nullable=False),
+        sa.Column('kind', sa.String(length=20), nullable=False),
+        sa.Column('order_id', sa.Integer(), nullable=True),
+        sa.Column('note', sa.String(length=255), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(['inventory_item_id'], ['inventory_items.id'], ),
+        sa.PrimaryKeyConstraint('id'),
+        sqlite_autoincrement=True
+    )
+    op.create_index('ix_inventory_movements_item_id', 'inventory_movements', ['inventory_item_id', 'id'], unique=False)
+    op.create_index('ix_inventory_movements_created_at', 'inventory_movements', ['created_at'], unique=False)
+
+    # Current quantities become the first snapshot, with nothing folded in yet
+    with op.batch_alter_table('inventory_items', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('snapshot_movement_id', sa.BigInteger(), nullable=False, server_default='0'))
+        batch_op.add_column(sa.Column('snapshot_at', sa.DateTime(), nullable=True))
+
+
+def downgrade():
+    # Fold any unfolded movements back into quantity before dropping the ledger
+    op.execute(
+        "UPDATE inventory_items SET quantity = quantity + COALESCE(("
+        "SELECT SUM(m.delta) FROM inventory_movements m "
+        "WHERE m.inventory_item_id = inventory_items.id "
+        "AND m.id > inventory_items.snapshot_movement_id), 0)"
+    )
+    with op.batch_alter_table('inventory_items', schema=None) as batch_op:
+        batch_op.drop_column('snapshot_at')
+        batch_op.drop_column('snapshot_movement_id')
+
+    op.drop_index('ix_inventory_movements_created_at', table_name='inventory_movements')
+    op.drop_index('ix_inventory_movements_item_id', table_name='inventory_movements')
+    op.drop_table('inventory_movements')
@@ -0,0 +1,36 @@
+"""add inventory_items.is_low
+
+Revision ID: e6a3c8f1b947
+Revises: d4b7e9a2c618
+Create Date: 2026-10-18 19:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e6a3c8f1b947'
+down_revision = 'd4b7e9a2c618'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('inventory_items', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('is_low', sa.Boolean(), nullable=False, server_default='0'))
+    op.create_index('ix_inventory_items_is_low', 'inventory_items', ['is_low', 'id'], unique=False)
+
+    # Current stock is the snapshot plus the unfolded ledger tail
+    op.execute(
+        "UPDATE inventory_items SET is_low = CASE WHEN quantity + COALESCE(("
+        "SELECT SUM(m.delta) FROM inventory_movements m "
+        "WHERE m.inventory_item_id = inventory_items.id "
+        "AND m.id > inventory_items.snapshot_movement_id), 0) <= min_quantity THEN 1 ELSE 0 END"
+    )
+
+
+def downgrade():
+    op.drop_index('ix_inventory_items_is_low', table_name='inventory_items')
+    with op.batch_alter_table('inventory_items', schema=None) as batch_op:
+        batch_op.drop_column('is_low')
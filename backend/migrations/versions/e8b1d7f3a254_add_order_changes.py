@@ -0,0 +1,33 @@
+"""add order_changes log
+
+Revision ID: e8b1d7f3a254
+Revises: d2f6a9c4e813
+Create Date: 2026-10-18 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e8b1d7f3a254'
+down_revision = 'd2f6a9c4e813'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'order_changes',
+        sa.Column('id', sa.BigInteger().with_variant(sa.Integer(), 'sqlite'), nullable=False),
+        sa.Column('order_id', sa.Integer(), nullable=False),
+        sa.Column('change', sa.String(length=20), nullable=False),
+        sa.Column('changed_at', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_order_changes_changed_at', 'order_changes', ['changed_at'])
+
+
+def downgrade():
+    op.drop_index('ix_order_changes_changed_at', table_name='order_changes')
+    op.drop_table('order_changes')
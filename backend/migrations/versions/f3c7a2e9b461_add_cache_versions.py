@@ -0,0 +1,30 @@
+"""add cache_versions
+
+Revision ID: f3c7a2e9b461
+Revises: e8b1d7f3a254
+Create Date: 2026-10-18 13:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f3c7a2e9b461'
+down_revision = 'e8b1d7f3a254'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    cache_versions = op.create_table(
+        'cache_versions',
+        sa.Column('name', sa.String(length=50), nullable=False),
+        sa.Column('version', sa.BigInteger(), nullable=False),
+        sa.PrimaryKeyConstraint('name')
+    )
+    op.bulk_insert(cache_versions, [{'name': 'menu', 'version': 1}])
+
+
+def downgrade():
+    op.drop_table('cache_versions')
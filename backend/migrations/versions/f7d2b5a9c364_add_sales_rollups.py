@@ -0,0 +1,49 @@
+"""add sales_rollups and sales_item_rollups
+
+Revision ID: f7d2b5a9c364
+Revises: e6a3c8f1b947
+Create Date: 2026-10-18 21:00:00.000000
+
+Run `flask rebuild-sales-rollups` after upgrading to fill them from the
+existing orders.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f7d2b5a9c364'
+down_revision = 'e6a3c8f1b947'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'sales_rollups',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('period', sa.String(length=10), nullable=False),
+        sa.Column('bucket_start', sa.DateTime(), nullable=False),
+        sa.Column('revenue', sa.Numeric(precision=12, scale=2), nullable=False),
+        sa.Column('orders', sa.Integer(), nullable=False),
+        sa.Column('items', sa.Integer(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('period', 'bucket_start', name='uq_sales_rollups_period_bucket')
+    )
+    op.create_table(
+        'sales_item_rollups',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('period', sa.String(length=10), nullable=False),
+        sa.Column('bucket_start', sa.DateTime(), nullable=False),
+        sa.Column('menu_item_id', sa.Integer(), nullable=False),
+        sa.Column('quantity', sa.Integer(), nullable=False),
+        sa.Column('revenue', sa.Numeric(precision=12, scale=2), nullable=False),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('period', 'bucket_start', 'menu_item_id', name='uq_sales_item_rollups_period_bucket_item')
+    )
+
+
+def downgrade():
+    op.drop_table('sales_item_rollups')
+    op.drop_table('sales_rollups')
@@ -1,7 +1,15 @@
+import os
 from app import create_app, socketio
 
 app = create_app()
 
 if __name__ == "__main__":
-    socketio.run(app, host="0.0.0.0", port=5000, debug=True)
-
+    # To scale out, start one of these per PORT behind a sticky-session load
+    # balancer with SOCKETIO_MESSAGE_QUEUE set and FLASK_DEBUG=0
+    socketio.run(
+        app,
+        host=os.environ.get("HOST", "0.0.0.0"),
+        port=int(os.environ.get("PORT", 5000)),
+        debug=os.environ.get("FLASK_DEBUG", "1") == "1",
+        allow_unsafe_werkzeug=True
+    )
@@ -0,0 +1,65 @@
+# backend/tests/conftest.py
+"""
+Shared fixtures: one app per test session on a throwaway SQLite file, with
+every table recreated before each test.
+"""
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+# config.py reads these at import time, so they have to be set before
+# anything imports the app package. The background compactor stays off so
+# tests only see the writes they make themselves.
+_fd, DATABASE_PATH = tempfile.mkstemp(prefix='rms-test-', suffix='.db')
+os.close(_fd)
+os.environ['DATABASE_URL'] = f'sqlite:///{DATABASE_PATH}'
+os.environ['INVENTORY_COMPACT_INTERVAL_SECONDS'] = '0'
+
+
+@pytest.fixture(scope='session')
+def app():
+    from flask import Flask
+    from app.extensions import db
+    import app.models  # noqa: F401  (registers every table on db.metadata)
+
+    # create_app() queries the users table on startup, so the schema has to
+    # exist before it runs
+    bootstrap = Flask('test-bootstrap')
+    bootstrap.config['SQLALCHEMY_DATABASE_URI'] = os.environ['DATABASE_URL']
+    db.init_app(bootstrap)
+    with bootstrap.app_context():
+        db.create_all()
+
+    from app import create_app
+    app = create_app()
+    app.config['TESTING'] = True
+    yield app
+    os.unlink(DATABASE_PATH)
+
+
+@pytest.fixture
+def db(app):
+    from app.extensions import db
+
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+        yield db
+        db.session.remove()
+
+
+@pytest.fixture
+def auth_header(app):
+    """auth_header(role) -> Authorization header for a user with that role"""
+    from flask_jwt_extended import create_access_token
+
+    def make(role='admin', user_id=1):
+        with app.app_context():
+            token = create_access_token(identity={'id': user_id, 'email': f'{role}@example.com', 'role': role})
+        return {'Authorization': f'Bearer {token}'}
+    return make
@@ -0,0 +1,40 @@
+# backend/tests/test_demand_forecast.py
+from datetime import datetime, timedelta
+
+
+def _order(db, order_id, created_at, status, quantity):
+    from app.models import Order, OrderItem
+
+    db.session.add(Order(
+        id=order_id, customer_name='Test Guest', customer_phone='555-0100',
+        status=status, created_at=created_at, updated_at=created_at
+    ))
+    db.session.add(OrderItem(order_id=order_id, menu_item_id=1, quantity=quantity, price=10))
+
+
+def test_history_and_current_bucket_count_the_same_orders(db):
+    from app.models import InventoryItem, MenuItem, RecipeIngredient
+    from app.services.demand_forecast import forecast_ingredients, demand_forecast_cache
+
+    now = datetime(2026, 3, 4, 15, 0)
+    today = now.replace(hour=0)
+    db.session.add_all([
+        MenuItem(id=1, name='Dish', price=10, category='main'),
+        InventoryItem(id=1, name='Rice', quantity=100, unit='kg', min_quantity=0),
+        RecipeIngredient(menu_item_id=1, inventory_item_id=1, quantity=0.5),
+    ])
+    # Served but never marked completed: stock went out all the same
+    _order(db, 1, today - timedelta(hours=10), 'served', 2)
+    _order(db, 2, today + timedelta(hours=9), 'served', 2)
+    _order(db, 3, today - timedelta(hours=9), 'completed', 4)
+    _order(db, 4, today + timedelta(hours=10), 'completed', 4)
+    _order(db, 5, today - timedelta(hours=8), 'cancelled', 8)
+    _order(db, 6, today + timedelta(hours=11), 'cancelled', 8)
+    db.session.commit()
+    demand_forecast_cache.clear()
+
+    result = forecast_ingredients(bucket='day', history=1, horizon=1, now=now)
+
+    (rice,) = result['ingredients']
+    assert rice['average'] == 3.0  # yesterday: (2 + 4) portions x 0.5 kg
+    assert rice['used_current'] == 3.0  # today, by the same rule
@@ -0,0 +1,46 @@
+# backend/tests/test_kitchen_board.py
+from datetime import datetime
+
+
+def _stale_board(db):
+    """A board that has missed an order written behind its back"""
+    from app.models import Order
+    from app.services.kitchen_board import kitchen_board
+
+    kitchen_board.rebuild()
+    db.session.add(Order(
+        id=1, customer_name='Test Guest', customer_phone='555-0100',
+        status='pending', created_at=datetime.utcnow()
+    ))
+    db.session.commit()
+    return kitchen_board
+
+
+def test_verify_needs_kitchen_or_admin(app, db, auth_header):
+    client = app.test_client()
+    assert client.get('/api/kitchen/board/verify').status_code == 401
+    assert client.get('/api/kitchen/board/verify', headers=auth_header('customer')).status_code == 403
+    assert client.post('/api/kitchen/board/repair').status_code == 401
+    assert client.post('/api/kitchen/board/repair', headers=auth_header('customer')).status_code == 403
+
+
+def test_verify_reports_drift_without_repairing(app, db, auth_header):
+    board = _stale_board(db)
+    client = app.test_client()
+
+    for _ in range(2):
+        response = client.get('/api/kitchen/board/verify?repair=true', headers=auth_header('kitchen'))
+        assert response.status_code == 200
+        assert response.get_json()['missing'] == [1]
+    assert board.tickets() == []
+
+
+def test_repair_replaces_the_board(app, db, auth_header):
+    board = _stale_board(db)
+    client = app.test_client()
+
+    response = client.post('/api/kitchen/board/repair', headers=auth_header('admin'))
+    assert response.status_code == 200
+    assert response.get_json()['missing'] == [1]
+    assert [ticket['id'] for ticket in board.tickets()] == [1]
+    assert client.get('/api/kitchen/board/verify', headers=auth_header('admin')).get_json()['consistent']
@@ -0,0 +1,71 @@
+# backend/tests/test_menu_cache.py
+import pytest
+
+PER_PORTION = 0.5
+
+
+@pytest.fixture
+def menu(db):
+    from app.models import InventoryItem, MenuItem, RecipeIngredient
+    from app.services.inventory_service import refresh_servings
+
+    db.session.add_all([
+        MenuItem(id=1, name='Dish', price=9.5, category='main'),
+        InventoryItem(id=1, name='Rice', quantity=3 * PER_PORTION, unit='kg', min_quantity=0),
+        RecipeIngredient(menu_item_id=1, inventory_item_id=1, quantity=PER_PORTION),
+    ])
+    refresh_servings()
+    db.session.commit()
+
+
+def _sell(db, portions):
+    from app.services.inventory_service import deduct_stock, refresh_servings
+
+    deduct_stock([{'menu_item_id': 1, 'quantity': portions}])
+    db.session.commit()
+    # What the background compactor does every interval
+    changed = refresh_servings()
+    db.session.commit()
+    return changed
+
+
+def test_servings_changes_leave_the_menu_version_alone(db, menu):
+    from app.services.menu_cache import current_menu_version
+
+    version = current_menu_version()
+    assert _sell(db, 1) == 1
+    assert current_menu_version() == version
+
+
+def test_running_out_and_restocking_bump_the_menu_version(db, menu):
+    from app.services.inventory_service import adjust_stock
+    from app.services.menu_cache import current_menu_version
+
+    version = current_menu_version()
+    _sell(db, 3)
+    assert current_menu_version() == version + 1
+
+    adjust_stock(1, PER_PORTION, 'delivery')
+    db.session.commit()
+    assert current_menu_version() == version + 2
+
+
+def test_cached_menu_stays_valid_while_servings_move(app, db, menu):
+    client = app.test_client()
+    menu_response = client.get('/api/menu/')
+    etag = menu_response.headers['ETag']
+    assert menu_response.get_json()[0]['in_stock'] is True
+    assert 'servings_possible' not in menu_response.get_json()[0]
+    assert client.get('/api/menu/servings').get_json() == {'1': 3}
+
+    _sell(db, 2)
+
+    assert client.get('/api/menu/', headers={'If-None-Match': etag}).status_code == 304
+    assert client.get('/api/menu/servings').get_json() == {'1': 1}
+
+    _sell(db, 1)
+
+    sold_out = client.get('/api/menu/', headers={'If-None-Match': etag})
+    assert sold_out.status_code == 200
+    assert sold_out.get_json()[0]['in_stock'] is False
+    assert client.get('/api/customer/menu').get_json() == []
@@ -0,0 +1,59 @@
+# backend/tests/test_menu_import.py
+import pytest
+
+
+@pytest.fixture
+def existing(db):
+    from app.models import MenuItem
+
+    db.session.add(MenuItem(id=1, name='Soup', price=5, category='starter', description='Tomato'))
+    db.session.commit()
+
+
+def _import(app, auth_header, rows, role='admin'):
+    return app.test_client().post('/api/admin/menu/import', json=rows, headers=auth_header(role))
+
+
+def test_import_creates_and_updates_in_one_batch(app, db, auth_header, existing):
+    from app.models import MenuItem
+
+    response = _import(app, auth_header, [
+        {'name': 'Soup', 'category': 'starter', 'price': '6.50'},
+        {'name': 'Curry', 'category': 'main', 'price': 12},
+    ])
+    assert response.status_code == 200
+    report = response.get_json()
+    assert (report['created'], report['updated'], report['failed']) == (1, 1, 0)
+    assert [row['status'] for row in report['rows']] == ['updated', 'created']
+
+    db.session.expire_all()
+    soup = db.session.get(MenuItem, 1)
+    assert float(soup.price) == 6.5
+    assert soup.description == 'Tomato'  # fields not given are left alone
+    curry = db.session.get(MenuItem, report['rows'][1]['id'])
+    assert curry.name == 'Curry' and curry.is_available
+
+
+def test_one_bad_row_rejects_the_whole_batch(app, db, auth_header, existing):
+    from app.models import MenuItem
+
+    response = _import(app, auth_header, [
+        {'name': 'Soup', 'category': 'starter', 'price': '6.50'},
+        {'name': 'Curry', 'category': 'main', 'price': 12},
+        {'name': 'Pie', 'category': 'dessert', 'price': -1},
+        {'id': 99, 'price': 3},
+    ])
+    assert response.status_code == 400
+    report = response.get_json()
+    assert (report['created'], report['updated'], report['failed']) == (0, 0, 2)
+    assert [row['status'] for row in report['rows']] == ['valid', 'valid', 'error', 'error']
+    assert report['rows'][2]['errors'] == ['price must be a non-negative number']
+    assert report['rows'][3]['errors'] == ['menu item 99 does not exist']
+
+    db.session.expire_all()
+    assert db.session.query(MenuItem).count() == 1
+    assert float(db.session.get(MenuItem, 1).price) == 5
+
+
+def test_import_is_admin_only(app, db, auth_header):
+    assert _import(app, auth_header, [], role='kitchen').status_code == 403
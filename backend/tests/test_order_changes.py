@@ -0,0 +1,36 @@
+# backend/tests/test_order_changes.py
+import pytest
+from app.services.order_changes import current_change_cursor, parse_since, record_order_changes
+
+
+def test_parse_since(db):
+    assert parse_since(None, 5) is None
+    assert parse_since('', 5) is None
+    assert parse_since('3', 5) == 3
+    assert parse_since('5', 5) == 5
+    for value in ('abc', '2.5', '-1', '6'):
+        with pytest.raises(ValueError):
+            parse_since(value, 5)
+
+
+@pytest.mark.parametrize('url', ['/api/orders/', '/api/kitchen/orders'])
+@pytest.mark.parametrize('since', ['abc', '99'])
+def test_bad_since_asks_the_client_to_resync(app, db, url, since):
+    record_order_changes([1], 'created')
+    db.session.commit()
+    assert current_change_cursor() < 99
+
+    response = app.test_client().get(f'{url}?since={since}')
+    assert response.status_code == 400
+    assert response.get_json()['resync'] is True
+    assert 'refetch without since' in response.get_json()['error']
+
+
+@pytest.mark.parametrize('url', ['/api/orders/', '/api/kitchen/orders'])
+def test_since_at_the_head_is_accepted(app, db, url):
+    record_order_changes([1], 'created')
+    db.session.commit()
+
+    response = app.test_client().get(f'{url}?since={current_change_cursor()}')
+    assert response.status_code == 200
+    assert response.get_json()['changed'] == []
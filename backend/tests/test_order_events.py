@@ -0,0 +1,74 @@
+# backend/tests/test_order_events.py
+from app.services.order_events import OrderEventCoalescer
+
+
+def _coalescer(max_orders=10000):
+    sent = []
+    coalescer = OrderEventCoalescer(
+        emit=lambda event, data, room: sent.append((event, data, room)),
+        start_task=lambda task: None,
+        sleep=lambda seconds: None,
+        max_orders=max_orders
+    )
+    return coalescer, sent
+
+
+def _update(coalescer, order_id, status, version, **fields):
+    coalescer.add([dict({'id': order_id, 'status': status}, **fields)], version, lambda order: {'kitchen'})
+
+
+def test_updates_in_one_window_merge_into_one_delta():
+    coalescer, sent = _coalescer()
+    _update(coalescer, 1, 'pending', 1, total=12.5)
+    coalescer.flush()
+    _update(coalescer, 1, 'confirmed', 2, total=12.5)
+    _update(coalescer, 1, 'preparing', 3, total=12.5)
+    coalescer.flush()
+
+    assert sent[0] == ('order:updated', {'id': 1, 'status': 'pending', 'total': 12.5}, 'kitchen')
+    assert sent[1] == ('order:delta', [{'id': 1, 'version': 3, 'base': 1, 'changes': {'status': 'preparing'}}], 'kitchen')
+    assert coalescer.stats()['updates_merged'] == 1
+
+
+def test_no_delta_goes_out_without_a_base():
+    coalescer, sent = _coalescer()
+    for version, order_id in enumerate((1, 2, 1, 3, 2), start=1):
+        _update(coalescer, order_id, 'preparing' if version > 2 else 'pending', version)
+        coalescer.flush()
+
+    deltas = [entry for event, frame, _ in sent if event == 'order:delta' for entry in frame]
+    assert deltas and all(entry['base'] is not None for entry in deltas)
+    assert [data['id'] for event, data, _ in sent if event == 'order:updated'] == [1, 2, 3]
+
+
+def test_snapshots_are_bounded_and_evicted_orders_go_out_in_full():
+    coalescer, sent = _coalescer(max_orders=2)
+    for order_id in (1, 2, 3):
+        _update(coalescer, order_id, 'pending', order_id)
+        coalescer.flush()
+    stats = coalescer.stats()
+    assert stats['tracked_orders'] == 2
+    assert stats['snapshots_evicted'] == 1
+
+    # Order 1 was least recently updated and has lost its snapshot
+    sent.clear()
+    _update(coalescer, 1, 'preparing', 4)
+    coalescer.flush()
+    assert sent == [('order:updated', {'id': 1, 'status': 'preparing'}, 'kitchen')]
+
+    # Order 3 still has one
+    sent.clear()
+    _update(coalescer, 3, 'preparing', 5)
+    coalescer.flush()
+    assert sent == [('order:delta', [{'id': 3, 'version': 5, 'base': 3, 'changes': {'status': 'preparing'}}], 'kitchen')]
+
+
+def test_finished_orders_drop_their_snapshot():
+    coalescer, sent = _coalescer()
+    _update(coalescer, 1, 'ready', 1)
+    coalescer.flush()
+    _update(coalescer, 1, 'completed', 2)
+    coalescer.flush()
+
+    assert sent[-1][0] == 'order:delta'
+    assert coalescer.stats()['tracked_orders'] == 0
@@ -0,0 +1,102 @@
+# backend/tests/test_orders_api.py
+"""Order placement and the order listing's paging and caching contracts"""
+from datetime import datetime, timedelta
+import pytest
+
+ORDER = {
+    'customer_name': 'Test Guest',
+    'customer_phone': '555-0100',
+    'items': [{'menu_item_id': 1, 'quantity': 2}]
+}
+
+
+@pytest.fixture
+def client(app, db):
+    from app.models import MenuItem
+
+    db.session.add(MenuItem(id=1, name='Dish', price=9.5, category='main'))
+    db.session.commit()
+    return app.test_client()
+
+
+def _place(client, **headers):
+    response = client.post('/api/orders/create', json=ORDER, headers=headers)
+    assert response.status_code == 201, response.get_json()
+    return response.get_json()
+
+
+def _seed_orders(db, count):
+    from app.models import Order
+
+    start = datetime.utcnow() - timedelta(hours=1)
+    db.session.add_all([Order(
+        id=order_id, customer_name='Test Guest', customer_phone='555-0100', status='pending',
+        # Pairs share a created_at, so paging has to break ties on id
+        created_at=start + timedelta(minutes=order_id // 2)
+    ) for order_id in range(1, count + 1)])
+    db.session.commit()
+
+
+def test_idempotent_replay_returns_the_first_order(client, db):
+    from app.models import Order, OrderItem
+
+    first = client.post('/api/orders/create', json=ORDER, headers={'Idempotency-Key': 'till-1-0001'})
+    again = client.post('/api/orders/create', json=ORDER, headers={'Idempotency-Key': 'till-1-0001'})
+
+    assert first.status_code == 201
+    assert again.status_code == 200
+    assert again.get_json()['order_id'] == first.get_json()['order_id']
+    assert db.session.query(Order).count() == 1
+    assert db.session.query(OrderItem).count() == 1
+
+    other = client.post('/api/orders/create', json=ORDER, headers={'Idempotency-Key': 'till-1-0002'})
+    assert other.status_code == 201
+    assert other.get_json()['order_id'] != first.get_json()['order_id']
+
+
+def test_cursor_pages_cover_every_order_once(client, db):
+    _seed_orders(db, 7)
+
+    seen, cursor = [], None
+    while True:
+        url = '/api/orders/?limit=3' + (f'&cursor={cursor}' if cursor else '')
+        page = client.get(url).get_json()
+        assert len(page['orders']) <= 3
+        seen += [order['id'] for order in page['orders']]
+        cursor = page['next_cursor']
+        if cursor is None:
+            break
+
+    assert seen == [7, 6, 5, 4, 3, 2, 1]
+
+
+def test_since_returns_only_what_changed(client):
+    from app.services.order_changes import current_change_cursor
+
+    first = _place(client)
+    head = current_change_cursor()
+
+    assert client.get(f'/api/orders/?since={head}').get_json()['changed'] == []
+
+    second = _place(client)
+    delta = client.get(f'/api/orders/?since={head}').get_json()
+    assert [order['id'] for order in delta['changed']] == [second['order_id']]
+    assert delta['removed'] == []
+    assert first['order_id'] != second['order_id']
+
+
+def test_unchanged_listing_is_a_304(client):
+    _place(client)
+    response = client.get('/api/orders/')
+    etag = response.headers['ETag']
+    assert response.status_code == 200
+
+    cached = client.get('/api/orders/', headers={'If-None-Match': etag})
+    assert cached.status_code == 304
+    assert cached.data == b''
+
+    _place(client)
+    fresh = client.get('/api/orders/', headers={'If-None-Match': etag})
+    assert fresh.status_code == 200
+    assert fresh.headers['ETag'] != etag
+    assert len(fresh.get_json()) == 2
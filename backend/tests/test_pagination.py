@@ -0,0 +1,21 @@
+# backend/tests/test_pagination.py
+import pytest
+from app.utils.pagination import parse_limit
+
+
+@pytest.mark.parametrize('value', ['abc', '1.5', '0', '-3'])
+def test_parse_limit_rejects_anything_but_a_positive_integer(value):
+    with pytest.raises(ValueError, match='^limit must be a positive integer$'):
+        parse_limit(value)
+
+
+def test_parse_limit_defaults_and_clamps():
+    assert parse_limit(None) == 50
+    assert parse_limit('', default=20) == 20
+    assert parse_limit('500', maximum=100) == 100
+
+
+def test_bad_limit_is_a_400_with_a_readable_error(app, db):
+    response = app.test_client().get('/api/orders/?limit=abc')
+    assert response.status_code == 400
+    assert response.get_json() == {'error': 'limit must be a positive integer'}
@@ -0,0 +1,76 @@
+# backend/tests/test_prep_time.py
+from datetime import datetime, timedelta
+
+
+def _ready_order(db, order_id, placed_at, minutes, menu_item_id=1):
+    from app.models import Order, OrderItem, OrderStatusHistory
+
+    db.session.add(Order(
+        id=order_id, customer_name='Test Guest', customer_phone='555-0100',
+        status='ready', created_at=placed_at, updated_at=placed_at
+    ))
+    db.session.add(OrderItem(order_id=order_id, menu_item_id=menu_item_id, quantity=1, price=10))
+    db.session.add(OrderStatusHistory(
+        order_id=order_id, from_status='pending', to_status='preparing', changed_at=placed_at
+    ))
+    db.session.add(OrderStatusHistory(
+        order_id=order_id, from_status='preparing', to_status='ready',
+        changed_at=placed_at + timedelta(minutes=minutes)
+    ))
+
+
+def _record_change(db, order_id):
+    from app.services.order_changes import record_order_changes
+
+    record_order_changes([order_id], 'updated')
+
+
+def test_rebuild_reads_the_window_only(db):
+    from app.services.prep_time import PrepTimeStats
+
+    now = datetime.utcnow()
+    for order_id in range(1, 6):
+        _ready_order(db, order_id, now - timedelta(hours=2), 12)
+    for order_id in range(6, 11):
+        _ready_order(db, order_id, now - timedelta(days=40), 40)
+    db.session.commit()
+
+    stats = PrepTimeStats(window_days=28)
+    assert stats.summary()['samples'] == 5
+    assert stats.estimate(1) == 12
+
+
+def test_sync_picks_up_transitions_from_other_workers(db):
+    from app.services.prep_time import PrepTimeStats
+
+    stats = PrepTimeStats(window_days=28)
+    assert stats.summary()['samples'] == 0
+
+    # Written by another process: only the database knows about them
+    placed_at = datetime.utcnow() - timedelta(minutes=20)
+    for order_id in range(1, 6):
+        _ready_order(db, order_id, placed_at, 20)
+        _record_change(db, order_id)
+    db.session.commit()
+
+    stats.sync()
+    assert stats.summary()['samples'] == 5
+    assert stats.estimate(1) == 20
+    # Nothing new: syncing again must not count anything twice
+    stats.sync()
+    assert stats.summary()['samples'] == 5
+
+
+def test_samples_age_out_of_the_window(db):
+    from app.services.prep_time import PrepTimeStats
+
+    stats = PrepTimeStats(window_days=7)
+    stats._ensure_loaded()
+    old = datetime.utcnow() - timedelta(days=10)
+    for sample_id in range(1, 6):
+        stats.record(sample_id, [1], old, 30)
+    for sample_id in range(6, 11):
+        stats.record(sample_id, [1], datetime.utcnow(), 10)
+
+    assert stats.summary()['samples'] == 5
+    assert stats.estimate(1) == 10
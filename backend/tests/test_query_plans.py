@@ -0,0 +1,9 @@
+# backend/tests/test_query_plans.py
+import pytest
+from app.utils.query_plans import HOT_QUERIES, explain
+
+
+@pytest.mark.parametrize('name', sorted(HOT_QUERIES))
+def test_hot_query_uses_an_index(db, name):
+    lines, full_scans = explain(HOT_QUERIES[name]())
+    assert not full_scans, f'{name} scans {", ".join(full_scans)}:\n' + '\n'.join(lines)
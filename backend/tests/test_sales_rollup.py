@@ -0,0 +1,83 @@
+# backend/tests/test_sales_rollup.py
+from datetime import datetime
+
+
+def _order(db, order_id, created_at, lines, status='completed'):
+    from app.models import Order, OrderItem
+
+    db.session.add(Order(
+        id=order_id, customer_name='Test Guest', customer_phone='555-0100',
+        status=status, created_at=created_at, updated_at=created_at
+    ))
+    for menu_item_id, quantity, price in lines:
+        db.session.add(OrderItem(order_id=order_id, menu_item_id=menu_item_id, quantity=quantity, price=price))
+
+
+def _rollups(db):
+    from app.models import SalesRollup, SalesItemRollup
+
+    db.session.expire_all()
+    totals = {(row.period, row.bucket_start): (float(row.revenue), row.orders, row.items)
+              for row in db.session.query(SalesRollup)}
+    items = {(row.period, row.bucket_start, row.menu_item_id): (row.quantity, float(row.revenue))
+             for row in db.session.query(SalesItemRollup)}
+    return totals, items
+
+
+def test_completions_add_onto_existing_rows(db):
+    from app.services.sales_rollup import record_sales
+
+    day = datetime(2026, 3, 4)
+    _order(db, 1, datetime(2026, 3, 4, 12, 10), [(1, 2, 5), (2, 1, 8)])
+    _order(db, 2, datetime(2026, 3, 4, 12, 40), [(1, 1, 5)])
+    _order(db, 3, datetime(2026, 3, 4, 18, 5), [(2, 3, 8)])
+    db.session.commit()
+
+    record_sales(completed_order_ids=[1])
+    db.session.commit()
+    # Same hour and day as order 1: those rows are added to, not replaced
+    record_sales(completed_order_ids=[2, 3])
+    db.session.commit()
+
+    totals, items = _rollups(db)
+    assert totals[('day', day)] == (47.0, 3, 7)
+    assert totals[('hour', datetime(2026, 3, 4, 12))] == (23.0, 2, 4)
+    assert totals[('hour', datetime(2026, 3, 4, 18))] == (24.0, 1, 3)
+    assert items[('day', day, 1)] == (3, 15.0)
+    assert items[('day', day, 2)] == (4, 32.0)
+
+
+def test_reverted_orders_come_back_out(db):
+    from app.services.sales_rollup import record_sales
+
+    day = datetime(2026, 3, 4)
+    _order(db, 1, datetime(2026, 3, 4, 12, 10), [(1, 2, 5)])
+    _order(db, 2, datetime(2026, 3, 4, 12, 40), [(1, 1, 5)])
+    db.session.commit()
+    record_sales(completed_order_ids=[1, 2])
+    db.session.commit()
+
+    record_sales(reverted_order_ids=[2])
+    db.session.commit()
+
+    totals, items = _rollups(db)
+    assert totals[('day', day)] == (10.0, 1, 2)
+    assert items[('day', day, 1)] == (2, 10.0)
+
+
+def test_incremental_rollups_match_a_rebuild(db):
+    from app.services.sales_rollup import record_sales, rebuild_sales_rollups
+
+    _order(db, 1, datetime(2026, 3, 4, 9, 0), [(1, 2, 5.25)])
+    _order(db, 2, datetime(2026, 3, 4, 9, 30), [(1, 1, 5.25), (3, 2, 3.1)])
+    _order(db, 3, datetime(2026, 3, 5, 20, 0), [(3, 4, 3.1)])
+    _order(db, 4, datetime(2026, 3, 5, 21, 0), [(1, 9, 5.25)], status='cancelled')
+    db.session.commit()
+    record_sales(completed_order_ids=[1, 2, 3])
+    db.session.commit()
+    incremental = _rollups(db)
+
+    rebuild_sales_rollups()
+    db.session.commit()
+
+    assert _rollups(db) == incremental
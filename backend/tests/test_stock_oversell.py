@@ -0,0 +1,70 @@
+# backend/tests/test_stock_oversell.py
+"""
+Orders racing for the last portions of a dish must never sell more than the
+stock covers (see inventory_service.deduct_stock).
+"""
+import threading
+import pytest
+
+PER_PORTION = 0.25
+
+
+def _seed(db, servings):
+    from app.models import InventoryItem, MenuItem, RecipeIngredient
+
+    db.session.add_all([
+        MenuItem(id=1, name='Dish', price=9.5, category='main', servings_possible=servings),
+        InventoryItem(id=1, name='Rice', quantity=servings * PER_PORTION, unit='kg', min_quantity=0),
+        RecipeIngredient(menu_item_id=1, inventory_item_id=1, quantity=PER_PORTION),
+    ])
+    db.session.commit()
+
+
+@pytest.mark.parametrize('lock', [False, True], ids=['lock-free', 'locked'])
+def test_concurrent_orders_do_not_oversell(app, db, monkeypatch, lock):
+    from app.models import InventoryItem, Order, OrderItem
+
+    monkeypatch.setitem(app.config, 'INVENTORY_LOCK_ON_SALE', lock)
+    servings, orders = 50, 300
+    _seed(db, servings)
+    payload = {
+        'customer_name': 'Test Guest',
+        'customer_phone': '555-0100',
+        'items': [{'menu_item_id': 1, 'quantity': 1}]
+    }
+    start = threading.Barrier(orders)
+    statuses = []
+
+    def place_order():
+        client = app.test_client()
+        start.wait()
+        statuses.append(client.post('/api/orders/create', json=payload).status_code)
+
+    threads = [threading.Thread(target=place_order) for _ in range(orders)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    db.session.expire_all()
+    sold = db.session.query(db.func.coalesce(db.func.sum(OrderItem.quantity), 0)).scalar()
+    stock_left = db.session.get(InventoryItem, 1).stock
+    assert statuses.count(201) == db.session.query(Order).count() == sold
+    assert sold == servings
+    assert stock_left >= 0
+    assert abs(stock_left - (servings - sold) * PER_PORTION) < 1e-6
+    # Everything turned away was refused for stock, not lost to an error
+    assert set(statuses) <= {201, 400}
+
+
+def test_sale_past_stock_is_refused(app, db):
+    from app.models import InventoryItem
+    from app.services.inventory_service import deduct_stock, InsufficientStock
+
+    _seed(db, 2)
+    deduct_stock([{'menu_item_id': 1, 'quantity': 2}])
+    db.session.commit()
+    with pytest.raises(InsufficientStock):
+        deduct_stock([{'menu_item_id': 1, 'quantity': 1}])
+    db.session.rollback()
+    assert db.session.get(InventoryItem, 1).stock == 0
@@ -16,6 +16,14 @@ interface Order {
   createdAt: string;
 }
 
+// Coalesced status updates: only the fields that changed since `base`
+interface OrderDelta {
+  id: number;
+  version: number;
+  base: number | null;
+  changes: Partial<{ status: Order['status'] }>;
+}
+
 export default function KitchenOrdersPage() {
 
     const socket = useSocket();
@@ -32,12 +40,32 @@ useEffect(() => {
     );
   });
 
+  // Bulk status changes arrive as one list per room
+  socket.on('orders:updated', (updatedOrders: Order[]) => {
+    setOrders(prevOrders =>
+      prevOrders.map(order =>
+        updatedOrders.find(updated => String(updated.id) === String(order.id)) ?? order
+      )
+    );
+  });
+
+  socket.on('order:delta', (deltas: OrderDelta[]) => {
+    setOrders(prevOrders =>
+      prevOrders.map(order => {
+        const delta = deltas.find(d => String(d.id) === String(order.id));
+        return delta?.changes.status ? { ...order, status: delta.changes.status } : order;
+      })
+    );
+  });
+
   socket.on('order:created', (newOrder: Order) => {
     setOrders(prevOrders => [...prevOrders, newOrder]);
   });
 
   return () => {
     socket.off('order:updated');
+    socket.off('orders:updated');
+    socket.off('order:delta');
     socket.off('order:created');
   };
 }, [socket]);